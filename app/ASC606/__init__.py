@@ -11,25 +11,57 @@ The process involves 5 steps:
 5. Recognize revenue as each obligation is fulfilled
 """
 
-from typing import Dict
+from typing import Dict, Optional
 
-from app.ASC606.engine import ASC606Engine
-from app.ASC606.models import PerformanceObligationModel, DiscountModel, RevenueScheduleModel
+from app.ASC606.engine import RESULT_FORMATS, ASC606Engine
+from app.ASC606.models import PerformanceObligationModel, DiscountModel, RecognitionResult, RevenueScheduleModel, RevenueScheduleColumns, JournalEntryLineModel, VariableConsiderationModel
 from app.ASC606.discounts import DiscountHandler
+from app.ASC606.variable_consideration import USAGE_RECOGNITION_METHOD, VariableConsiderationHandler
 from app.ASC606.revenue_schedule import RevenueScheduleGenerator
+from app.ASC606.fiscal_calendar import (
+    FiscalCalendar,
+    MonthlyFiscalCalendar,
+    WeeklyFiscalCalendar,
+    ThirteenPeriodFiscalCalendar,
+    fiscal_calendar_from_string,
+    get_default_fiscal_calendar,
+)
+from app.ASC606.modifications import MODIFICATION_TREATMENTS, ContractModificationHandler, apply_modification_delta
+from app.ASC606.journal_entries import JournalEntryGenerator, parse_close_period
+from app.ASC606.portfolio import PortfolioResult, process_portfolio
 
-def revenue_recognition(contract_data: Dict) -> Dict:
+def revenue_recognition(contract_data: Dict, fiscal_calendar: Optional[FiscalCalendar] = None, result_format: str = "records") -> Dict:
     """Main entry point for revenue recognition"""
-    engine = ASC606Engine()
-    return engine.process_contract(contract_data)
+    engine = ASC606Engine(fiscal_calendar)
+    return engine.process_contract(contract_data, result_format=result_format)
 
 
 __all__ = [
     'ASC606Engine',
+    'RESULT_FORMATS',
     'revenue_recognition',
     'PerformanceObligationModel',
     'DiscountModel',
     'RevenueScheduleModel',
+    'RevenueScheduleColumns',
+    'RecognitionResult',
     'DiscountHandler',
+    'VariableConsiderationModel',
+    'VariableConsiderationHandler',
+    'USAGE_RECOGNITION_METHOD',
     'RevenueScheduleGenerator',
+    'FiscalCalendar',
+    'MonthlyFiscalCalendar',
+    'WeeklyFiscalCalendar',
+    'ThirteenPeriodFiscalCalendar',
+    'fiscal_calendar_from_string',
+    'get_default_fiscal_calendar',
+    'ContractModificationHandler',
+    'MODIFICATION_TREATMENTS',
+    'apply_modification_delta',
+    'JournalEntryLineModel',
+    'JournalEntryGenerator',
+    'parse_close_period',
+    'PortfolioResult',
+    'process_portfolio',
 ]
\ No newline at end of file
@@ -2,11 +2,14 @@
 ASC 606 Discount Handler
 
 This module handles all the discount-related logic for ASC 606 revenue recognition.
+Discounts are computed in integer cents, and global discounts are prorated with the
+largest remainder method so the obligation shares add up to the discount exactly.
 """
 
 from typing import Dict, List
 
 from app.ASC606.models import DiscountModel, PerformanceObligationModel
+from app.ASC606.money import allocate_cents, from_cents, to_cents
 
 
 class DiscountHandler:
@@ -16,6 +19,7 @@ class DiscountHandler:
     
     def __init__(self):
         self.discounts = []
+        self.total_discount_cents = 0
         self.total_discount_amount = 0.0
         
         
@@ -41,30 +45,30 @@ class DiscountHandler:
             return
         
         # Calculate total SSP for allocation
-        total_ssp = sum(obligation.standalone_price for obligation in performance_obligations)
+        ssp_cents = [to_cents(obligation.standalone_price) for obligation in performance_obligations]
+        total_ssp_cents = sum(ssp_cents)
         
         for discount in self.discounts:
             if discount.scope == "global":
-                self._apply_global_discount(discount, performance_obligations, total_ssp)
+                self._apply_global_discount(discount, performance_obligations, ssp_cents, total_ssp_cents)
             elif discount.scope == "obligation_specific":
                 self._apply_obligation_specific_discount(discount, performance_obligations)
                 
                 
-    def _apply_global_discount(self, discount: DiscountModel, performance_obligations:  List[PerformanceObligationModel], total_ssp: float) -> None:
+    def _apply_global_discount(self, discount: DiscountModel, performance_obligations:  List[PerformanceObligationModel], ssp_cents: List[int], total_ssp_cents: int) -> None:
         """Apply global contract-level discount pro rata across all obligations"""
         if discount.is_percentage:
-            discount_amount = total_ssp * (discount.amount / 100)
+            discount_cents = round(total_ssp_cents * discount.amount / 100)
         else:
-            discount_amount = discount.amount
+            discount_cents = to_cents(discount.amount)
             
         # Allocate discount pro rata based on SSP
-        for obligation in performance_obligations:
-            if total_ssp > 0:
-                obligation_discount = (obligation.standalone_price / total_ssp) * discount_amount
-                obligation.discount_applied += obligation_discount
-                obligation.allocated_amount -= obligation_discount
+        if total_ssp_cents > 0:
+            obligation_discounts = allocate_cents(discount_cents, ssp_cents)
+            for obligation, obligation_discount in zip(performance_obligations, obligation_discounts):
+                self._apply_obligation_discount(obligation, int(obligation_discount))
                 
-        self.total_discount_amount += discount_amount
+        self._add_total_discount(discount_cents)
         
         
     def _apply_obligation_specific_discount(self, discount: DiscountModel, performance_obligations: List[PerformanceObligationModel]) -> None:
@@ -75,9 +79,19 @@ class DiscountHandler:
         for obligation in performance_obligations:
             if obligation.name in discount.target_obligations:
                 if discount.is_percentage:
-                    obligation_discount = obligation.standalone_price * (discount.amount / 100)
+                    obligation_discount = round(to_cents(obligation.standalone_price) * discount.amount / 100)
                 else:
-                    obligation_discount = discount.amount
-                obligation.discount_applied += obligation_discount
-                obligation.allocated_amount -= obligation_discount
-                self.total_discount_amount += obligation_discount
\ No newline at end of file
+                    obligation_discount = to_cents(discount.amount)
+                self._apply_obligation_discount(obligation, obligation_discount)
+                self._add_total_discount(obligation_discount)
+                
+                
+    def _apply_obligation_discount(self, obligation: PerformanceObligationModel, discount_cents: int) -> None:
+        """Move a discount in cents from the obligation's allocated amount to its applied discount"""
+        obligation.discount_applied = from_cents(to_cents(obligation.discount_applied) + discount_cents)
+        obligation.allocated_amount = from_cents(to_cents(obligation.allocated_amount) - discount_cents)
+        
+        
+    def _add_total_discount(self, discount_cents: int) -> None:
+        self.total_discount_cents += discount_cents
+        self.total_discount_amount = from_cents(self.total_discount_cents)
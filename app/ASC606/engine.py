@@ -2,12 +2,27 @@
 ASC 606 Revenue Schedule Engine
 
 This module contains the main ASC606Engine class that orchestrates the 5-step ASC 606 model.
+
+Results carry the revenue schedule either as a list of JSON-ready dicts (`records`, the
+default) or as a `RevenueScheduleColumns` of parallel arrays (`columnar`), which is much
+smaller for large schedules and is consumed directly by persistence and the audit memo.
+`ASC606Engine.recognize` returns a typed `RecognitionResult` instead of a dict, whose
+schedule rows reference their obligation by key rather than by name.
+
+While an extraction streams in, `ASC606Engine.prepare_obligation` processes each performance
+obligation as soon as it arrives; the contract run at the end reuses that work.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from app.ASC606.discounts import DiscountHandler
-from app.ASC606.models import PerformanceObligationModel, RevenueScheduleModel
-from app.ASC606.revenue_schedule import RevenueScheduleGenerator
+from app.ASC606.fiscal_calendar import FiscalCalendar
+from app.ASC606.models import PerformanceObligationModel, RecognitionResult, RevenueScheduleColumns, RevenueScheduleModel
+from app.ASC606.modifications import ContractModificationHandler
+from app.ASC606.revenue_schedule import PlannedPeriods, RevenueScheduleGenerator
+from app.ASC606.variable_consideration import UsageTotal, VariableConsiderationHandler
+from app.tracing import traced
+
+RESULT_FORMATS = ["records", "columnar"]
 
 
 class ASC606Engine:
@@ -22,64 +37,172 @@ class ASC606Engine:
     5. Generate revenue schedule
     """
     
-    def __init__(self):
+    def __init__(self, fiscal_calendar: Optional[FiscalCalendar] = None):
         self.contract_data = None
+        self.fiscal_calendar = fiscal_calendar
         self.performance_obligations: List[PerformanceObligationModel] = []
         self.revenue_schedule: List[RevenueScheduleModel] = []
         self.discount_handler =  DiscountHandler()
+        self.variable_consideration_handler = VariableConsiderationHandler()
         self.revenue_schedule_generator = None
+        self._prepared_obligations: Dict[int, Tuple[Dict[str, Any], PerformanceObligationModel]] = {}
+        self._planned_periods: PlannedPeriods = {}
         
         
-    def process_contract(self, contract_data: Dict[str, Any]) -> Dict[str, Any]:
+    @traced("ASC606Engine.process_contract")
+    def process_contract(
+        self,
+        contract_data: Dict[str, Any],
+        usage: Optional[Iterable[UsageTotal]] = None,
+        result_format: str = "records",
+    ) -> Dict[str, Any]:
         """
         Entry point for processing a contract through ASC 606 logic
+        
+        `usage` holds metered usage totals per period; they add usage-based revenue for the
+        contract's variable consideration. `result_format` selects how the schedule is returned.
+        """
+        
+        self._run(contract_data, usage)
+        return self._build_result("Contract processed successfully.", result_format)
+        
+    @traced("ASC606Engine.recognize")
+    def recognize(self, contract_data: Dict[str, Any], usage: Optional[Iterable[UsageTotal]] = None) -> RecognitionResult:
+        """
+        Process a contract like `process_contract`, returning a typed result
+        
+        Dates and amounts stay native and each schedule row carries its obligation's key, so
+        callers persisting the result need no parsing and no lookups by name.
+        """
+        
+        self._run(contract_data, usage)
+        return RecognitionResult(
+            message="Contract processed successfully.",
+            contract_id=contract_data.get("contract_id"),
+            performance_obligations=self.performance_obligations,
+            revenue_schedule=RevenueScheduleColumns.from_rows(self.revenue_schedule, contract_data.get("contract_id")),
+            total_discount_amount=self.discount_handler.total_discount_amount,
+            discounts_applied=len(self.discount_handler.discounts),
+            variable_considerations_count=len(self.variable_consideration_handler.variable_considerations),
+        )
+        
+    def prepare_obligation(self, index: int, obligation_data: Dict[str, Any], contract_terms: Dict[str, Any]) -> None:
+        """
+        Process one performance obligation before the rest of the contract is known
+        
+        `contract_terms` holds the contract fields received so far. The obligation model and
+        its recognition periods are reused by the contract run when the final contract data
+        has the same obligation at `index`; anything else is processed again then.
         """
+        obligation = self._obligation_model(index, obligation_data)
+        self._prepared_obligations[index] = (obligation_data, obligation)
         
+        if not contract_terms.get("effective_date") or not contract_terms.get("end_date"):
+            return
+        generator = RevenueScheduleGenerator(
+            dict(contract_terms, contract_id=contract_terms.get("contract_id")), self.fiscal_calendar, self._planned_periods
+        )
+        try:
+            generator.plan_periods(obligation)
+        except (KeyError, TypeError, ValueError):
+            # Reported when the obligation is processed with the complete contract
+            pass
+        
+    def _run(self, contract_data: Dict[str, Any], usage: Optional[Iterable[UsageTotal]] = None) -> None:
+        """Run the ASC 606 steps for a contract, leaving the schedule in `revenue_schedule`"""
         self.contract_data = contract_data;
         self._process_performance_obligations();
         self.discount_handler.process_discounts(contract_data);
         self.discount_handler.apply_discounts(self.performance_obligations);
+        self.variable_consideration_handler.process_variable_considerations(contract_data);
         self._generate_revenue_schedule();
+        if usage:
+            self.revenue_schedule.extend(
+                self.variable_consideration_handler.generate_usage_schedule(contract_data["contract_id"], usage)
+            )
         
-        print(f"Processing contract: {contract_data}")
+    @traced("ASC606Engine.process_modification")
+    def process_modification(
+        self,
+        contract_data: Dict[str, Any],
+        original_schedule: List[RevenueScheduleModel],
+        effective_date: Any,
+        accounting_treatment: str = "prospective",
+        result_format: str = "records",
+    ) -> Dict[str, Any]:
+        """
+        Apply a contract modification to an existing revenue schedule
         
-        return {
-            "message": "Contract processed successfully.",
-            "contract_data": contract_data,
-            "revenue_schedule": [ 
+        `contract_data` holds the modified contract terms and `original_schedule` the schedule
+        generated for the terms before the modification.
+        """
+        
+        self.contract_data = contract_data
+        self._process_performance_obligations()
+        self.discount_handler.process_discounts(contract_data)
+        self.discount_handler.apply_discounts(self.performance_obligations)
+        self.variable_consideration_handler.process_variable_considerations(contract_data)
+        
+        modification_handler = ContractModificationHandler(effective_date, accounting_treatment, self.fiscal_calendar)
+        self.revenue_schedule = modification_handler.apply(contract_data, self.performance_obligations, original_schedule)
+        
+        return self._build_result("Contract modification applied successfully.", result_format)
+        
+    def _build_result(self, message: str, result_format: str = "records") -> Dict[str, Any]:
+        """Serialize the engine state into the result returned to callers"""
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"Unsupported result format: {result_format}")
+        
+        if result_format == "columnar":
+            revenue_schedule = RevenueScheduleColumns.from_rows(self.revenue_schedule, self.contract_data.get("contract_id"))
+        else:
+            revenue_schedule = [
             {
-                "contract_id": revenue_schedule.contract_id,
-                "obligation_name": revenue_schedule.obligation_name,
-                "period_start": revenue_schedule.period_start.isoformat() if revenue_schedule.period_start else None,
-                "period_end": revenue_schedule.period_end.isoformat() if revenue_schedule.period_end else None,
-                "amount": revenue_schedule.amount,
-                "recognition_method": revenue_schedule.recognition_method,
-                "status": revenue_schedule.status,
-                "created_at": revenue_schedule.created_at.isoformat() if revenue_schedule.created_at else None
-            } for revenue_schedule in self.revenue_schedule],
+                "contract_id": row.contract_id,
+                "obligation_name": row.obligation_name,
+                "period_start": row.period_start.isoformat() if row.period_start else None,
+                "period_end": row.period_end.isoformat() if row.period_end else None,
+                "amount": row.amount,
+                "recognition_method": row.recognition_method,
+                "status": row.status,
+                "created_at": row.created_at.isoformat() if row.created_at else None
+            } for row in self.revenue_schedule]
+            
+        return {
+            "message": message,
+            "contract_data": self.contract_data,
+            "revenue_schedule": revenue_schedule,
             "total_discount_amount": self.discount_handler.total_discount_amount,
             "discounts_applied": len(self.discount_handler.discounts),
             "performance_obligations_count": len(self.performance_obligations),
+            "variable_considerations_count": len(self.variable_consideration_handler.variable_considerations),
         }
         
                
     def _process_performance_obligations(self) -> None:
-        """Process and validate performance obligations"""
-        for obligation_data in self.contract_data["performance_obligations"]:
-            obligation = PerformanceObligationModel(
-                name=obligation_data["name"],
-                type=obligation_data["type"],
-                standalone_price=obligation_data["ssp"],
-                allocated_amount=obligation_data["allocated_value"],
-                recognition_method=obligation_data["revenue_recognition_method"],
-                recognition_trigger=obligation_data["recognition_trigger"],
-                recognition_period=obligation_data.get("recognition_period", {}),
-                milestones=obligation_data.get("milestones", []),
-            )
+        """Process and validate performance obligations, reusing the ones prepared ahead"""
+        for key, obligation_data in enumerate(self.contract_data["performance_obligations"]):
+            prepared = self._prepared_obligations.get(key)
+            if prepared is not None and prepared[0] == obligation_data:
+                obligation = prepared[1]
+            else:
+                obligation = self._obligation_model(key, obligation_data)
             self.performance_obligations.append(obligation)
             
+    def _obligation_model(self, key: int, obligation_data: Dict[str, Any]) -> PerformanceObligationModel:
+        return PerformanceObligationModel(
+            name=obligation_data["name"],
+            type=obligation_data["type"],
+            standalone_price=obligation_data["ssp"],
+            allocated_amount=obligation_data["allocated_value"],
+            recognition_method=obligation_data["revenue_recognition_method"],
+            recognition_trigger=obligation_data["recognition_trigger"],
+            recognition_period=obligation_data.get("recognition_period", {}),
+            milestones=obligation_data.get("milestones", []),
+            key=key,
+        )
             
     def _generate_revenue_schedule(self) -> None:
         """Generate revenue schedule based on ASC 606 rules"""
-        self.revenue_schedule_generator = RevenueScheduleGenerator(self.contract_data)
+        self.revenue_schedule_generator = RevenueScheduleGenerator(self.contract_data, self.fiscal_calendar, self._planned_periods)
         self.revenue_schedule = self.revenue_schedule_generator.generate_schedule(self.performance_obligations)
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+ASC 606 Fiscal Calendars
+
+This module contains the fiscal calendars used to cut revenue schedules into reporting periods.
+
+Supported calendars:
+- Calendar months, optionally with a fiscal year starting in another month
+- 4-4-5, 4-5-4 and 5-4-4 week-based calendars
+- 13-period calendars of four-week periods
+
+Each calendar precomputes a table of period, quarter and year boundaries once, shared by all
+equal calendar instances. Boundaries are then looked up by binary search.
+"""
+
+import calendar
+import os
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import List, Tuple
+
+FIRST_FISCAL_YEAR = 1950
+LAST_FISCAL_YEAR = 2150
+
+PERIOD_UNITS = ["period", "quarter", "year"]
+
+WEEK_PATTERNS = {
+    "4-4-5": (4, 4, 5),
+    "4-5-4": (4, 5, 4),
+    "5-4-4": (5, 4, 4),
+}
+
+SATURDAY = 5
+
+
+@dataclass(frozen=True)
+class PeriodTable:
+    """Sorted boundary ordinals per unit; each list ends with the start of the period after the table"""
+    period: Tuple[int, ...]
+    quarter: Tuple[int, ...]
+    year: Tuple[int, ...]
+
+
+class FiscalCalendar:
+    """
+    Base class for fiscal calendars.
+
+    Subclasses describe a fiscal year through `fiscal_year_periods` and `quarter_sizes`;
+    boundary lookups are shared.
+    """
+
+    quarter_sizes: Tuple[int, ...] = (3, 3, 3, 3)
+
+    def fiscal_year_periods(self, fiscal_year: int) -> List[date]:
+        """Start dates of the periods of a fiscal year"""
+        raise NotImplementedError
+
+    @property
+    def table(self) -> PeriodTable:
+        return _period_table(self)
+
+    def periods(self, start_date: date, end_date: date, unit: str = "period", every: int = 1) -> List[Tuple[date, date]]:
+        """
+        Split [start_date, end_date] at the calendar's period, quarter or year boundaries.
+
+        With `every` > 1, consecutive units are grouped, starting from the unit containing
+        `start_date`. The first and last periods are clipped to the date range.
+        """
+        if unit not in PERIOD_UNITS:
+            raise ValueError(f"Unsupported period unit: {unit}")
+        if every <= 0:
+            raise ValueError("Period grouping must be positive")
+
+        boundaries = getattr(self.table, unit)
+        start, end = start_date.toordinal(), end_date.toordinal()
+        index = bisect_right(boundaries, start) - 1
+        if index < 0 or end >= boundaries[-1]:
+            raise ValueError(f"Dates outside the fiscal calendar range: {start_date} - {end_date}")
+
+        periods = []
+        current = start
+        while current <= end:
+            index = min(index + every, len(boundaries) - 1)
+            next_start = boundaries[index]
+            periods.append((date.fromordinal(current), date.fromordinal(min(next_start - 1, end))))
+            current = next_start
+
+        return periods
+
+    def period_containing(self, day: date, unit: str = "period") -> Tuple[date, date]:
+        """Start and end of the calendar unit containing a date"""
+        boundaries = getattr(self.table, unit)
+        index = bisect_right(boundaries, day.toordinal()) - 1
+        if index < 0 or index >= len(boundaries) - 1:
+            raise ValueError(f"Date outside the fiscal calendar range: {day}")
+        return date.fromordinal(boundaries[index]), date.fromordinal(boundaries[index + 1] - 1)
+
+
+@dataclass(frozen=True)
+class MonthlyFiscalCalendar(FiscalCalendar):
+    """Calendar months, with the fiscal year starting in `start_month`"""
+    start_month: int = 1
+
+    def fiscal_year_periods(self, fiscal_year: int) -> List[date]:
+        periods = []
+        for offset in range(12):
+            month_index = self.start_month - 1 + offset
+            periods.append(date(fiscal_year + month_index // 12, month_index % 12 + 1, 1))
+        return periods
+
+
+@dataclass(frozen=True)
+class WeeklyFiscalCalendar(FiscalCalendar):
+    """
+    52/53-week fiscal year ending on the last `week_end_day` of the month before `start_month`.
+
+    The year is split into four quarters of 13 weeks following `pattern` (e.g. 4-4-5). In
+    53-week years the extra week goes to the last period.
+    """
+    pattern: Tuple[int, int, int] = (4, 4, 5)
+    start_month: int = 1
+    week_end_day: int = SATURDAY
+
+    def _year_end(self, fiscal_year: int) -> date:
+        end_month = (self.start_month - 2) % 12 + 1
+        end_year = fiscal_year if self.start_month == 1 else fiscal_year + 1
+        last_day = date(end_year, end_month, calendar.monthrange(end_year, end_month)[1])
+        return last_day - timedelta(days=(last_day.weekday() - self.week_end_day) % 7)
+
+    def _period_weeks(self) -> List[int]:
+        return list(self.pattern) * 4
+
+    def fiscal_year_periods(self, fiscal_year: int) -> List[date]:
+        year_start = self._year_end(fiscal_year - 1) + timedelta(days=1)
+        periods = []
+        current = year_start
+        for weeks in self._period_weeks():
+            periods.append(current)
+            current += timedelta(weeks=weeks)
+        return periods
+
+
+@dataclass(frozen=True)
+class ThirteenPeriodFiscalCalendar(WeeklyFiscalCalendar):
+    """52/53-week fiscal year of thirteen four-week periods, with quarters of 3-3-3-4 periods"""
+    quarter_sizes = (3, 3, 3, 4)
+
+    def _period_weeks(self) -> List[int]:
+        return [4] * 13
+
+
+@lru_cache(maxsize=None)
+def _period_table(fiscal_calendar: FiscalCalendar) -> PeriodTable:
+    """Precompute the boundary table of a calendar, once per distinct calendar"""
+    periods, quarters, years = [], [], []
+    for fiscal_year in range(FIRST_FISCAL_YEAR, LAST_FISCAL_YEAR + 1):
+        year_periods = [day.toordinal() for day in fiscal_calendar.fiscal_year_periods(fiscal_year)]
+        years.append(year_periods[0])
+        offset = 0
+        for size in fiscal_calendar.quarter_sizes:
+            quarters.append(year_periods[offset])
+            offset += size
+        periods.extend(year_periods)
+
+    table_end = fiscal_calendar.fiscal_year_periods(LAST_FISCAL_YEAR + 1)[0].toordinal()
+    return PeriodTable(
+        period=tuple(periods + [table_end]),
+        quarter=tuple(quarters + [table_end]),
+        year=tuple(years + [table_end]),
+    )
+
+
+def fiscal_calendar_from_string(spec: str) -> FiscalCalendar:
+    """
+    Build a calendar from a `<kind>[:<start month>]` spec.
+
+    Kinds: `monthly`, `4-4-5`, `4-5-4`, `5-4-4` and `13-period`, e.g. `4-4-5:2` for a
+    4-4-5 year starting in February.
+    """
+    kind, _, start_month = spec.strip().partition(":")
+    start_month = int(start_month) if start_month else 1
+    if not 1 <= start_month <= 12:
+        raise ValueError(f"Invalid fiscal year start month: {start_month}")
+
+    if kind == "monthly":
+        return MonthlyFiscalCalendar(start_month=start_month)
+    if kind in WEEK_PATTERNS:
+        return WeeklyFiscalCalendar(pattern=WEEK_PATTERNS[kind], start_month=start_month)
+    if kind == "13-period":
+        return ThirteenPeriodFiscalCalendar(start_month=start_month)
+    raise ValueError(f"Unsupported fiscal calendar: {spec}")
+
+
+@lru_cache(maxsize=1)
+def get_default_fiscal_calendar() -> FiscalCalendar:
+    """The calendar configured through the FISCAL_CALENDAR environment variable (calendar months by default)"""
+    return fiscal_calendar_from_string(os.getenv("FISCAL_CALENDAR", "monthly"))
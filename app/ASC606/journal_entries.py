@@ -0,0 +1,76 @@
+"""
+ASC 606 Journal Entry Generator
+
+This module turns the revenue recognized in a close period into balanced journal entries,
+moving each obligation's recognized amount out of deferred revenue and into revenue.
+"""
+
+import calendar
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from app.ASC606.models import JournalEntryLineModel
+
+DEFERRED_REVENUE_ACCOUNT = "Deferred Revenue"
+REVENUE_ACCOUNT = "Revenue"
+
+
+def parse_close_period(close_period: str) -> Tuple[date, date]:
+    """Parse a close period in YYYY-MM format into its first and last day"""
+    try:
+        year, month = (int(part) for part in close_period.split("-"))
+        period_start = date(year, month, 1)
+    except ValueError:
+        raise ValueError(f"Invalid close period, expected YYYY-MM: {close_period}")
+    
+    return period_start, date(year, month, calendar.monthrange(year, month)[1])
+
+
+class JournalEntryGenerator:
+    """
+    Generates deferred revenue → revenue journal entries for a close period.
+    """
+    
+    def __init__(self, close_period: str):
+        self.close_period = close_period
+        self.period_start, self.period_end = parse_close_period(close_period)
+        
+        
+    def generate(self, recognized_amounts: Iterable[Tuple[int, Optional[int], float]]) -> List[JournalEntryLineModel]:
+        """
+        Generate balanced journal entry lines from (contract_id, obligation_id, amount) rows.
+        
+        Each row becomes one entry with a debit to deferred revenue and a matching credit to
+        revenue. Negative amounts (reversals) swap the sides so both lines stay positive.
+        """
+        lines = []
+        for contract_id, obligation_id, amount in recognized_amounts:
+            amount = round(amount or 0, 2)
+            if amount == 0:
+                continue
+            
+            entry_id = f"JE-{self.close_period}-{contract_id}-{obligation_id or 0}"
+            description = f"Revenue recognized for {self.close_period}"
+            debit_account, credit_account = DEFERRED_REVENUE_ACCOUNT, REVENUE_ACCOUNT
+            if amount < 0:
+                debit_account, credit_account = credit_account, debit_account
+                amount = -amount
+            
+            lines.append(self._line(entry_id, contract_id, obligation_id, debit_account, amount, 0.0, description))
+            lines.append(self._line(entry_id, contract_id, obligation_id, credit_account, 0.0, amount, description))
+            
+        return lines
+    
+    
+    def _line(self, entry_id: str, contract_id: int, obligation_id: Optional[int], account: str, debit: float, credit: float, description: str) -> JournalEntryLineModel:
+        return JournalEntryLineModel(
+            close_period=self.close_period,
+            entry_id=entry_id,
+            contract_id=contract_id,
+            obligation_id=obligation_id,
+            entry_date=self.period_end,
+            account=account,
+            debit=debit,
+            credit=credit,
+            description=description,
+        )
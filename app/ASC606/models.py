@@ -2,11 +2,20 @@
 ASC 606 Data Models
 
 This module contains all the dataclasses and models used in the ASC 606 revenue recognition engine.
+
+Revenue schedule rows are the most numerous objects the engine creates, so they use slots
+and share their strings and creation time. `RevenueScheduleColumns` holds a whole schedule
+as parallel arrays for callers that process many rows at once.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import date, datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic_core import to_jsonable_python
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
 
 
 @dataclass
@@ -21,6 +30,8 @@ class PerformanceObligationModel:
     recognition_period: Optional[Dict[str, str]]
     milestones: List[Dict[str, str]]
     discount_applied: float = 0.0
+    # Position of the obligation in the contract's performance obligations
+    key: Optional[int] = None
     
     
     
@@ -36,6 +47,15 @@ class DiscountModel:
     
     
 @dataclass
+class VariableConsiderationModel:
+    """Represents usage-based variable consideration billed per unit above an allowance"""
+    name: str
+    metric: str
+    unit_price: float
+    included_quantity: float = 0.0
+    
+    
+@dataclass(slots=True)
 class RevenueScheduleModel:
     """Represents a single revenue recognition entry"""
     contract_id: str
@@ -45,4 +65,183 @@ class RevenueScheduleModel:
     amount: float
     recognition_method: str
     status: str
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+    obligation_key: Optional[int] = None
+    
+    
+@dataclass
+class RevenueScheduleColumns:
+    """
+    A revenue schedule as parallel arrays, one entry per row in each.
+    
+    Dates are `datetime64[D]` arrays and amounts a float64 array; the string columns are lists
+    of shared strings. The contract id and creation time are the same for every row.
+    `obligation_key` holds each row's obligation key, or -1 for rows without an obligation.
+    """
+    contract_id: Optional[str]
+    created_at: Optional[datetime]
+    obligation_name: List[str]
+    period_start: np.ndarray
+    period_end: np.ndarray
+    amount: np.ndarray
+    recognition_method: List[str]
+    status: List[str]
+    obligation_key: Optional[np.ndarray] = None
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[RevenueScheduleModel], contract_id: Optional[str] = None) -> "RevenueScheduleColumns":
+        # numpy converts date objects one by one through a slow path; day ordinals are much faster
+        count = len(rows)
+        return cls(
+            contract_id=rows[0].contract_id if rows else contract_id,
+            created_at=rows[0].created_at if rows else None,
+            obligation_name=[row.obligation_name for row in rows],
+            period_start=(np.fromiter((row.period_start.toordinal() for row in rows), np.int64, count) - _EPOCH_ORDINAL).astype("datetime64[D]"),
+            period_end=(np.fromiter((row.period_end.toordinal() for row in rows), np.int64, count) - _EPOCH_ORDINAL).astype("datetime64[D]"),
+            amount=np.fromiter((row.amount for row in rows), np.float64, count),
+            recognition_method=[row.recognition_method for row in rows],
+            status=[row.status for row in rows],
+            obligation_key=np.fromiter((-1 if row.obligation_key is None else row.obligation_key for row in rows), np.int64, count),
+        )
+        
+    def __len__(self) -> int:
+        return len(self.obligation_name)
+    
+    def rows(self) -> Iterator[RevenueScheduleModel]:
+        """Rebuild the schedule rows"""
+        keys = self.obligation_key.tolist() if self.obligation_key is not None else [-1] * len(self)
+        for name, start, end, amount, method, status, key in zip(
+            self.obligation_name, self.period_start.tolist(), self.period_end.tolist(),
+            self.amount.tolist(), self.recognition_method, self.status, keys,
+        ):
+            yield RevenueScheduleModel(
+                self.contract_id, name, start, end, amount, method, status, self.created_at, None if key < 0 else key
+            )
+            
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready columns, restored by `from_dict`"""
+        return {
+            "contract_id": self.contract_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "obligation_name": self.obligation_name,
+            "period_start": np.datetime_as_string(self.period_start).tolist(),
+            "period_end": np.datetime_as_string(self.period_end).tolist(),
+            "amount": self.amount.tolist(),
+            "recognition_method": self.recognition_method,
+            "status": self.status,
+            "obligation_key": self.obligation_key.tolist() if self.obligation_key is not None else None,
+        }
+        
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RevenueScheduleColumns":
+        return cls(
+            contract_id=data["contract_id"],
+            created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+            obligation_name=data["obligation_name"],
+            period_start=np.array(data["period_start"], dtype="datetime64[D]"),
+            period_end=np.array(data["period_end"], dtype="datetime64[D]"),
+            amount=np.array(data["amount"], dtype=np.float64),
+            recognition_method=data["recognition_method"],
+            status=data["status"],
+            obligation_key=np.array(data["obligation_key"], dtype=np.int64) if data["obligation_key"] is not None else None,
+        )
+        
+    def to_records(self) -> List[Dict[str, Any]]:
+        """The schedule as JSON-ready dicts, in the engine's records result format"""
+        created_at = self.created_at.isoformat() if self.created_at else None
+        return [
+            {
+                "contract_id": self.contract_id,
+                "obligation_name": name,
+                "period_start": start,
+                "period_end": end,
+                "amount": amount,
+                "recognition_method": method,
+                "status": status,
+                "created_at": created_at,
+            }
+            for name, start, end, amount, method, status in zip(
+                self.obligation_name, np.datetime_as_string(self.period_start).tolist(),
+                np.datetime_as_string(self.period_end).tolist(), self.amount.tolist(),
+                self.recognition_method, self.status,
+            )
+        ]
+        
+    def period_totals(self) -> List[Tuple[date, date, float, List[str], List[str]]]:
+        """
+        Total amount, recognition methods and statuses per (period start, period end), in
+        first-seen period order.
+        """
+        if not len(self):
+            return []
+        periods = np.stack([self.period_start.astype(np.int64), self.period_end.astype(np.int64)], axis=1)
+        unique, first, inverse = np.unique(periods, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        totals = np.bincount(inverse, weights=self.amount, minlength=len(unique))
+        
+        methods: List[set] = [set() for _ in unique]
+        statuses: List[set] = [set() for _ in unique]
+        for group, method, status in zip(inverse.tolist(), self.recognition_method, self.status):
+            methods[group].add(method)
+            statuses[group].add(status)
+            
+        return [
+            (
+                self.period_start[first[group]].item(),
+                self.period_end[first[group]].item(),
+                float(totals[group]),
+                sorted(methods[group]),
+                sorted(statuses[group]),
+            )
+            for group in np.argsort(first, kind="stable").tolist()
+        ]
+    
+    
+@dataclass
+class RecognitionResult:
+    """
+    Typed engine result, keeping native dates and amounts.
+    
+    Obligations are in the order of the contract's performance obligations, so an obligation's
+    key is also its index here and in the extracted contract.
+    """
+    message: str
+    contract_id: Optional[str]
+    performance_obligations: List[PerformanceObligationModel]
+    revenue_schedule: RevenueScheduleColumns
+    total_discount_amount: float
+    discounts_applied: int
+    variable_considerations_count: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-ready result, restored by `from_dict`.
+        
+        Dates inside obligation recognition periods and milestones become ISO strings.
+        """
+        data = {item.name: getattr(self, item.name) for item in fields(self)}
+        data["performance_obligations"] = to_jsonable_python(self.performance_obligations)
+        data["revenue_schedule"] = self.revenue_schedule.to_dict()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RecognitionResult":
+        return cls(**dict(
+            data,
+            performance_obligations=[PerformanceObligationModel(**obligation) for obligation in data["performance_obligations"]],
+            revenue_schedule=RevenueScheduleColumns.from_dict(data["revenue_schedule"]),
+        ))
+    
+    
+@dataclass
+class JournalEntryLineModel:
+    """Represents one debit or credit line of a revenue journal entry"""
+    close_period: str
+    entry_id: str
+    contract_id: int
+    obligation_id: Optional[int]
+    entry_date: date
+    account: str
+    debit: float
+    credit: float
+    description: str
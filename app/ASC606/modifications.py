@@ -0,0 +1,172 @@
+"""
+ASC 606 Contract Modification Handler
+
+This module applies contract modifications (ASC 606-10-25-10 to 25-13) to an existing
+revenue schedule without re-extracting the contract.
+
+A modification is a delta against the stored extraction: added, changed and removed
+performance obligations, added discounts and a new end date. Schedule rows whose period
+starts before the modification's effective date are kept as recognized. The rest of the
+schedule is replaced according to the accounting treatment:
+- prospective: the consideration not yet recognized is recognized over the remaining periods
+- cumulative catch-up: the schedule is recomputed from inception under the modified terms, and
+  the difference for periods before the effective date is recognized in one adjustment row on
+  the effective date
+"""
+
+import copy
+from dataclasses import replace
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from app.ASC606.fiscal_calendar import FiscalCalendar
+from app.ASC606.models import PerformanceObligationModel, RevenueScheduleModel
+from app.ASC606.money import from_cents, to_cents
+from app.ASC606.revenue_schedule import RevenueScheduleGenerator
+
+MODIFICATION_TREATMENTS = ["prospective", "cumulative_catch_up"]
+
+CATCH_UP_RECOGNITION_METHOD = "cumulative_catch_up"
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+def apply_modification_delta(contract_data: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge a modification delta into a copy of the contract data and return it.
+
+    Changed obligations only override the fields the delta sets. The total contract value is
+    re-derived from the allocated values.
+    """
+    contract = copy.deepcopy(contract_data)
+    obligations = {obligation["name"]: obligation for obligation in contract.get("performance_obligations", [])}
+
+    for name in delta.get("removed_obligations") or []:
+        if name not in obligations:
+            raise ValueError(f"Unknown performance obligation: {name}")
+        del obligations[name]
+
+    for change in delta.get("changed_obligations") or []:
+        obligation = obligations.get(change["name"])
+        if obligation is None:
+            raise ValueError(f"Unknown performance obligation: {change['name']}")
+        for field in ("ssp", "allocated_value"):
+            if change.get(field) is not None:
+                obligation[field] = change[field]
+        if change.get("frequency") and obligation.get("recognition_period"):
+            obligation["recognition_period"] = dict(obligation["recognition_period"], frequency=change["frequency"])
+
+    for obligation in delta.get("added_obligations") or []:
+        if obligation["name"] in obligations:
+            raise ValueError(f"Performance obligation already exists: {obligation['name']}")
+        obligations[obligation["name"]] = copy.deepcopy(obligation)
+
+    contract["performance_obligations"] = list(obligations.values())
+    contract["discounts"] = list(contract.get("discounts") or []) + copy.deepcopy(delta.get("added_discounts") or [])
+    if delta.get("end_date"):
+        contract["end_date"] = delta["end_date"]
+    contract["total_contract_value"] = round(sum(float(obligation.get("allocated_value") or 0) for obligation in obligations.values()), 2)
+
+    return contract
+
+
+class ContractModificationHandler:
+    """
+    Rebuilds a revenue schedule after a contract modification.
+    """
+
+    def __init__(self, effective_date: Any, accounting_treatment: str = "prospective", fiscal_calendar: Optional[FiscalCalendar] = None):
+        if accounting_treatment not in MODIFICATION_TREATMENTS:
+            raise ValueError(f"Unsupported modification accounting treatment: {accounting_treatment}")
+        self.effective_date = _as_date(effective_date)
+        self.accounting_treatment = accounting_treatment
+        self.fiscal_calendar = fiscal_calendar
+
+    def apply(
+        self,
+        contract_data: Dict[str, Any],
+        performance_obligations: List[PerformanceObligationModel],
+        original_schedule: List[RevenueScheduleModel],
+    ) -> List[RevenueScheduleModel]:
+        """Return the modified schedule: the rows kept from the original schedule followed by the new rows"""
+        contract_start = _as_date(contract_data["effective_date"])
+        end_date = _as_date(contract_data["end_date"])
+        effective_date = max(self.effective_date, contract_start)
+        if end_date and end_date < effective_date:
+            raise ValueError("The modified contract ends before the modification takes effect")
+
+        kept = [row for row in original_schedule if row.period_start < effective_date]
+        recognized: Dict[str, int] = {}
+        for row in kept:
+            recognized[row.obligation_name] = recognized.get(row.obligation_name, 0) + to_cents(row.amount)
+
+        if self.accounting_treatment == "prospective":
+            new_rows = self._prospective(contract_data, performance_obligations, recognized, effective_date)
+        else:
+            new_rows = self._cumulative_catch_up(contract_data, performance_obligations, recognized, effective_date)
+
+        return kept + new_rows
+
+    def _prospective(
+        self,
+        contract_data: Dict[str, Any],
+        performance_obligations: List[PerformanceObligationModel],
+        recognized: Dict[str, int],
+        effective_date: date,
+    ) -> List[RevenueScheduleModel]:
+        """Spread what is left of each obligation's allocated amount from the effective date on"""
+        remaining_obligations = []
+        for obligation in performance_obligations:
+            remaining = to_cents(obligation.allocated_amount) - recognized.get(obligation.name, 0)
+            if remaining == 0:
+                continue
+            remaining_obligations.append(replace(
+                obligation,
+                allocated_amount=from_cents(remaining),
+                milestones=[] if obligation.name in recognized else obligation.milestones,
+            ))
+
+        remaining_contract = dict(contract_data, effective_date=effective_date)
+        return RevenueScheduleGenerator(remaining_contract, self.fiscal_calendar).generate_schedule(remaining_obligations)
+
+    def _cumulative_catch_up(
+        self,
+        contract_data: Dict[str, Any],
+        performance_obligations: List[PerformanceObligationModel],
+        recognized: Dict[str, int],
+        effective_date: date,
+    ) -> List[RevenueScheduleModel]:
+        """Recompute from inception and true up the periods before the effective date in one row"""
+        schedule = RevenueScheduleGenerator(contract_data, self.fiscal_calendar).generate_schedule(performance_obligations)
+
+        should_have_recognized: Dict[str, int] = {}
+        new_rows = []
+        for row in schedule:
+            if row.period_start < effective_date:
+                should_have_recognized[row.obligation_name] = should_have_recognized.get(row.obligation_name, 0) + to_cents(row.amount)
+            else:
+                new_rows.append(row)
+
+        today = date.today()
+        created_at = datetime.now()
+        adjustments = []
+        for obligation in performance_obligations:
+            adjustment = should_have_recognized.get(obligation.name, 0) - recognized.get(obligation.name, 0)
+            if adjustment:
+                adjustments.append(RevenueScheduleModel(
+                    contract_id=contract_data["contract_id"],
+                    obligation_name=obligation.name,
+                    period_start=effective_date,
+                    period_end=effective_date,
+                    amount=from_cents(adjustment),
+                    recognition_method=CATCH_UP_RECOGNITION_METHOD,
+                    status="recognized" if effective_date <= today else "deferred",
+                    created_at=created_at,
+                    obligation_key=obligation.key
+                ))
+
+        return adjustments + new_rows
@@ -0,0 +1,118 @@
+"""
+ASC 606 Money Arithmetic
+
+This module keeps schedule and discount computations on integer cents.
+
+Amounts are split with the largest remainder method: every share gets the floor of its
+exact quota, and the cents left over go to the shares with the largest remainders. The
+shares therefore always sum back to the amount being split.
+"""
+
+from typing import Sequence, Union
+
+import numpy as np
+
+# Above this magnitude amount * weight could overflow int64, so allocation falls back to Python ints
+_INT64_SAFE_LIMIT = 2 ** 62
+
+
+def to_cents(amount: Union[int, float, None]) -> int:
+    """Convert a currency amount to integer cents"""
+    return int(round(float(amount or 0) * 100))
+
+
+def from_cents(cents: Union[int, np.integer]) -> float:
+    """Convert integer cents back to a currency amount"""
+    return int(cents) / 100
+
+
+def split_evenly(total_cents: int, count: int) -> np.ndarray:
+    """Split an amount into `count` equal shares, giving leftover cents to the first shares"""
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    base, extra = divmod(abs(total_cents), count)
+    shares = np.full(count, base, dtype=np.int64)
+    shares[:extra] += 1
+    return shares if total_cents >= 0 else -shares
+
+
+def allocate_cents(total_cents: int, weights: Sequence[int]) -> np.ndarray:
+    """
+    Allocate an amount across non-negative integer weights with the largest remainder method.
+    
+    Ties between equal remainders go to the earlier share. If all weights are zero the amount
+    is split evenly.
+    """
+    weights = np.asarray(weights, dtype=np.int64)
+    if len(weights) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if (weights < 0).any():
+        raise ValueError("Allocation weights must not be negative")
+    
+    weight_total = int(weights.sum())
+    if weight_total == 0:
+        return split_evenly(total_cents, len(weights))
+    
+    amount = abs(total_cents)
+    if amount * int(weights.max()) < _INT64_SAFE_LIMIT and weight_total < _INT64_SAFE_LIMIT:
+        quotas, remainders = np.divmod(weights * amount, weight_total)
+    else:
+        exact = [int(weight) * amount for weight in weights]
+        quotas = np.array([value // weight_total for value in exact], dtype=np.int64)
+        remainders = np.array([value % weight_total for value in exact], dtype=object)
+    
+    shortfall = amount - int(quotas.sum())
+    if shortfall:
+        quotas[np.argsort(-remainders, kind="stable")[:shortfall]] += 1
+        
+    return quotas if total_cents >= 0 else -quotas
+
+
+def allocate_cents_grouped(totals_cents: Sequence[int], weights: Sequence[int], group_sizes: Sequence[int]) -> np.ndarray:
+    """
+    Allocate several amounts at once, each across its own contiguous group of weights.
+    
+    `weights` holds the groups back to back, `group_sizes` their lengths and `totals_cents`
+    the amount of each group. Every group is allocated exactly like `allocate_cents`, but
+    the quotas, remainders and tie-breaks of all groups are computed as array operations.
+    """
+    totals = np.asarray(totals_cents, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.int64)
+    sizes = np.asarray(group_sizes, dtype=np.int64)
+    if len(totals) != len(sizes) or int(sizes.sum()) != len(weights):
+        raise ValueError("Group sizes do not match the totals and weights")
+    if (sizes <= 0).any():
+        raise ValueError("Allocation groups must not be empty")
+    if len(weights) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if (weights < 0).any():
+        raise ValueError("Allocation weights must not be negative")
+    
+    starts = np.cumsum(sizes) - sizes
+    group = np.repeat(np.arange(len(sizes)), sizes)
+    
+    # Groups without any weight are split evenly, like allocate_cents
+    weight_totals = np.add.reduceat(weights, starts)
+    unweighted = weight_totals == 0
+    if unweighted.any():
+        weights = np.where(unweighted[group], 1, weights)
+        weight_totals = np.where(unweighted, sizes, weight_totals)
+    
+    amounts = np.abs(totals)
+    if int(amounts.max()) * int(weights.max()) >= _INT64_SAFE_LIMIT or int(weight_totals.max()) >= _INT64_SAFE_LIMIT:
+        return np.concatenate([
+            allocate_cents(int(total), weights[start:start + size])
+            for total, start, size in zip(totals, starts, sizes)
+        ])
+    
+    quotas, remainders = np.divmod(weights * amounts[group], weight_totals[group])
+    shortfall = amounts - np.add.reduceat(quotas, starts)
+    
+    # Rank the shares of each group by descending remainder, earlier shares first on ties
+    order = np.lexsort((np.arange(len(weights)), -remainders, group))
+    rank = np.empty(len(weights), dtype=np.int64)
+    rank[order] = np.arange(len(weights)) - starts[group[order]]
+    quotas += rank < shortfall[group]
+    
+    return np.where(totals[group] >= 0, quotas, -quotas)
@@ -0,0 +1,101 @@
+"""
+ASC 606 Portfolio Processing
+
+This module runs the ASC 606 engine over a whole portfolio of contracts across a process pool.
+
+Contracts are read lazily from the input iterable and grouped into chunks, one chunk per
+work unit. Only a bounded number of chunks is in flight at a time, so arbitrarily large
+portfolios can be streamed through without loading them into memory.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.ASC606.engine import ASC606Engine
+from app.ASC606.fiscal_calendar import FiscalCalendar
+
+
+@dataclass
+class PortfolioResult:
+    """Outcome of processing one contract of a portfolio"""
+    index: int
+    contract_id: Optional[str]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _process_chunk(
+    chunk: List[Tuple[int, Dict[str, Any]]],
+    fiscal_calendar: Optional[FiscalCalendar] = None,
+    result_format: str = "records",
+) -> List[PortfolioResult]:
+    """Process a chunk of contracts, capturing failures per contract"""
+    results = []
+    for index, contract_data in chunk:
+        contract_id = contract_data.get("contract_id") if isinstance(contract_data, dict) else None
+        try:
+            result = ASC606Engine(fiscal_calendar).process_contract(contract_data, result_format=result_format)
+            results.append(PortfolioResult(index=index, contract_id=contract_id, result=result))
+        except Exception as e:
+            results.append(PortfolioResult(index=index, contract_id=contract_id, error=f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _chunks(contracts: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    indexed = enumerate(contracts)
+    while True:
+        chunk = list(islice(indexed, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def process_portfolio(
+    contracts: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    chunk_size: int = 100,
+    max_pending_chunks: Optional[int] = None,
+    fiscal_calendar: Optional[FiscalCalendar] = None,
+    result_format: str = "records",
+) -> Iterator[PortfolioResult]:
+    """
+    Run the ASC 606 engine over a portfolio of contracts, yielding results as they complete.
+    
+    Results arrive in completion order, not input order; `PortfolioResult.index` is the
+    position of the contract in the input. A contract that fails yields a result with
+    `error` set instead of aborting the batch. With `workers=1` the portfolio is processed
+    in the calling process. A `columnar` result format keeps each schedule as parallel arrays,
+    which is much cheaper to hold and to send back from the worker processes.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(contracts, chunk_size)
+    
+    if workers == 1:
+        for chunk in chunks:
+            yield from _process_chunk(chunk, fiscal_calendar, result_format)
+        return
+    
+    max_pending_chunks = max_pending_chunks or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(_process_chunk, chunk, fiscal_calendar, result_format))
+            if len(pending) >= max_pending_chunks:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
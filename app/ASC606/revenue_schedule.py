@@ -2,12 +2,31 @@
 ASC 606 Revenue Schedule Generator
 
 This module contains the main RevenueScheduleGenerator class that generates the revenue schedule for ASC 606 revenue recognition.
+Over-time obligations are cut into periods at the boundaries of a fiscal calendar, and the
+amounts of all their periods are allocated together in one array operation.
+
+Ratable methods:
+- even: every period gets the same share, including partial first and last periods
+- daily: every period's share is proportional to the days it covers
+
+Recognition periods can be planned per obligation ahead of `generate_schedule`, for example
+while the contract is still being extracted; planned periods are kept in a dict that can be
+shared with the generator that later builds the schedule.
 """
 
-import calendar
-from datetime import date, datetime, timedelta
-from typing import Any, Dict, List
+import sys
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.ASC606.fiscal_calendar import FiscalCalendar, get_default_fiscal_calendar
 from app.ASC606.models import PerformanceObligationModel, RevenueScheduleModel
+from app.ASC606.money import allocate_cents_grouped, from_cents, to_cents
+
+RATABLE_METHODS = ["even", "daily"]
+
+PlannedPeriods = Dict[Tuple[date, date, str], List[Tuple[date, date]]]
 
 
 class RevenueScheduleGenerator:
@@ -15,19 +34,25 @@ class RevenueScheduleGenerator:
     Generates the revenue schedule for ASC 606 revenue recognition.
     """
     
-    def __init__(self, contract_data: Dict[str, Any]):
+    def __init__(
+        self,
+        contract_data: Dict[str, Any],
+        fiscal_calendar: Optional[FiscalCalendar] = None,
+        planned_periods: Optional[PlannedPeriods] = None,
+    ):
         self.contract_data = contract_data
+        self.fiscal_calendar = fiscal_calendar or get_default_fiscal_calendar()
+        self.planned_periods = planned_periods if planned_periods is not None else {}
         self.revenue_schedule: List[RevenueScheduleModel] = []
+        # Every row of a run shares one creation time and one copy of each string
+        self.created_at = datetime.now()
+        contract_id = contract_data["contract_id"]
+        self.contract_id = sys.intern(contract_id) if isinstance(contract_id, str) else contract_id
+        self._ratable_obligations: List[Tuple[int, PerformanceObligationModel, List[Tuple[date, date]]]] = []
         
     def generate_schedule(self, performance_obligations: List[PerformanceObligationModel]) -> List[RevenueScheduleModel]:
         """Generate the revenue schedule for ASC 606 revenue recognition"""
-        effective_date = self.contract_data["effective_date"]
-        if isinstance(effective_date, str):
-            effective_date = datetime.strptime(effective_date, "%Y-%m-%d").date()
-        
-        end_date = self.contract_data["end_date"]
-        if isinstance(end_date, str):
-            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        effective_date, end_date = self._contract_dates()
         
         for obligation in performance_obligations:
             if obligation.recognition_method == "over_time":
@@ -37,35 +62,56 @@ class RevenueScheduleGenerator:
             else:
                 raise ValueError(f"Unsupported recognition method: {obligation.recognition_method}")
                 
+        self._append_ratable_entries()
         return self.revenue_schedule
     
+    def plan_periods(self, obligation: PerformanceObligationModel) -> None:
+        """Compute an over-time obligation's recognition periods ahead of `generate_schedule`"""
+        if obligation.recognition_method != "over_time" or not obligation.recognition_period:
+            return
+        effective_date, end_date = self._contract_dates()
+        self._periods(effective_date, end_date, obligation.recognition_period["frequency"])
+        
+    def _contract_dates(self) -> Tuple[date, date]:
+        effective_date = self.contract_data["effective_date"]
+        if isinstance(effective_date, str):
+            effective_date = datetime.strptime(effective_date, "%Y-%m-%d").date()
+        
+        end_date = self.contract_data["end_date"]
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        return effective_date, end_date
+    
     
     def _process_point_in_time_obligation(self, obligation: PerformanceObligationModel, effective_date: date, end_date: date) -> None:
         """Process point-in-time performance obligation"""
+        name = sys.intern(obligation.name)
         if obligation.milestones and len(obligation.milestones) > 0:
             for milestone in obligation.milestones:
                 milestone_amount = milestone.get("value", 0)
                 revenue_entry = RevenueScheduleModel(
-                    contract_id=self.contract_data["contract_id"],
-                    obligation_name=obligation.name,
+                    contract_id=self.contract_id,
+                    obligation_name=name,
                     period_start=effective_date,
                     period_end=effective_date,
-                    amount=round(milestone_amount, 2),
+                    amount=from_cents(to_cents(milestone_amount)),
                     recognition_method="point_in_time",
                     status="recognized",
-                    created_at=datetime.now()
+                    created_at=self.created_at,
+                    obligation_key=obligation.key
                 )
                 self.revenue_schedule.append(revenue_entry)
         else:
             revenue_entry = RevenueScheduleModel(
-                contract_id=self.contract_data["contract_id"],
-                obligation_name=obligation.name,
+                contract_id=self.contract_id,
+                obligation_name=name,
                 period_start=effective_date,
                 period_end=effective_date,
-                amount=round(obligation.allocated_amount, 2),
+                amount=from_cents(to_cents(obligation.allocated_amount)),
                 recognition_method="point_in_time",
                 status="recognized",
-                created_at=datetime.now()
+                created_at=self.created_at,
+                obligation_key=obligation.key
             )
             self.revenue_schedule.append(revenue_entry)
     
@@ -86,167 +132,86 @@ class RevenueScheduleGenerator:
         if period_start < effective_date or period_end > end_date:
             raise ValueError("Recognition period is outside the contract period")
             
+        periods = self._periods(period_start, period_end, frequency)
+            
+        ratable_method = obligation.recognition_period.get("ratable_method") or "even"
+        if ratable_method not in RATABLE_METHODS:
+            raise ValueError(f"Unsupported ratable method: {ratable_method}")
+            
+        # Entries are allocated for all obligations at once and inserted here afterwards
+        self._ratable_obligations.append((len(self.revenue_schedule), obligation, periods))
+            
+    def _periods(self, period_start: date, period_end: date, frequency: str) -> List[Tuple[date, date]]:
+        """Split a recognition period at the fiscal calendar boundaries for a frequency, reusing planned periods"""
+        key = (period_start, period_end, frequency)
+        periods = self.planned_periods.get(key)
+        if periods is not None:
+            return periods
+            
         if frequency == 'monthly':
-            self._generate_monthly_schedule(obligation, period_start, period_end)
+            periods = self.fiscal_calendar.periods(period_start, period_end, "period")
         elif frequency == 'quarterly':
-            self._generate_quarterly_schedule(obligation, period_start, period_end)
+            periods = self.fiscal_calendar.periods(period_start, period_end, "quarter")
         elif frequency == 'yearly':
-            self._generate_yearly_schedule(obligation, period_start, period_end)
+            periods = self.fiscal_calendar.periods(period_start, period_end, "year")
         elif frequency.startswith('every_'):
-            self._generate_custom_interval_schedule(obligation, period_start, period_end, frequency)
+            periods = self.fiscal_calendar.periods(period_start, period_end, "period", self._parse_interval(frequency))
         else:
             raise ValueError(f"Unsupported frequency: {frequency}")
-            
-    def _generate_monthly_schedule(self, obligation: PerformanceObligationModel, start_date: date, end_date: date) -> None:
-        """Generate monthly revenue schedule"""
-        # Calculate total months between start and end date
-        total_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1
-        monthly_amount = obligation.allocated_amount / total_months if total_months > 0 else 0
-
-        current_date = start_date
-        while current_date <= end_date:
-            next_month = self._add_months(current_date, 1)
-            period_end = next_month - timedelta(days=1)
-            if period_end > end_date:
-                period_end = end_date
-
-            revenue_entry = RevenueScheduleModel(
-                contract_id=self.contract_data["contract_id"],
-                obligation_name=obligation.name,
-                period_start=current_date,
-                period_end=period_end,
-                amount=round(monthly_amount, 2),
-                recognition_method=obligation.recognition_method,
-                status="recognized" if current_date <= date.today() else "deferred",
-                created_at=datetime.now()
-            )
-            self.revenue_schedule.append(revenue_entry)
-
-            # Move to next month
-            current_date = next_month
-            
-    
-    def _generate_quarterly_schedule(self, obligation: PerformanceObligationModel, start_date: date, end_date: date) -> None:
-        """Generate quarterly revenue schedule"""
+        self.planned_periods[key] = periods
+        return periods
         
-        # Calculate total quarters between start and end date
-        total_quarters = ((end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)) // 3 + 1
+    def _parse_interval(self, frequency: str) -> int:
+        """Parse a custom interval frequency like "every_3_months" into the number of fiscal periods"""
+        parts = frequency.split('_')
+        if len(parts) >= 3 and parts[0] == "every" and parts[2] == "months" and parts[1].isdigit() and int(parts[1]) > 0:
+            return int(parts[1])
+        raise ValueError(f"Unsupported frequency: {frequency}")
         
-        quarterly_amount = obligation.allocated_amount / total_quarters if total_quarters > 0 else 0
+    def _append_ratable_entries(self) -> None:
+        """
+        Spread each over-time obligation's allocated amount over its periods so the entries sum exactly to it.
         
-        current_date = start_date
-        while current_date <= end_date:
-            quarter_end = self._get_quarter_end(current_date)
-            if quarter_end > end_date:
-                quarter_end = end_date
-                
-            revenue_entry = RevenueScheduleModel(
-                contract_id=self.contract_data["contract_id"],
-                obligation_name=obligation.name,
-                period_start=current_date,
-                period_end=quarter_end,
-                amount=round(quarterly_amount, 2),
-                recognition_method=obligation.recognition_method,
-                status="recognized" if current_date <= date.today() else "deferred",
-                created_at=datetime.now()
-            )
-            
-            self.revenue_schedule.append(revenue_entry)
-            
-            # Move to next quarter
-            current_date = self._get_next_quarter_start(current_date)
-            
-    
-    def _generate_yearly_schedule(self, obligation: PerformanceObligationModel, start_date: date, end_date: date) -> None:
-        """Generate yearly revenue schedule"""
-        total_years = (end_date.year - start_date.year) + 1
-        yearly_amount = obligation.allocated_amount / total_years if total_years > 0 else 0
-        
-        current_date = start_date
-        while current_date <= end_date:
-            year_end = current_date.replace(month=12, day=31)
-            if year_end > end_date:
-                year_end = end_date
-                
-            revenue_entry = RevenueScheduleModel(
-                contract_id=self.contract_data["contract_id"],
-                obligation_name=obligation.name,
-                period_start=current_date,
-                period_end=year_end,
-                amount=round(yearly_amount, 2),
-                recognition_method=obligation.recognition_method,
-                status="recognized" if current_date <= date.today() else "deferred",
-                created_at=datetime.now()
-            )    
-            self.revenue_schedule.append(revenue_entry)
+        The periods of all obligations are weighted (one per period for the even method, days
+        covered for the daily method) and allocated with a single grouped largest remainder pass.
+        """
+        if not self._ratable_obligations:
+            return
             
-            # Move to next year
-            current_date = current_date.replace(year=current_date.year + 1)
-    
-    def _generate_custom_interval_schedule(self, obligation: PerformanceObligationModel, start_date: date, end_date: date, frequency: str) -> None:
-        """Generate custom interval revenue schedule"""
-        
-        # Parse frequency like "every_3_months"
-        parts = frequency.split('_')
-        if len(parts) >= 3 and parts[0] == "every" and parts[2] == "months":
-            interval_months = int(parts[1])
+        totals, sizes, daily, all_periods = [], [], [], []
+        for _, obligation, periods in self._ratable_obligations:
+            totals.append(to_cents(obligation.allocated_amount))
+            sizes.append(len(periods))
+            daily.append(obligation.recognition_period.get("ratable_method") == "daily")
+            all_periods.extend(periods)
             
-        # Calculate total periods
-        total_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1
-        total_periods = total_months // interval_months if interval_months > 0 else 0
-        period_amount = obligation.allocated_amount / total_periods if total_periods > 0 else 0
+        ordinals = np.array([(start.toordinal(), end.toordinal()) for start, end in all_periods], dtype=np.int64).reshape(-1, 2)
+        day_counts = ordinals[:, 1] - ordinals[:, 0] + 1
+        amounts = allocate_cents_grouped(totals, np.where(np.repeat(daily, sizes), day_counts, 1), sizes)
         
-        current_date = start_date
-        while current_date <= end_date:
-            # Calculate period end
-            period_end = self._add_months(current_date, interval_months) - timedelta(days=1)
-            if period_end > end_date:
-                period_end = end_date
-                
-            revenue_entry = RevenueScheduleModel(
-                contract_id=self.contract_data["contract_id"],
-                obligation_name=obligation.name,
-                period_start=current_date,
-                period_end=period_end,
-                amount=round(period_amount, 2),
-                recognition_method="over_time",
-                status="recognized" if current_date <= date.today() else "deferred",
-                created_at=datetime.now()
-            )
-            self.revenue_schedule.append(revenue_entry)
-            
-            # Move to next period
-            current_date = self._add_months(current_date, interval_months)
+        today = date.today()
+        offset = 0
+        entries = []
+        for (position, obligation, periods), size in zip(self._ratable_obligations, sizes):
+            name = sys.intern(obligation.name)
+            obligation_entries = [
+                RevenueScheduleModel(
+                    contract_id=self.contract_id,
+                    obligation_name=name,
+                    period_start=period_start,
+                    period_end=period_end,
+                    amount=from_cents(amount),
+                    recognition_method=obligation.recognition_method,
+                    status="recognized" if period_start <= today else "deferred",
+                    created_at=self.created_at,
+                    obligation_key=obligation.key
+                )
+                for (period_start, period_end), amount in zip(periods, amounts[offset:offset + size])
+            ]
+            entries.append((position, obligation_entries))
+            offset += size
             
-    def _get_next_quarter_start(self, date_obj: date) -> date:
-        """Get the start date of the next quarter"""
-        quarter = (date_obj.month - 1) // 3 + 1
-        if quarter == 1:
-            return date_obj.replace(month=4, day=1)
-        elif quarter == 2:
-            return date_obj.replace(month=7, day=1)
-        elif quarter == 3:
-            return date_obj.replace(month=10, day=1)
-        else:
-            return date_obj.replace(year=date_obj.year + 1, month=1, day=1)
-    
-    def _get_quarter_end(self, date_obj: date) -> date:
-        """Get the end date of the quarter for a given date"""
-        quarter = (date_obj.month - 1) // 3 + 1
-        if quarter == 1:
-            return date_obj.replace(month=3, day=31)
-        elif quarter == 2:
-            return date_obj.replace(month=6, day=30)
-        elif quarter == 3:
-            return date_obj.replace(month=9, day=30)
-        else:
-            return date_obj.replace(month=12, day=31)
-    
-    def _add_months(self, date_obj: date, months: int) -> date:
-        """Add specified number of months to a date using calendar to clamp day."""
-        month_index = date_obj.month - 1 + months
-        year = date_obj.year + month_index // 12
-        month = month_index % 12 + 1
-        last_day = calendar.monthrange(year, month)[1]
-        day = min(date_obj.day, last_day)
-        return date(year, month, day)
\ No newline at end of file
+        # Insert from the back so earlier positions stay valid
+        for position, obligation_entries in reversed(entries):
+            self.revenue_schedule[position:position] = obligation_entries
+        self._ratable_obligations = []
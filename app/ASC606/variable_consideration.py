@@ -0,0 +1,68 @@
+"""
+ASC 606 Variable Consideration Handler
+
+This module turns usage-based variable consideration into revenue schedule entries.
+
+Usage revenue is recognized in the period the usage occurs (the sales- and usage-based
+royalty exception, ASC 606-10-55-65). For each metered variable consideration, the revenue
+of a period is the usage above the included quantity times the unit price.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Tuple
+
+from app.ASC606.models import RevenueScheduleModel, VariableConsiderationModel
+from app.ASC606.money import from_cents, to_cents
+
+USAGE_RECOGNITION_METHOD = "usage_based"
+
+# (metric, period start, period end, quantity)
+UsageTotal = Tuple[str, date, date, float]
+
+
+class VariableConsiderationHandler:
+    """
+    Handles usage-based variable consideration for ASC 606 revenue recognition.
+    """
+    
+    def __init__(self):
+        self.variable_considerations: List[VariableConsiderationModel] = []
+        
+    def process_variable_considerations(self, contract_data: Dict) -> None:
+        """Collect the metered variable considerations; ones without a metric or unit price are left to judgment"""
+        for item in contract_data.get("variable_considerations") or []:
+            if not item.get("metric") or item.get("unit_price") is None:
+                continue
+            self.variable_considerations.append(VariableConsiderationModel(
+                name=item.get("name") or item["metric"],
+                metric=item["metric"],
+                unit_price=float(item["unit_price"]),
+                included_quantity=float(item.get("included_quantity") or 0),
+            ))
+            
+    def generate_usage_schedule(self, contract_id: str, usage: Iterable[UsageTotal]) -> List[RevenueScheduleModel]:
+        """Generate one revenue entry per variable consideration and usage period with billable usage"""
+        by_metric: Dict[str, List[VariableConsiderationModel]] = {}
+        for variable_consideration in self.variable_considerations:
+            by_metric.setdefault(variable_consideration.metric, []).append(variable_consideration)
+        
+        today = date.today()
+        created_at = datetime.now()
+        entries = []
+        for metric, period_start, period_end, quantity in sorted(usage, key=lambda total: (total[1], total[0])):
+            for variable_consideration in by_metric.get(metric, []):
+                billable = max(0.0, quantity - variable_consideration.included_quantity)
+                if not billable:
+                    continue
+                entries.append(RevenueScheduleModel(
+                    contract_id=contract_id,
+                    obligation_name=variable_consideration.name,
+                    period_start=period_start,
+                    period_end=period_end,
+                    amount=from_cents(to_cents(billable * variable_consideration.unit_price)),
+                    recognition_method=USAGE_RECOGNITION_METHOD,
+                    status="recognized" if period_start <= today else "deferred",
+                    created_at=created_at
+                ))
+                
+        return entries
@@ -0,0 +1,27 @@
+"""
+Audit Memo Module
+
+This module produces the ASC 606 audit memorandum for a processed contract.
+
+The contract data and revenue recognition output are normalized once into an `AuditMemo`
+data model, which is then rendered as Markdown, HTML or JSON by templates compiled once
+per process.
+"""
+
+from app.audit_memo.generator import AuditMemoGenerator, generate_audit_memo, get_structured_memo, get_memo_content_hash
+from app.audit_memo.models import AuditMemo, build_memo
+from app.audit_memo.renderer import SUPPORTED_FORMATS, bulk_render_memos, iter_render_memo, render_memo
+
+
+__all__ = [
+    'AuditMemo',
+    'AuditMemoGenerator',
+    'SUPPORTED_FORMATS',
+    'build_memo',
+    'bulk_render_memos',
+    'generate_audit_memo',
+    'get_memo_content_hash',
+    'get_structured_memo',
+    'iter_render_memo',
+    'render_memo',
+]
@@ -0,0 +1,63 @@
+"""
+Audit Memo Generator
+
+This module produces a formal, audit-compliant memorandum to document the revenue recognition assessment performed under ASC 606: Revenue from Contracts with Customers.
+
+Each memo summarizes the accounting treatment, allocation, and recognition logic for a given customer contract, ensuring transparency, traceability and compliance.
+"""
+
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.audit_memo.models import build_memo, format_currency
+from app.audit_memo.renderer import render_memo
+
+
+class AuditMemoGenerator:
+    """Generates detailed ASC 606-compliant audit memoranda."""
+
+    def __init__(self):
+        self.analysis_date = datetime.now().strftime("%Y-%m-%d")
+
+    def _safe_key(self, data: Dict, key: str, default: Any = "N/A"):
+        return data.get(key, default)
+
+    def _format_currency(self, value: Optional[float], currency: Optional[str] = None) -> str:
+        return format_currency(value, currency)
+
+
+    def get_audit_memo(self, contract_data: Dict[str, Any], revenue_result: Dict[str,Any], output_format: str = "markdown") -> str:
+        """
+        Generate an audit memorandum for the given contract and its revenue recognition output.
+
+        """
+        return render_memo(build_memo(contract_data, revenue_result), output_format)
+
+
+    def get_structured_memo(self, contract_data: Dict[str, Any], revenue_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate a JSON format of the audit memo.
+        """
+        return build_memo(contract_data, revenue_result).to_structured()
+
+
+def generate_audit_memo(contract_data: Dict[str, Any], revenue_result: Dict[str, Any]) -> str:
+    """Convenience wrapper for generating the audit memo."""
+    return AuditMemoGenerator().get_audit_memo(contract_data, revenue_result)
+
+def get_structured_memo(contract_data: Dict[str, Any], revenue_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate a JSON format of the audit memo.
+    """
+    return AuditMemoGenerator().get_structured_memo(contract_data, revenue_result)
+
+
+def get_memo_content_hash(structured_memo: Dict[str, Any]) -> str:
+    """
+    Compute a stable content hash of a structured memo, served as its ETag.
+    """
+    payload = json.dumps(structured_memo, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
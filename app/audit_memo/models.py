@@ -0,0 +1,354 @@
+"""
+Audit Memo Data Model
+
+This module contains the memo data model shared by every output format. The contract and
+revenue recognition output are normalized into it once, and the Markdown, HTML and JSON
+renderers only read from it.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Union
+
+from app.ASC606.models import RecognitionResult, RevenueScheduleColumns
+
+STANDARD = "ASC 606 - Revenue from Contracts with Customers"
+PREPARED_BY = "Automated Revenue Recognition System"
+REVIEWED_BY = "Revenue Accounting Manager (to be assigned)"
+ENGINE_VERSION = "ASC 606 Engine v1.0"
+
+CONTRACT_CRITERIA = [
+    "Approval and commitment by both parties",
+    "Clearly identifiable right and payment terms",
+    "Probable collection of consideration",
+]
+
+COMPLIANCE_ITEMS = [
+    "Contract identification confirmed (ASC 606-10-25-1)",
+    "Distinct performance obligations identified (ASC 606-10-25-19)",
+    "Transaction price properly allocated (ASC 606-10-32-28)",
+    "Revenue recognized upon satisfaction of performance obligations (ASC 606-10-25-30)",
+    "Variable consideration constrained until probable and estimable (ASC 606-10-32-11)",
+]
+
+JUDGMENT_ITEMS = [
+    "Implementation and training revenue recognized at point in time upon customer acceptance.",
+    "SaaS and PCS revenue recognized over time on a straight-line basis.",
+    "Variable consideration (usage-based add-ons) deferred until measurable.",
+]
+
+RISK_AREAS = [
+    {"area": "Contract Identification", "level": "High", "mitigation": "Documented in contract and system metadata"},
+    {"area": "Performance Obligation Identification", "level": "High", "mitigation": "System-driven identification with manual review"},
+    {"area": "Transaction Price Allocation", "level": "High", "mitigation": "SSP-based allocation with manual review"},
+    {"area": "Revenue Recognition Timing", "level": "High", "mitigation": "Method-specific triggers with manual review"},
+]
+
+SUMMARY_PERIOD_LIMIT = 10
+
+CURRENCY_SYMBOLS = {
+    "USD": "$",
+    "EUR": "€",
+    "GBP": "£",
+    "JPY": "¥",
+    "INR": "₹",
+    "CAD": "CA$",
+    "AUD": "A$",
+}
+
+
+def format_currency(value: Any, currency: Any = None) -> str:
+    """
+    Format an amount for display in the memo.
+
+    Known currencies use their symbol and other ISO codes prefix the amount; a missing or
+    unrecognized currency falls back to `$`.
+    """
+    if value is None:
+        return "-"
+
+    try:
+        amount = f"{float(value):,.2f}"
+    except (TypeError, ValueError):
+        return "-"
+
+    code = str(_text(currency, "")).strip().upper()
+    if code in CURRENCY_SYMBOLS:
+        return f"{CURRENCY_SYMBOLS[code]}{amount}"
+    if len(code) == 3 and code.isalpha():
+        return f"{code} {amount}"
+    return f"${amount}"
+
+
+def _text(value: Any, default: Any = "N/A") -> Any:
+    """Unwrap enum members and fall back to a default for missing values."""
+    if value is None:
+        return default
+    return getattr(value, "value", value)
+
+
+@dataclass
+class MemoObligation:
+    """A performance obligation as presented in the memo"""
+    index: int
+    name: str
+    type: str
+    recognition_method: str
+    ssp: float
+    allocated_value: float
+    percentage: float
+    recognition_trigger: str
+
+
+@dataclass
+class MemoNote:
+    """A variable consideration or discount line in the memo"""
+    name: Any
+    description: Any
+
+
+@dataclass
+class MemoSchedulePeriod:
+    """Revenue schedule entries grouped by period"""
+    period: str
+    total_amount: float
+    methods: List[str]
+    statuses: List[str]
+
+
+@dataclass
+class AuditMemo:
+    """Everything an audit memo renders, independent of the output format"""
+    contract_id: Any
+    provider: Any
+    customer: Any
+    total_value: Any
+    effective_date: Any
+    end_date: Any
+    currency: Any
+    analysis_date: str
+    memo_date: str
+    obligations: List[MemoObligation] = field(default_factory=list)
+    variable_considerations: List[Dict[str, Any]] = field(default_factory=list)
+    discounts: List[Dict[str, Any]] = field(default_factory=list)
+    schedule_entries: int = 0
+    schedule_periods: List[MemoSchedulePeriod] = field(default_factory=list)
+
+    @property
+    def variable_notes(self) -> List[MemoNote]:
+        return [MemoNote(item.get("name"), item.get("description")) for item in self.variable_considerations]
+
+    @property
+    def discount_notes(self) -> List[MemoNote]:
+        return [MemoNote(item.get("name"), item.get("description")) for item in self.discounts]
+
+    @property
+    def summary_periods(self) -> List[MemoSchedulePeriod]:
+        return self.schedule_periods[:SUMMARY_PERIOD_LIMIT]
+
+    @property
+    def has_more_periods(self) -> bool:
+        return len(self.schedule_periods) > SUMMARY_PERIOD_LIMIT
+
+    @property
+    def recognition_period(self) -> str:
+        return f"{self.effective_date} → {self.end_date}"
+
+    def to_structured(self) -> Dict[str, Any]:
+        """JSON representation of the memo, as served by the structured memo endpoint."""
+        total_price = format_currency(self.total_value, self.currency)
+
+        return {
+            "metadata": {
+                "standard": STANDARD,
+                "contract_id": self.contract_id,
+                "analysis_date": self.analysis_date,
+                "prepared_by": PREPARED_BY,
+                "version": ENGINE_VERSION
+            },
+            "purpose": {
+                "title": "Purpose of Memorandum",
+                "description": f"This memorandum documents the revenue recognition assessment for Contract {self.contract_id} between {self.provider} (\"the Provider\") and {self.customer} (\"the Customer\"). The assessment applies the five-step model prescribed under ASC 606, detailing the identification of performance obligations, determination and allocation of the transaction price, and the timing of revenue recognition."
+            },
+            "contract_summary": {
+                "title": "Contract Summary",
+                "provider": self.provider,
+                "customer": self.customer,
+                "contract_id": self.contract_id,
+                "effective_date": self.effective_date,
+                "end_date": self.end_date,
+                "total_consideration": total_price,
+                "currency": self.currency,
+                "description": "The contract provides the Customer with access to the Provider's financial automation platform along with implementation, support, training, and optional analytics modules."
+            },
+            "asc606_steps": {
+                "title": "ASC 606 Five-Step Framework",
+                "step1_contract": {
+                    "title": "Step 1: Identify the Contract",
+                    "description": "The agreement meets the criteria outlined in ASC 606-10-25-1 for contract existence:",
+                    "criteria": list(CONTRACT_CRITERIA)
+                },
+                "step2_obligations": {
+                    "title": "Step 2: Identify Performance Obligations",
+                    "description": "Distinct performance obligations were identified based on the contractual deliverables.",
+                    "obligations": [
+                        {
+                            "name": obligation.name,
+                            "type": obligation.type,
+                            "recognition_method": obligation.recognition_method,
+                            "ssp": obligation.ssp,
+                            "allocated_value": obligation.allocated_value,
+                            "recognition_trigger": obligation.recognition_trigger
+                        }
+                        for obligation in self.obligations
+                    ]
+                },
+                "step3_price": {
+                    "title": "Step 3: Determine the Transaction Price",
+                    "description": f"The total transaction price of {total_price} was determined based on contractual consideration, adjusted for variable components and discounts where applicable.",
+                    "total_price": total_price,
+                    "variable_considerations": self.variable_considerations,
+                    "discounts": self.discounts
+                },
+                "step4_allocation": {
+                    "title": "Step 4: Allocate the Transaction Price",
+                    "description": "In accordance with ASC 606-10-32-28, the transaction price was allocated to performance obligations based on their relative standalone selling prices (SSP).",
+                    "allocations": [
+                        {
+                            "obligation": obligation.name[:50],
+                            "ssp": obligation.ssp,
+                            "allocated_amount": obligation.allocated_value,
+                            "percentage": obligation.percentage
+                        }
+                        for obligation in self.obligations
+                    ]
+                },
+                "step5_recognition": {
+                    "title": "Step 5: Recognize Revenue",
+                    "description": "Revenue is recognized as control of the goods or services transfers to the Customer, in accordance with the recognition method prescribed for each performance obligation.",
+                    "recognition_details": [
+                        {
+                            "obligation": obligation.name[:50],
+                            "method": obligation.recognition_method,
+                            "timing": "As specified",
+                            "trigger": obligation.recognition_trigger
+                        }
+                        for obligation in self.obligations
+                    ]
+                }
+            },
+            "revenue_schedule": {
+                "title": "Revenue Recognition Schedule Summary",
+                "description": f"The system generated {self.schedule_entries} revenue recognition entries across the contract period.",
+                "total_entries": self.schedule_entries,
+                "periods": [
+                    {
+                        "period": period.period,
+                        "total_amount": period.total_amount,
+                        "methods": period.methods,
+                        "statuses": period.statuses
+                    }
+                    for period in self.summary_periods
+                ],
+                "total_periods": len(self.schedule_periods)
+            },
+            "accounting_assessment": {
+                "title": "Accounting Assessment",
+                "compliance": {
+                    "title": "Compliance with ASC 606 Principles",
+                    "items": list(COMPLIANCE_ITEMS)
+                },
+                "judgments": {
+                    "title": "Judgments Applied",
+                    "items": list(JUDGMENT_ITEMS)
+                }
+            },
+            "risk_assessment": {
+                "title": "Risk Assessment and Controls",
+                "areas": [dict(area) for area in RISK_AREAS]
+            },
+            "conclusion": {
+                "title": "Conclusion",
+                "summary": f"Based on the analysis above, the revenue recognition treatment for Contract {self.contract_id} is appropriate under ASC 606. The allocation, timing, and recognition of revenue are consistent with accounting policy and the nature of the contractual deliverables.",
+                "total_revenue": total_price,
+                "recognition_period": self.recognition_period,
+                "memo_date": self.memo_date,
+                "prepared_by": PREPARED_BY,
+                "reviewed_by": REVIEWED_BY
+            }
+        }
+
+
+def build_memo(contract_data: Dict[str, Any], revenue_result: Union[Dict[str, Any], RecognitionResult]) -> AuditMemo:
+    """
+    Normalize contract data and revenue recognition output into the memo data model.
+
+    The revenue recognition output may be a typed engine result or a result dict with the
+    schedule in either format, records or columnar.
+    """
+    now = datetime.now()
+    total_value = contract_data.get("total_contract_value", 0)
+
+    obligations = []
+    for i, obligation in enumerate(contract_data.get("performance_obligations", []), 1):
+        ssp = float(obligation.get("ssp", 0))
+        allocated = float(obligation.get("allocated_value", ssp))
+        obligations.append(MemoObligation(
+            index=i,
+            name=_text(obligation.get("name")),
+            type=_text(obligation.get("type")),
+            recognition_method=str(_text(obligation.get("revenue_recognition_method"), "")).replace("_", " ").title(),
+            ssp=ssp,
+            allocated_value=allocated,
+            percentage=(allocated / total_value * 100) if total_value else 0,
+            recognition_trigger=_text(obligation.get("recognition_trigger")),
+        ))
+
+    if isinstance(revenue_result, RecognitionResult):
+        schedule = revenue_result.revenue_schedule
+    else:
+        schedule = revenue_result.get("revenue_schedule", [])
+    if isinstance(schedule, RevenueScheduleColumns):
+        period_totals = schedule.period_totals()
+    else:
+        # Group schedule entries by period in a single pass, keeping first-seen period order
+        grouped: Dict[tuple, list] = {}
+        for row in schedule:
+            key = (row.get("period_start"), row.get("period_end"))
+            group = grouped.get(key)
+            if group is None:
+                group = grouped[key] = [0, set(), set()]
+            group[0] += row.get("amount", 0)
+            group[1].add(row.get("recognition_method", "-"))
+            group[2].add(row.get("status", "-"))
+        period_totals = [
+            (period_start, period_end, total_amount, sorted(methods), sorted(statuses))
+            for (period_start, period_end), (total_amount, methods, statuses) in grouped.items()
+        ]
+
+    schedule_periods = [
+        MemoSchedulePeriod(
+            period=f"{period_start} → {period_end}",
+            total_amount=total_amount,
+            methods=methods,
+            statuses=statuses,
+        )
+        for period_start, period_end, total_amount, methods, statuses in period_totals
+    ]
+
+    return AuditMemo(
+        contract_id=contract_data.get("contract_id", "N/A"),
+        provider=contract_data.get("provider", "N/A"),
+        customer=contract_data.get("customer", "N/A"),
+        total_value=total_value,
+        effective_date=contract_data.get("effective_date", "N/A"),
+        end_date=contract_data.get("end_date", "N/A"),
+        currency=contract_data.get("currency", "N/A"),
+        analysis_date=now.strftime("%Y-%m-%d"),
+        memo_date=now.strftime("%Y-%m-%d %H:%M:%S"),
+        obligations=obligations,
+        variable_considerations=contract_data.get("variable_considerations") or [],
+        discounts=contract_data.get("discounts") or [],
+        schedule_entries=len(schedule),
+        schedule_periods=schedule_periods,
+    )
@@ -0,0 +1,193 @@
+"""
+Audit Memo Renderer
+
+This module compiles the memo templates into Python generator functions and renders the
+memo data model as Markdown, HTML or JSON.
+
+Templates use a small subset of the Jinja syntax:
+- ``{{ name }}`` / ``{{ item.name|filter }}`` substitutes a value, optionally through filters
+- ``{% for item in items %}`` ... ``{% endfor %}`` repeats a block
+- ``{% if [not] name %}`` ... ``{% else %}`` ... ``{% endif %}`` renders a block conditionally
+
+Each template is compiled once per process. Rendering yields output chunks as it goes, so
+large memos can be streamed without building the whole document first.
+"""
+
+import html
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.audit_memo.models import AuditMemo, build_memo, format_currency
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+TEMPLATE_FILES = {
+    "markdown": "memo.md.tmpl",
+    "html": "memo.html.tmpl",
+}
+
+SUPPORTED_FORMATS = ["markdown", "html", "json"]
+
+# Filters receive the value and the memo being rendered
+FILTERS: Dict[str, Callable[[Any, AuditMemo], Any]] = {
+    "currency": lambda value, memo: format_currency(value, memo.currency),
+    "percent": lambda value, memo: f"{value:.1f}%",
+    "short": lambda value, memo: str(value)[:50],
+    "join": lambda value, memo: ", ".join(value),
+    "count": lambda value, memo: len(value),
+}
+
+# Block tags on their own line swallow the line, so templates can indent them freely
+TOKEN_PATTERN = re.compile(
+    r"(?m)^[ \t]*\{%\s*(?P<line_tag>.+?)\s*%\}[ \t]*\n?"
+    r"|\{%\s*(?P<tag>.+?)\s*%\}"
+    r"|\{\{\s*(?P<expr>.+?)\s*\}\}"
+)
+
+NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+class TemplateSyntaxError(ValueError):
+    """Raised when a memo template cannot be compiled."""
+
+
+def _compile_expression(expr: str, scope: List[str]) -> str:
+    """Translate a ``name.attr|filter`` expression into Python source."""
+    name, *filters = [part.strip() for part in expr.split("|")]
+    if not NAME_PATTERN.match(name):
+        raise TemplateSyntaxError(f"Invalid template expression: {expr}")
+
+    root = name.split(".")[0]
+    source = name if root in scope else f"memo.{name}"
+    for filter_name in filters:
+        if filter_name not in FILTERS:
+            raise TemplateSyntaxError(f"Unknown template filter: {filter_name}")
+        source = f"_filters[{filter_name!r}]({source}, memo)"
+
+    return source
+
+
+def compile_template(source: str, escape: bool = False) -> Callable[[AuditMemo], Iterator[str]]:
+    """
+    Compile template source into a generator function yielding output chunks.
+    """
+    lines = ["def _render(memo):"]
+    scope: List[str] = []
+    blocks: List[str] = []
+    parts: List[str] = []
+
+    def indent() -> str:
+        return "    " * (len(blocks) + 1)
+
+    def flush() -> None:
+        if parts:
+            lines.append(f"{indent()}yield ''.join(({', '.join(parts)},))")
+            parts.clear()
+
+    position = 0
+    for match in TOKEN_PATTERN.finditer(source):
+        if match.start() > position:
+            parts.append(repr(source[position:match.start()]))
+        position = match.end()
+
+        if match.group("expr"):
+            value = _compile_expression(match.group("expr"), scope)
+            parts.append(f"_escape(str({value}))" if escape else f"str({value})")
+            continue
+
+        flush()
+        tag = (match.group("line_tag") or match.group("tag")).split()
+        keyword = tag[0]
+
+        if keyword == "for" and len(tag) == 4 and tag[2] == "in":
+            lines.append(f"{indent()}for {tag[1]} in {_compile_expression(tag[3], scope)}:")
+            blocks.append("for")
+            scope.append(tag[1])
+            lines.append(f"{indent()}pass")
+        elif keyword == "if" and (len(tag) == 2 or (len(tag) == 3 and tag[1] == "not")):
+            negate = "not " if len(tag) == 3 else ""
+            lines.append(f"{indent()}if {negate}{_compile_expression(tag[-1], scope)}:")
+            blocks.append("if")
+            lines.append(f"{indent()}pass")
+        elif keyword == "else" and blocks and blocks[-1] == "if":
+            blocks.pop()
+            lines.append(f"{indent()}else:")
+            blocks.append("if")
+            lines.append(f"{indent()}pass")
+        elif keyword in ("endfor", "endif") and blocks and blocks[-1] == keyword[3:]:
+            if blocks.pop() == "for":
+                scope.pop()
+        else:
+            raise TemplateSyntaxError(f"Unexpected template tag: {' '.join(tag)}")
+
+    if position < len(source):
+        parts.append(repr(source[position:]))
+    flush()
+
+    if blocks:
+        raise TemplateSyntaxError(f"Unclosed template block: {blocks[-1]}")
+
+    namespace = {"_filters": FILTERS, "_escape": html.escape}
+    exec(compile("\n".join(lines), "<audit memo template>", "exec"), namespace)
+    return namespace["_render"]
+
+
+@lru_cache(maxsize=None)
+def get_template(output_format: str) -> Callable[[AuditMemo], Iterator[str]]:
+    """Load and compile the template for an output format, once per process."""
+    if output_format not in TEMPLATE_FILES:
+        raise ValueError(f"Unsupported memo format: {output_format}")
+
+    source = (TEMPLATE_DIR / TEMPLATE_FILES[output_format]).read_text(encoding="utf-8")
+    return compile_template(source, escape=output_format == "html")
+
+
+def iter_render_memo(memo: AuditMemo, output_format: str = "markdown") -> Iterator[str]:
+    """
+    Render a memo as a stream of output chunks.
+    """
+    if output_format == "json":
+        return json.JSONEncoder(default=str).iterencode(memo.to_structured())
+    if output_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported memo format: {output_format}")
+
+    return get_template(output_format)(memo)
+
+
+def render_memo(memo: AuditMemo, output_format: str = "markdown") -> str:
+    """Render a memo to a single string."""
+    return "".join(iter_render_memo(memo, output_format))
+
+
+def _render_job(job: Tuple[Dict[str, Any], Dict[str, Any], str]) -> str:
+    contract_data, revenue_result, output_format = job
+    return render_memo(build_memo(contract_data, revenue_result), output_format)
+
+
+def _warm_templates() -> None:
+    for output_format in TEMPLATE_FILES:
+        get_template(output_format)
+
+
+def bulk_render_memos(
+    memos: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]],
+    output_format: str = "markdown",
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+) -> Iterator[str]:
+    """
+    Re-render many memos across a process pool.
+
+    ``memos`` yields ``(contract_data, revenue_result)`` pairs. Rendered memos are yielded in
+    input order. Each worker compiles the templates once when it starts.
+    """
+    if output_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported memo format: {output_format}")
+
+    jobs = ((contract_data, revenue_result, output_format) for contract_data, revenue_result in memos)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_templates) as executor:
+        yield from executor.map(_render_job, jobs, chunksize=chunk_size)
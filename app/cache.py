@@ -0,0 +1,148 @@
+"""
+Response Cache
+
+A read-through Redis cache for the contract read endpoints, whose responses only change
+when a job writes the contract's results.
+
+Responses are stored as the rendered JSON body, zlib-compressed when larger than a few
+hundred bytes, under a key per contract and endpoint; a hit is returned as is, without a
+database query or JSON encoding. Jobs invalidate a contract's entries right after they
+commit new results for it. Entries also expire after RESPONSE_CACHE_TTL_SECONDS, which
+bounds how long a response rendered from data read just before a commit can be served.
+
+The cache is enabled by RESPONSE_CACHE_URL (e.g. redis://localhost:6379/1). When it is
+unset, or Redis cannot be reached, responses are built from the database as before.
+Hits, misses and errors are counted per endpoint in each process.
+"""
+
+import logging
+import os
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+logger = logging.getLogger(__name__)
+
+CACHED_ENDPOINTS = ["revenue-schedules", "audit-memos"]
+
+DEFAULT_TTL_SECONDS = 300
+KEY_PREFIX = "response:v1"
+COMPRESS_MIN_BYTES = 512
+
+# First byte of a stored entry: how the rest of it is encoded
+_PLAIN = b"j"
+_COMPRESSED = b"z"
+
+
+def encode_body(body: bytes) -> bytes:
+    if len(body) >= COMPRESS_MIN_BYTES:
+        return _COMPRESSED + zlib.compress(body, 1)
+    return _PLAIN + body
+
+
+def decode_body(entry: bytes) -> bytes:
+    if entry[:1] == _COMPRESSED:
+        return zlib.decompress(entry[1:])
+    return entry[1:]
+
+
+class ResponseCache:
+    """Cache of rendered JSON responses per contract and endpoint"""
+
+    def __init__(self, url: Optional[str], ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self._client = None
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Counter] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        return self._client
+
+    def key(self, contract_id: str, endpoint: str) -> str:
+        return f"{KEY_PREFIX}:{contract_id}:{endpoint}"
+
+    def read_through(self, contract_id: str, endpoint: str, build: Callable[[], Any]) -> Response:
+        """
+        The endpoint's response for a contract, from the cache or built by `build` and cached.
+
+        Exceptions raised by `build`, such as a 404, are not cached.
+        """
+        if not self.enabled:
+            return JSONResponse(content=jsonable_encoder(build()))
+
+        key = self.key(contract_id, endpoint)
+        try:
+            entry = self.client.get(key)
+        except Exception as e:
+            self._count(endpoint, "errors")
+            logger.warning("Response cache read failed: %s", e)
+            return JSONResponse(content=jsonable_encoder(build()))
+
+        if entry is not None:
+            self._count(endpoint, "hits")
+            return Response(content=decode_body(entry), media_type="application/json")
+
+        self._count(endpoint, "misses")
+        response = JSONResponse(content=jsonable_encoder(build()))
+        try:
+            self.client.set(key, encode_body(response.body), ex=self.ttl_seconds)
+        except Exception as e:
+            self._count(endpoint, "errors")
+            logger.warning("Response cache write failed: %s", e)
+        return response
+
+    def invalidate(self, contract_ids: Iterable[str]) -> None:
+        """Drop the cached responses of contracts whose results changed"""
+        if not self.enabled:
+            return
+        keys = [self.key(contract_id, endpoint) for contract_id in contract_ids if contract_id for endpoint in CACHED_ENDPOINTS]
+        if not keys:
+            return
+        try:
+            self.client.delete(*keys)
+        except Exception as e:
+            logger.error("Response cache invalidation failed, entries expire within %ds: %s", self.ttl_seconds, e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and error counts and hit ratios of this process, overall and per endpoint"""
+        with self._lock:
+            counts = {endpoint: Counter(counter) for endpoint, counter in self._counts.items()}
+        endpoints = {endpoint: _with_ratio(counter) for endpoint, counter in sorted(counts.items())}
+        return {
+            "enabled": self.enabled,
+            **_with_ratio(sum(counts.values(), Counter())),
+            "endpoints": endpoints,
+        }
+
+    def _count(self, endpoint: str, outcome: str) -> None:
+        with self._lock:
+            self._counts.setdefault(endpoint, Counter())[outcome] += 1
+
+
+def _with_ratio(counter: Counter) -> Dict[str, Any]:
+    lookups = counter["hits"] + counter["misses"]
+    return {
+        "hits": counter["hits"],
+        "misses": counter["misses"],
+        "errors": counter["errors"],
+        "hit_ratio": round(counter["hits"] / lookups, 4) if lookups else None,
+    }
+
+
+response_cache = ResponseCache(
+    os.getenv("RESPONSE_CACHE_URL"),
+    int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS))),
+)
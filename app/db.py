@@ -1,19 +1,21 @@
+import logging
 import os
 from sqlmodel import SQLModel, Session, create_engine
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-print('DATABASE_URL', os.getenv("DATABASE_URL"))
 DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True)
+SQL_ECHO = os.getenv("SQL_ECHO", "").lower() in ("1", "true", "yes")
+engine = create_engine(DATABASE_URL, echo=SQL_ECHO, pool_pre_ping=True)
 
 
 def init_db():
     "Create all tables in the database"
     SQLModel.metadata.create_all(engine)
-    print("Database initialized successfully")
+    logger.info("Database initialized successfully")
     
     
 def get_session():
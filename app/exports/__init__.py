@@ -0,0 +1,16 @@
+"""
+Exports package for bulk data extraction.
+
+This package contains the streaming exports used to feed downstream systems such as the ERP.
+"""
+
+from .revenue_schedules import EXPORT_COLUMNS, EXPORT_FORMATS, EXPORT_STATUSES, export_columns, stream_csv, stream_parquet
+
+__all__ = [
+    'EXPORT_COLUMNS',
+    'EXPORT_FORMATS',
+    'EXPORT_STATUSES',
+    'export_columns',
+    'stream_csv',
+    'stream_parquet',
+]
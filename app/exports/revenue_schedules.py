@@ -0,0 +1,204 @@
+"""
+Revenue Schedule Export
+
+This module streams revenue schedules for the whole portfolio as CSV or Parquet.
+
+Rows are read through a server-side cursor in fixed-size batches and written out batch by
+batch, so memory stays constant regardless of how many rows are exported.
+
+With a reporting currency, each batch's amounts are converted in one vectorized FX call and
+two extra columns, `reporting_currency` and `reporting_amount`, are written. Rows without an
+FX rate get an empty reporting amount.
+"""
+
+import csv
+import io
+from datetime import date
+from typing import Iterator, List, Optional
+
+from sqlmodel import select
+
+from app.db import get_session
+from app.fx import FxRateTable, get_fx_rates
+from app.models import Contract, ContractObligation, RevenueSchedule
+
+EXPORT_FORMATS = ["csv", "parquet"]
+
+EXPORT_STATUSES = ["recognized", "deferred"]
+
+EXPORT_COLUMNS = [
+    "contract_id",
+    "customer_name",
+    "currency",
+    "obligation_name",
+    "obligation_type",
+    "recognition_method",
+    "period_start",
+    "period_end",
+    "amount",
+    "status",
+]
+
+REPORTING_COLUMNS = ["reporting_currency", "reporting_amount"]
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def export_columns(reporting_currency: Optional[str] = None) -> List[str]:
+    """Columns of the export, with the reporting currency columns when converting."""
+    return EXPORT_COLUMNS + REPORTING_COLUMNS if reporting_currency else list(EXPORT_COLUMNS)
+
+
+def _export_query(
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    status: Optional[str] = None,
+    customer: Optional[str] = None,
+):
+    """Build the export query with the requested filters applied."""
+    query = (
+        select(
+            Contract.external_id,
+            Contract.customer_name,
+            Contract.currency,
+            ContractObligation.name,
+            ContractObligation.type,
+            ContractObligation.recognition_method,
+            RevenueSchedule.period_start,
+            RevenueSchedule.period_end,
+            RevenueSchedule.amount,
+            RevenueSchedule.recognized,
+        )
+        .join(Contract, RevenueSchedule.contract_id == Contract.id)
+        .join(ContractObligation, RevenueSchedule.obligation_id == ContractObligation.id, isouter=True)
+    )
+
+    if period_from:
+        query = query.where(RevenueSchedule.period_start >= period_from)
+    if period_to:
+        query = query.where(RevenueSchedule.period_start <= period_to)
+    if status:
+        query = query.where(RevenueSchedule.recognized == (status == "recognized"))
+    if customer:
+        query = query.where(Contract.customer_name == customer)
+
+    return query.order_by(RevenueSchedule.id)
+
+
+def _convert_batch(batch: List[tuple], fx_rates: FxRateTable, reporting_currency: str, fx_method: str) -> List[tuple]:
+    """Append the reporting currency and converted amount to every row of a batch."""
+    _, _, currencies, _, _, _, period_starts, period_ends, amounts, _ = zip(*batch)
+    converted = fx_rates.convert(
+        amounts, currencies, period_starts, period_ends, reporting_currency, method=fx_method, strict=False
+    ).tolist()
+    return [
+        row + (reporting_currency, None if amount != amount else amount)
+        for row, amount in zip(batch, converted)
+    ]
+
+
+def iter_schedule_batches(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    reporting_currency: Optional[str] = None,
+    fx_method: str = "period_end",
+    **filters,
+) -> Iterator[List[tuple]]:
+    """
+    Yield export rows in batches, read through a server-side cursor.
+    """
+    fx_rates = get_fx_rates() if reporting_currency else None
+    with next(get_session()) as session:
+        result = session.execute(
+            _export_query(**filters).execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for partition in result.partitions():
+            batch = [
+                (
+                    external_id,
+                    customer_name,
+                    currency,
+                    obligation_name,
+                    obligation_type,
+                    recognition_method,
+                    period_start,
+                    period_end,
+                    amount,
+                    "recognized" if recognized else "deferred",
+                )
+                for (external_id, customer_name, currency, obligation_name, obligation_type,
+                     recognition_method, period_start, period_end, amount, recognized) in partition
+            ]
+            yield _convert_batch(batch, fx_rates, reporting_currency, fx_method) if fx_rates else batch
+
+
+def stream_csv(batch_size: int = DEFAULT_BATCH_SIZE, **filters) -> Iterator[str]:
+    """Stream the export as CSV, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_columns(filters.get("reporting_currency")))
+
+    for batch in iter_schedule_batches(batch_size, **filters):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_parquet(batch_size: int = DEFAULT_BATCH_SIZE, **filters) -> Iterator[bytes]:
+    """Stream the export as Parquet, one row group per batch."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("contract_id", pa.string()),
+        ("customer_name", pa.string()),
+        ("currency", pa.string()),
+        ("obligation_name", pa.string()),
+        ("obligation_type", pa.string()),
+        ("recognition_method", pa.string()),
+        ("period_start", pa.date32()),
+        ("period_end", pa.date32()),
+        ("amount", pa.float64()),
+        ("status", pa.string()),
+    ])
+    if filters.get("reporting_currency"):
+        schema = schema.append(pa.field("reporting_currency", pa.string())).append(pa.field("reporting_amount", pa.float64()))
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in iter_schedule_batches(batch_size, **filters):
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+
+    yield sink.drain()
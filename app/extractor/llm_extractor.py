@@ -1,33 +1,103 @@
 import os
-import json
+import logging
 import re
+import sys
+import threading
 import time
+from typing import Any, Dict, Optional, Type
 import google.generativeai as genai
-from app.extractor.preprocess import clean_text, filter_relevant_sections, split_sections
-from app.extractor.prompts import get_revenue_recognition_prompt
-from app.extractor.schemas import ContractLLMResponseJsonSchema
+from pydantic import BaseModel
+from app.extractor.preprocess import build_section_index, clean_text, relevant_context
+from app.extractor.prompts import get_field_reextraction_prompt, get_modification_prompt, get_revenue_recognition_prompt
+from app.extractor.schemas import ContractLLMResponseJsonSchema, ContractModificationDelta
+from app.extractor.streaming import ItemCallback, StreamingJSONParser
+from app.tracing import span, traced
 
+logger = logging.getLogger(__name__)
 
-def extract_contract_data(raw_text: str, contract_id: str, llm_model="gemini-2.5-flash") -> ContractLLMResponseJsonSchema:
-    """Extract structured contract data using Gemini LLM and validate with Pydantic."""
+# Stream contract extractions by default, parsing obligations as they arrive
+GEMINI_STREAMING = os.getenv("GEMINI_STREAMING", "").lower() in ("1", "true", "yes")
+
+# The process's Gemini client: configured once, with a model per model name
+_client_lock = threading.Lock()
+_client_pid: Optional[int] = None
+_models: Dict[str, Any] = {}
+
+
+def init_gemini_client() -> None:
+    """
+    Configure the Gemini client of this process.
+    
+    Worker processes call this when they start, so every extraction they run shares one
+    client and its open connections instead of configuring a new one per call. A forked
+    process configures its own client, since gRPC channels do not survive a fork.
+    """
+    global _client_pid
     
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY environment variable is required")
     
-    genai.configure(api_key=api_key)
-    
-    cleaned = clean_text(raw_text)
-    sections = split_sections(cleaned)
-    relevant_sections = filter_relevant_sections(sections)
-    context = "\n\n".join(relevant_sections)
+    with _client_lock:
+        if _client_pid == os.getpid():
+            return
+        if _gevent_patched():
+            # gRPC blocks the whole process under gevent unless it runs on gevent's loop
+            from grpc.experimental import gevent as grpc_gevent
+            grpc_gevent.init_gevent()
+        genai.configure(api_key=api_key)
+        _models.clear()
+        _client_pid = os.getpid()
+
+
+def reset_gemini_client() -> None:
+    """Drop the configured client, so the next call configures it again"""
+    global _client_pid
+    with _client_lock:
+        _client_pid = None
+        _models.clear()
+
+
+def _gevent_patched() -> bool:
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("socket")
+
+
+def _get_model(llm_model: str) -> Any:
+    if _client_pid != os.getpid():
+        init_gemini_client()
+    model = _models.get(llm_model)
+    if model is None:
+        model = _models.setdefault(llm_model, genai.GenerativeModel(llm_model))
+    return model
+
+
+def _chunk_text(chunk: Any) -> str:
+    if not chunk.candidates:
+        return ""
+    return "".join(part.text for part in chunk.candidates[0].content.parts)
+
+
+def _generate_json(
+    prompt: str,
+    llm_model: str,
+    max_output_tokens: int,
+    schema: Type[BaseModel],
+    stream: bool = False,
+    item_field: Optional[str] = None,
+    on_item: Optional[ItemCallback] = None,
+) -> Any:
+    """
+    Run a prompt through Gemini and validate the JSON it returns, retrying with backoff.
     
-    prompt = get_revenue_recognition_prompt(context)
+    With `stream`, the response is parsed while it arrives and the elements of `item_field`
+    are validated and passed to `on_item` one by one, before the response is complete.
+    """
     
-    model = genai.GenerativeModel(llm_model)
+    model = _get_model(llm_model)
     generation_config = genai.types.GenerationConfig(
         temperature=0,
-        max_output_tokens=16384,
+        max_output_tokens=max_output_tokens,
     )
     
     max_retries = 3
@@ -36,25 +106,149 @@ def extract_contract_data(raw_text: str, contract_id: str, llm_model="gemini-2.5
     
     for attempt in range(1, max_retries + 1):
         try:
-            response = model.generate_content(
-                prompt,
-                generation_config=generation_config
-            )
+            if stream:
+                return _stream_json(model, prompt, generation_config, llm_model, attempt, schema, item_field, on_item)
             
-            print(f"Response: {response}")
-            text_output = response.candidates[0].content.parts[0].text.strip()
+            with span("gemini.generate_content", model=llm_model, attempt=attempt, prompt_chars=len(prompt)) as current:
+                response = model.generate_content(
+                    prompt,
+                    generation_config=generation_config
+                )
+                text_output = response.candidates[0].content.parts[0].text.strip()
+                if current:
+                    current.set_attribute("response_chars", len(text_output))
             
             match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text_output, re.DOTALL)
             response_json = match.group(1).strip() if match else text_output.strip()
-            json_output = json.loads(response_json)
             
-            validated = ContractLLMResponseJsonSchema(**json_output)
-            return validated
+            return schema.model_validate_json(response_json)
         
         except Exception as e:
             error = e
+            logger.warning("Gemini attempt %d/%d failed: %s", attempt, max_retries, e)
             if attempt < max_retries:
                 sleep_time = backoff_factor ** (attempt - 1)
-                time.sleep(sleep_time)
+                with span("gemini.backoff", seconds=sleep_time):
+                    time.sleep(sleep_time)
 
     raise ValueError(f"Failed to extract valid JSON after {max_retries} attempts. Last error: {error}")
+
+
+def _stream_json(
+    model: Any,
+    prompt: str,
+    generation_config: Any,
+    llm_model: str,
+    attempt: int,
+    schema: Type[BaseModel],
+    item_field: Optional[str],
+    on_item: Optional[ItemCallback],
+) -> Any:
+    """Stream one Gemini response through an incremental parser"""
+    parser = StreamingJSONParser(schema, item_field, on_item)
+    with span("gemini.stream_content", model=llm_model, attempt=attempt, prompt_chars=len(prompt)) as current:
+        started = time.perf_counter()
+        first_item_ms = None
+        response_chars = 0
+        for chunk in model.generate_content(prompt, generation_config=generation_config, stream=True):
+            text = _chunk_text(chunk)
+            response_chars += len(text)
+            if parser.feed(text) and first_item_ms is None:
+                first_item_ms = round((time.perf_counter() - started) * 1000, 3)
+        result = parser.finish()
+        if current:
+            current.set_attribute("response_chars", response_chars)
+            current.set_attribute("streamed_items", len(parser.items))
+            current.set_attribute("first_item_ms", first_item_ms)
+    return result
+
+
+def build_extraction_context(raw_text: str) -> str:
+    """Clean the contract text and keep the sections relevant to revenue recognition."""
+    
+    return relevant_context(build_section_index(raw_text))
+
+
+@traced("extract_contract_data")
+def extract_contract_data(
+    raw_text: str,
+    contract_id: str,
+    llm_model="gemini-2.5-flash",
+    stream: Optional[bool] = None,
+    on_obligation: Optional[ItemCallback] = None,
+    context: Optional[str] = None,
+) -> ContractLLMResponseJsonSchema:
+    """
+    Extract structured contract data using Gemini LLM and validate with Pydantic.
+    
+    `context` is the output of `build_extraction_context`, when it has been built already.
+    
+    When streaming (`stream`, defaulting to GEMINI_STREAMING), each performance obligation is
+    validated as soon as it is complete and passed to `on_obligation(index, obligation,
+    contract_terms)`, where `contract_terms` holds the contract fields that preceded the
+    obligations. A failed attempt is retried from the start, so indexes may repeat.
+    """
+    
+    if context is None:
+        context = build_extraction_context(raw_text)
+    
+    prompt = get_revenue_recognition_prompt(context)
+    
+    return _generate_json(
+        prompt,
+        llm_model,
+        16384,
+        ContractLLMResponseJsonSchema,
+        stream=GEMINI_STREAMING if stream is None else stream,
+        item_field="performance_obligations",
+        on_item=on_obligation,
+    )
+
+
+@traced("extract_modification_delta")
+def extract_modification_delta(amendment_text: str, contract_data: dict, llm_model="gemini-2.5-flash") -> ContractModificationDelta:
+    """
+    Extract only the changes an amendment makes to a contract.
+    
+    The prompt carries a compact summary of the current terms instead of the original
+    contract, and the response is limited to the delta, so it is much smaller than a full
+    extraction.
+    """
+    
+    current_terms = {
+        "effective_date": contract_data.get("effective_date"),
+        "end_date": contract_data.get("end_date"),
+        "currency": contract_data.get("currency"),
+        "total_contract_value": contract_data.get("total_contract_value"),
+        "performance_obligations": [
+            {
+                "name": obligation.get("name"),
+                "ssp": obligation.get("ssp"),
+                "allocated_value": obligation.get("allocated_value"),
+                "revenue_recognition_method": obligation.get("revenue_recognition_method"),
+            }
+            for obligation in contract_data.get("performance_obligations", [])
+        ],
+    }
+    prompt = get_modification_prompt(clean_text(amendment_text), current_terms)
+    
+    return _generate_json(prompt, llm_model, 2048, ContractModificationDelta)
+
+
+@traced("extract_contract_fields")
+def extract_contract_fields(
+    contract_sections: str,
+    current_values: dict,
+    schema: Type[BaseModel],
+    llm_model="gemini-2.5-flash",
+) -> BaseModel:
+    """
+    Re-extract some fields of a contract from the sections relevant to them.
+    
+    `schema` is the response model of the requested fields (see `field_correction_schema`)
+    and `current_values` the values they were first extracted with.
+    """
+    
+    prompt = get_field_reextraction_prompt(contract_sections, current_values, schema)
+    
+    return _generate_json(prompt, llm_model, 4096, schema)
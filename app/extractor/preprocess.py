@@ -98,11 +98,21 @@ def clean_text(text: str) -> str:
     text = re.sub(r'[^\w\s\.\,\;\:\!\?\-\(\)\$\%]', ' ', text)  # Keep only common punctuation
     
     return text.strip()
+
+
+def normalize_lines(text: str) -> str:
+    """
+    Strip the indentation `clean_text` leaves at the start of lines, e.g. where it removed
+    the # of a markdown heading, so that headings start their line as `split_sections` expects.
+    """
+    return "\n".join(line.strip() for line in text.splitlines())
+
     
 def split_sections(text: str) -> List[dict]:
     """
     Splits the contract text into structured sections with titles.
     Handles both markdown-style headers and numbered sections.
+    Each section also has the `start` and `end` offsets of its title and content in the text.
     """
 
     # Pattern to match various section formats:
@@ -121,12 +131,27 @@ def split_sections(text: str) -> List[dict]:
         content = text[start:end].strip()
         
         if len(content) > 50:
-            sections.append({"title": title, "content": content})
+            sections.append({"title": title, "content": content, "start": match.start(), "end": end})
 
     return sections
 
 
 
+def match_section(title: str, content: str) -> dict:
+    """
+    The relevance signals of a section: the keywords it mentions and whether it has dates
+    or amounts of money.
+    """
+
+    combined_content = f"{title}\n{content}"
+    sec_lower = combined_content.lower()
+    return {
+        "keywords": [k for k in RELEVANT_KEYWORDS if k.lower() in sec_lower],
+        "has_date": bool(DATE_PATTERN.search(combined_content)),
+        "has_money": bool(MONEY_PATTERN.search(combined_content)),
+    }
+
+
 def filter_relevant_sections(sections: List[dict]) -> List[dict]:
     """
     Include only relevant sections.
@@ -134,15 +159,35 @@ def filter_relevant_sections(sections: List[dict]) -> List[dict]:
 
     relevant_sections = []
     for sec in sections:
-        title = sec["title"]
-        content = sec["content"]
-        
-        combined_content = f"{title}\n{content}"
-        
-        sec_lower = combined_content.lower()
-        has_keyword = any(k.lower() in sec_lower for k in RELEVANT_KEYWORDS)
-        has_date = bool(DATE_PATTERN.search(combined_content))
-        has_money = bool(MONEY_PATTERN.search(combined_content))
-        if has_keyword or has_date or has_money:
-            relevant_sections.append(combined_content)
-    return relevant_sections
\ No newline at end of file
+        matches = match_section(sec["title"], sec["content"])
+        if matches["keywords"] or matches["has_date"] or matches["has_money"]:
+            relevant_sections.append(f"{sec['title']}\n{sec['content']}")
+    return relevant_sections
+
+
+def build_section_index(raw_text: str) -> List[dict]:
+    """
+    Split a contract into the sections its extraction works from, with their offsets in the
+    cleaned text, their relevance signals and whether they are relevant to revenue recognition.
+    """
+
+    text = normalize_lines(clean_text(raw_text))
+    sections = []
+    for position, sec in enumerate(split_sections(text)):
+        matches = match_section(sec["title"], sec["content"])
+        sections.append({
+            "position": position,
+            "title": sec["title"],
+            "start_offset": sec["start"],
+            "end_offset": sec["end"],
+            "content": sec["content"],
+            **matches,
+            "relevant": bool(matches["keywords"] or matches["has_date"] or matches["has_money"]),
+        })
+    return sections
+
+
+def relevant_context(sections: List[dict]) -> str:
+    """The relevant sections of a section index, as they are sent to the LLM"""
+
+    return "\n\n".join(f"{sec['title']}\n{sec['content']}" for sec in sections if sec["relevant"])
\ No newline at end of file
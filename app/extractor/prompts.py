@@ -1,25 +1,24 @@
 import json
-from app.extractor.schemas import ContractLLMResponseJsonSchema, OverTimePerformanceObligation, PointInTimePerformanceObligation, Discount, RecognitionPeriod, Milestone
+from functools import lru_cache
+from typing import Type
+from pydantic import BaseModel
+from app.extractor.schemas import ContractLLMResponseJsonSchema, ContractModificationDelta
+
+
+@lru_cache(maxsize=None)
+def _schema_json(schema: Type[BaseModel]) -> str:
+    """The JSON schema of a response model as it appears in prompts, generated once per process"""
+    return json.dumps(schema.model_json_schema(), indent=2)
+
 
 def get_revenue_recognition_prompt(contract_text: str) -> str:
     """Generate prompt for revenue recognition"""
     
-    contract_schema = ContractLLMResponseJsonSchema.model_json_schema()
-
-    supporting_schemas = {
-        "OverTimePerformanceObligation": OverTimePerformanceObligation.model_json_schema(),
-        "PointInTimePerformanceObligation": PointInTimePerformanceObligation.model_json_schema(),
-        "Discount": Discount.model_json_schema(),
-        "RecognitionPeriod": RecognitionPeriod.model_json_schema(),
-        "Milestone": Milestone.model_json_schema(),
-    }
-    
-    
     return f"""
     You are a financial contract analyst specializing in ASC 606 revenue recognition.
     
     Extract contract data and return it as valid JSON matching this EXACT schema:
-    {json.dumps(contract_schema, indent=2)}
+    {_schema_json(ContractLLMResponseJsonSchema)}
     
     Input contract text:
     {contract_text}
@@ -33,6 +32,56 @@ def get_revenue_recognition_prompt(contract_text: str) -> str:
     - There can be only two types of performance obligations: over_time and point_in_time
     - There can be only two types of discounts: global and obligation_specific
     - If the revenue recognition is not monthly, quarterly or yearly, it should be in the format of "every_<number_of_days>"
+    - For usage-based variable consideration, set metric to a short snake_case name of the metered quantity (e.g. "api_calls"), unit_price to the price per unit above the allowance and included_quantity to the units included per billing period
+    - Use "daily" as the ratable_method when revenue accrues per day of service (e.g. partial periods are prorated), otherwise "even"
     - If you cannot find specific information in the contract text, use "NOT_PROVIDED" as the value, not null
     """
-    
\ No newline at end of file
+    
+
+def get_modification_prompt(amendment_text: str, current_terms: dict) -> str:
+    """Generate a prompt that extracts only the changes made by a contract amendment"""
+    
+    return f"""
+    You are a financial contract analyst specializing in ASC 606 contract modifications.
+    
+    Current contract terms:
+    {json.dumps(current_terms, indent=2, default=str)}
+    
+    Extract ONLY what the amendment below changes, as valid JSON matching this schema:
+    {_schema_json(ContractModificationDelta)}
+    
+    Amendment text:
+    {amendment_text}
+    
+    CRITICAL RULES:
+    - Return only valid JSON matching the schema above
+    - Dates must be YYYY-MM-DD format and numbers must be actual numbers
+    - Refer to existing performance obligations by their exact name from the current terms
+    - Leave a field null or a list empty when the amendment does not change it
+    - Use "cumulative_catch_up" as the accounting_treatment only when the added goods or services are not distinct from those already transferred, otherwise "prospective"
+    """
+    
+
+def get_field_reextraction_prompt(contract_sections: str, current_values: dict, schema: Type[BaseModel]) -> str:
+    """Generate a prompt that re-extracts only some fields of a contract from its relevant sections"""
+    
+    return f"""
+    You are a financial contract analyst specializing in ASC 606 revenue recognition.
+    
+    A previous extraction of this contract got some fields wrong. Their current values:
+    {json.dumps(current_values, indent=2, default=str)}
+    
+    Extract ONLY these fields again from the contract sections below, as valid JSON matching this schema:
+    {_schema_json(schema)}
+    
+    Contract sections:
+    {contract_sections}
+    
+    CRITICAL RULES:
+    - Return only valid JSON matching the schema above
+    - Dates must be YYYY-MM-DD format and numbers must be actual numbers
+    - Refer to performance obligations by their exact name from the current values
+    - Keep a current value when the sections confirm it
+    - There can be only two types of performance obligations: over_time and point_in_time
+    - If the revenue recognition is not monthly, quarterly or yearly, it should be in the format of "every_<number_of_days>"
+    """
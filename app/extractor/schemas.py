@@ -1,12 +1,18 @@
 from datetime import date
 from enum import Enum
-from typing import List, Optional
-from pydantic import BaseModel
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+from pydantic import BaseModel, create_model
 
+class RatableMethod(str, Enum):
+    EVEN: str = "even"
+    DAILY: str = "daily"
+    
 class RecognitionPeriod(BaseModel):
     start_date: date
     end_date: date
     frequency: str
+    ratable_method: Optional[RatableMethod] = RatableMethod.EVEN
     
     class Config:
         extra = "allow"
@@ -68,6 +74,17 @@ class Discount(BaseModel):
         extra = "allow"
     
 
+class VariableConsideration(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    metric: Optional[str] = None
+    unit_price: Optional[float] = None
+    included_quantity: Optional[float] = 0
+    
+    class Config:
+        extra = "allow"
+    
+
 class ContractLLMResponseJsonSchema(BaseModel):
     contract_id: str
     provider: str
@@ -79,8 +96,69 @@ class ContractLLMResponseJsonSchema(BaseModel):
     contract_type: Optional[str] = "SaaS"
     performance_obligations: List[OverTimePerformanceObligation | PointInTimePerformanceObligation]
     discounts: Optional[List[Discount]] = []
-    variable_considerations: Optional[List[dict]] = []
+    variable_considerations: Optional[List[VariableConsideration]] = []
     termination_clause: Optional[dict] = None
     
     class Config:
-        extra = "allow"
\ No newline at end of file
+        extra = "allow"
+
+
+class ModificationAccounting(str, Enum):
+    PROSPECTIVE: str = "prospective"
+    CUMULATIVE_CATCH_UP: str = "cumulative_catch_up"
+    
+class ObligationChange(BaseModel):
+    name: str
+    ssp: Optional[float] = None
+    allocated_value: Optional[float] = None
+    frequency: Optional[str] = None
+    
+    class Config:
+        extra = "allow"
+        
+class ContractModificationDelta(BaseModel):
+    effective_date: date
+    accounting_treatment: ModificationAccounting = ModificationAccounting.PROSPECTIVE
+    description: Optional[str] = None
+    end_date: Optional[date] = None
+    added_obligations: List[OverTimePerformanceObligation | PointInTimePerformanceObligation] = []
+    changed_obligations: List[ObligationChange] = []
+    removed_obligations: List[str] = []
+    added_discounts: List[Discount] = []
+    
+    class Config:
+        extra = "allow"
+
+
+class FieldReextractionRequest(BaseModel):
+    fields: List[str] = []
+    obligations: List[str] = []
+    obligation_fields: List[str] = []
+
+
+REEXTRACTABLE_FIELDS = [field for field in ContractLLMResponseJsonSchema.model_fields if field != "performance_obligations"]
+OBLIGATION_FIELDS = [field for field in OverTimePerformanceObligation.model_fields if field != "name"]
+
+
+@lru_cache(maxsize=256)
+def field_correction_schema(fields: Tuple[str, ...], obligation_fields: Optional[Tuple[str, ...]]) -> Type[BaseModel]:
+    """
+    The response model of a targeted re-extraction: the requested contract fields and, unless
+    `obligation_fields` is None, the requested obligations with the requested fields, or
+    complete when it is empty.
+    """
+    
+    definitions = {field: (ContractLLMResponseJsonSchema.model_fields[field].annotation, ...) for field in fields}
+    if obligation_fields == ():
+        definitions["performance_obligations"] = (List[OverTimePerformanceObligation | PointInTimePerformanceObligation], ...)
+    elif obligation_fields is not None:
+        obligation = create_model(
+            "ObligationCorrection",
+            name=(str, ...),
+            **{
+                field: (Optional[RecognitionPeriod] if field == "recognition_period" else OverTimePerformanceObligation.model_fields[field].annotation, ...)
+                for field in obligation_fields
+            },
+        )
+        definitions["performance_obligations"] = (List[obligation], ...)
+    return create_model("FieldCorrection", **definitions)
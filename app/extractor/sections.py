@@ -0,0 +1,182 @@
+"""
+Contract Section Index
+
+This module keeps the section split of each contract (see `build_section_index`) and uses it
+to re-extract single fields or obligations of a processed contract, instead of running the
+whole contract through the LLM again.
+
+The revenue recognition job stores a contract's sections when it persists the contract,
+with their offsets in the cleaned text and the keywords, dates and amounts they mention.
+A re-extraction sends only the sections relevant to the requested fields:
+- contract fields: the sections whose titles name one of the field's keywords, or else the
+  sections mentioning one
+- obligations: the sections mentioning the obligation's name, plus those whose titles name
+  a keyword of the requested obligation fields
+falling back to every relevant section when none match. The answer is merged into the
+stored extraction by `merge_field_corrections`.
+"""
+
+import copy
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import delete, insert
+from sqlmodel import select
+
+from app.extractor.llm_extractor import extract_contract_fields
+from app.extractor.preprocess import build_section_index, clean_text
+from app.extractor.schemas import OBLIGATION_FIELDS, REEXTRACTABLE_FIELDS, field_correction_schema
+from app.models import ContractSection
+
+logger = logging.getLogger(__name__)
+
+# Keywords (from RELEVANT_KEYWORDS) of the sections each field is usually stated in
+FIELD_KEYWORDS = {
+    "contract_id": ["Contract ID", "Agreement ID", "Parties"],
+    "provider": ["Parties", "Agreement"],
+    "customer": ["Parties", "Agreement"],
+    "effective_date": ["Effective Date", "Commencement", "Start Date", "Term"],
+    "end_date": ["Term", "Expiration", "Renewal", "Contract Period"],
+    "currency": ["Fees", "Pricing", "Payment", "Contract Value"],
+    "total_contract_value": ["Contract Value", "Transaction Price", "Fees", "Pricing", "Consideration"],
+    "contract_type": ["Agreement", "Scope"],
+    "discounts": ["Discount", "Rebate", "Credit"],
+    "variable_considerations": ["Variable Consideration", "Usage-Based Fees", "Overages"],
+    "termination_clause": ["Termination", "Early Termination Fee"],
+}
+
+OBLIGATION_FIELD_KEYWORDS = {
+    "type": ["Scope", "Deliverables"],
+    "ssp": ["Standalone Selling Price", "SSP", "Fees", "Pricing"],
+    "allocated_value": ["Allocation", "Transaction Price", "Standalone Selling Price", "Fees", "Pricing"],
+    "revenue_recognition_method": ["Revenue Recognition", "Recognition"],
+    "recognition_trigger": ["Revenue Recognition", "Acceptance", "Milestone"],
+    "recognition_period": ["Term", "Revenue Recognition", "Recognition Schedule"],
+    "milestones": ["Milestone", "Acceptance", "Go-Live"],
+}
+
+
+def validate_reextraction_targets(contract_data: Dict[str, Any], targets: Dict[str, Any]) -> None:
+    """Raise a ValueError unless the targets name fields and obligations the extraction has"""
+    fields, obligations, obligation_fields = targets["fields"], targets["obligations"], targets["obligation_fields"]
+    if not fields and not obligations:
+        raise ValueError("Name at least one field or performance obligation to re-extract")
+    unknown = [field for field in fields if field not in REEXTRACTABLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown contract fields: {', '.join(unknown)}")
+    unknown = [field for field in obligation_fields if field not in OBLIGATION_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown performance obligation fields: {', '.join(unknown)}")
+    if obligation_fields and not obligations:
+        raise ValueError("Obligation fields need the performance obligations to re-extract")
+    names = {obligation["name"] for obligation in contract_data.get("performance_obligations", [])}
+    unknown = [name for name in obligations if name not in names]
+    if unknown:
+        raise ValueError(f"Unknown performance obligations: {', '.join(unknown)}")
+
+
+def save_section_index(session, contract_id: int, sections: List[Dict[str, Any]]) -> None:
+    """Replace a contract's stored sections, in the caller's transaction"""
+    session.execute(delete(ContractSection).where(ContractSection.contract_id == contract_id))
+    if sections:
+        session.execute(insert(ContractSection), [dict(section, contract_id=contract_id) for section in sections])
+
+
+def load_section_index(session, contract) -> List[Dict[str, Any]]:
+    """A contract's stored sections, indexed now for contracts processed before the index existed"""
+    rows = session.exec(
+        select(ContractSection).where(ContractSection.contract_id == contract.id).order_by(ContractSection.position)
+    ).all()
+    if rows:
+        return [row.model_dump(exclude={"id", "contract_id", "created_at"}) for row in rows]
+    sections = build_section_index(contract.raw_text or "")
+    save_section_index(session, contract.id, sections)
+    return sections
+
+
+def _titled(sections: List[Dict[str, Any]], keywords: List[str]) -> List[Dict[str, Any]]:
+    keywords = [keyword.lower() for keyword in keywords]
+    return [section for section in sections if any(keyword in section["title"].lower() for keyword in keywords)]
+
+
+def select_sections(sections: List[Dict[str, Any]], targets: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The sections a re-extraction of the targets is sent, in contract order"""
+    selected = {}
+    for field in targets["fields"]:
+        matches = _titled(sections, FIELD_KEYWORDS[field])
+        if not matches:
+            keywords = set(FIELD_KEYWORDS[field])
+            matches = [section for section in sections if keywords.intersection(section["keywords"] or [])]
+        selected.update((section["position"], section) for section in matches)
+
+    if targets["obligations"]:
+        for name in targets["obligations"]:
+            # The sections were cleaned, so the name is matched as cleaned too
+            cleaned_name = clean_text(name).lower()
+            selected.update(
+                (section["position"], section)
+                for section in sections
+                if cleaned_name in section["title"].lower() or cleaned_name in section["content"].lower()
+            )
+        for field in targets["obligation_fields"] or OBLIGATION_FIELDS:
+            selected.update((section["position"], section) for section in _titled(sections, OBLIGATION_FIELD_KEYWORDS[field]))
+
+    if not selected:
+        return [section for section in sections if section["relevant"]]
+    return [selected[position] for position in sorted(selected)]
+
+
+def current_values(contract_data: Dict[str, Any], targets: Dict[str, Any]) -> Dict[str, Any]:
+    """The extracted values of the targets, which the prompt asks the LLM to correct"""
+    values = {field: contract_data.get(field) for field in targets["fields"]}
+    if targets["obligations"]:
+        obligations = {obligation["name"]: obligation for obligation in contract_data.get("performance_obligations", [])}
+        values["performance_obligations"] = [
+            {"name": name, **{field: obligations[name].get(field) for field in targets["obligation_fields"]}}
+            if targets["obligation_fields"] else obligations[name]
+            for name in targets["obligations"]
+        ]
+    return values
+
+
+def build_reextraction(contract_data: Dict[str, Any], sections: List[Dict[str, Any]], targets: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Type[BaseModel]]:
+    """The contract sections, current values and response model of a re-extraction"""
+    validate_reextraction_targets(contract_data, targets)
+    obligation_fields: Optional[Tuple[str, ...]] = tuple(targets["obligation_fields"]) if targets["obligations"] else None
+    schema = field_correction_schema(tuple(targets["fields"]), obligation_fields)
+    contract_sections = "\n\n".join(f"{section['title']}\n{section['content']}" for section in select_sections(sections, targets))
+    return contract_sections, current_values(contract_data, targets), schema
+
+
+def reextract_fields(contract_data: Dict[str, Any], sections: List[Dict[str, Any]], targets: Dict[str, Any]) -> Dict[str, Any]:
+    """Re-extract the targets of a contract from its relevant sections and return the corrected values"""
+    contract_sections, values, schema = build_reextraction(contract_data, sections, targets)
+    logger.info(
+        "Re-extracting %s from %d of %d contract characters",
+        ", ".join(targets["fields"] + targets["obligations"]), len(contract_sections), sum(len(section["content"]) for section in sections),
+    )
+    return extract_contract_fields(contract_sections, values, schema).model_dump(mode="json")
+
+
+def merge_field_corrections(contract_data: Dict[str, Any], correction: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge re-extracted values into a copy of the contract data and return it.
+
+    Corrected obligations only override the fields the correction has.
+    """
+    contract = copy.deepcopy(contract_data)
+    for field, value in correction.items():
+        if field != "performance_obligations":
+            contract[field] = value
+
+    obligations = {obligation["name"]: obligation for obligation in contract.get("performance_obligations", [])}
+    for corrected in correction.get("performance_obligations") or []:
+        obligation = obligations.get(corrected["name"])
+        if obligation is None:
+            raise ValueError(f"Unknown performance obligation: {corrected['name']}")
+        obligation.update(corrected)
+        if obligation.get("revenue_recognition_method") == "point_in_time" and obligation.get("recognition_period") is None:
+            obligation.pop("recognition_period", None)
+
+    return contract
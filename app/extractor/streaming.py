@@ -0,0 +1,141 @@
+"""
+Streaming Response Parser
+
+Parses a JSON document as the LLM streams it, without waiting for the complete response.
+
+Chunks are scanned once for JSON structure (strings, braces and brackets). The elements of
+one array field, the performance obligations of a contract extraction, are validated with
+Pydantic's JSON parser as soon as each one's closing brace arrives and handed to a callback
+together with the fields that preceded the array. The complete document is validated the
+same way when the stream ends.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Type, get_args
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import from_json
+
+# The characters that change JSON nesting, and backslashes escaping the next character in a string
+_STRUCTURAL = re.compile(r'[\\"{}\[\]]')
+
+ItemCallback = Callable[[int, Any, Dict[str, Any]], None]
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a streamed JSON response validated against `schema`.
+
+    `item_field` names a top-level list field of the schema whose elements are validated and
+    passed to `on_item(index, item, header)` one by one while the response streams in;
+    `header` holds the top-level fields that came before the list.
+    """
+
+    def __init__(self, schema: Type[BaseModel], item_field: Optional[str] = None, on_item: Optional[ItemCallback] = None):
+        self.schema = schema
+        self.item_field = item_field
+        self.on_item = on_item
+        self.items: List[Any] = []
+        self.header: Dict[str, Any] = {}
+        self._item_adapter = TypeAdapter(get_args(schema.model_fields[item_field].annotation)[0]) if item_field else None
+
+        self._text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._string_start = 0
+        self._last_string = (0, 0)
+        self._document_start: Optional[int] = None
+        self._document_end: Optional[int] = None
+        self._array_depth: Optional[int] = None
+        self._array_done = False
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Scan the next chunk of the response and return the items it completed"""
+        self._text += chunk
+        text = self._text
+        position = self._position
+        completed = []
+
+        while self._document_end is None:
+            if self._document_start is None:
+                # Skip a code fence or any other text before the document
+                start = text.find("{", position)
+                if start < 0:
+                    position = len(text)
+                    break
+                self._document_start = position = start
+
+            match = _STRUCTURAL.search(text, position)
+            if match is None:
+                position = len(text)
+                break
+            index = match.start()
+            char = text[index]
+
+            if self._in_string:
+                if char == "\\":
+                    if index + 1 == len(text):
+                        # The escaped character is in the next chunk
+                        position = index
+                        break
+                    position = index + 2
+                    continue
+                if char == '"':
+                    self._in_string = False
+                    self._last_string = (self._string_start, index + 1)
+            elif char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._starts_items():
+                    self._array_depth = self._depth + 1
+                    self.header = self._parse_header()
+                elif char == "{" and self._depth == self._array_depth:
+                    self._item_start = index
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._item_start is not None and self._depth == self._array_depth:
+                    completed.append(self._complete_item(text[self._item_start:index + 1]))
+                    self._item_start = None
+                elif self._array_depth is not None and self._depth == self._array_depth - 1:
+                    self._array_depth = None
+                    self._array_done = True
+                elif self._depth == 0:
+                    self._document_end = index + 1
+            position = index + 1
+
+        self._position = position
+        return completed
+
+    def finish(self) -> BaseModel:
+        """Validate the complete document"""
+        if self._document_start is None:
+            raise ValueError("The response does not contain a JSON object")
+        end = self._document_end if self._document_end is not None else len(self._text)
+        return self.schema.model_validate_json(self._text[self._document_start:end])
+
+    def _starts_items(self) -> bool:
+        """Whether a list opening at the top level is the value of `item_field`"""
+        if self.item_field is None or self._array_done:
+            return False
+        start, end = self._last_string
+        return self._text[start + 1:end - 1] == self.item_field
+
+    def _parse_header(self) -> Dict[str, Any]:
+        # Everything before the list's key is a complete object but for its closing brace
+        try:
+            header = from_json(self._text[self._document_start:self._last_string[0]], allow_partial=True)
+        except ValueError:
+            return {}
+        return header if isinstance(header, dict) else {}
+
+    def _complete_item(self, item_json: str) -> Any:
+        item = self._item_adapter.validate_json(item_json)
+        index = len(self.items)
+        self.items.append(item)
+        if self.on_item is not None:
+            self.on_item(index, item, self.header)
+        return item
@@ -0,0 +1,178 @@
+"""
+Foreign Exchange Rates
+
+This module converts amounts between currencies using rate tables loaded from local CSV or
+Parquet files.
+
+Rate files have one row per date and currency with the columns `date`, `currency` and `rate`,
+where `rate` is the value of one unit of `currency` in the base currency (FX_BASE_CURRENCY,
+USD by default). A rate stays in effect until the next date quoted for that currency.
+
+Each currency is held as sorted numpy arrays of day ordinals and rates, with the running
+integral of the rate over time, so conversions for whole batches of rows take one
+binary search per row and no Python loop:
+- period-end: the rate in effect on the period's last day
+- average: the day-weighted average rate over the period
+"""
+
+import csv
+import os
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+FX_METHODS = ["period_end", "average"]
+
+DEFAULT_BASE_CURRENCY = "USD"
+
+
+class FxRateError(LookupError):
+    """Raised when rates are not configured or a currency has no rate for a date."""
+
+
+def _ordinals(days: Union[Sequence[date], np.ndarray]) -> np.ndarray:
+    if isinstance(days, np.ndarray) and days.dtype == np.int64:
+        return days
+    return np.fromiter((day.toordinal() for day in days), dtype=np.int64, count=len(days))
+
+
+class CurrencyRates:
+    """Date-indexed rates of a single currency against the base currency"""
+
+    def __init__(self, days: np.ndarray, rates: np.ndarray):
+        order = np.argsort(days, kind="stable")
+        self.days = days[order]
+        self.rates = rates[order]
+        # Area under the rate step function from the first quoted day to each quoted day
+        self.area = np.concatenate(([0.0], np.cumsum(self.rates[:-1] * np.diff(self.days))))
+
+    def _index(self, days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        index = np.searchsorted(self.days, days, side="right") - 1
+        return np.maximum(index, 0), index < 0
+
+    def at(self, days: np.ndarray) -> np.ndarray:
+        """Rates in effect on each day, NaN before the first quoted day"""
+        index, missing = self._index(days)
+        return np.where(missing, np.nan, self.rates[index])
+
+    def average(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Day-weighted average rates over each inclusive [start, end] range, NaN if the range starts before the first quoted day"""
+        def integral(days: np.ndarray) -> np.ndarray:
+            index, missing = self._index(days)
+            return np.where(missing, np.nan, self.area[index] + self.rates[index] * (days - self.days[index]))
+
+        # The integral is taken up to the start of the day after the range
+        return (integral(ends + 1) - integral(starts)) / (ends + 1 - starts)
+
+
+class FxRateTable:
+    """In-memory rate table for all currencies quoted against one base currency"""
+
+    def __init__(self, rates: Dict[str, CurrencyRates], base_currency: str = DEFAULT_BASE_CURRENCY):
+        self.base_currency = base_currency
+        self.currencies = rates
+        self.rate = lru_cache(maxsize=4096)(self._rate)
+
+    def has_currency(self, currency: str) -> bool:
+        return currency == self.base_currency or currency in self.currencies
+
+    def _base_rates(self, currency: str, starts: np.ndarray, ends: np.ndarray, method: str) -> np.ndarray:
+        if currency == self.base_currency:
+            return np.ones(len(ends))
+        if currency not in self.currencies:
+            return np.full(len(ends), np.nan)
+        rates = self.currencies[currency]
+        return rates.average(starts, ends) if method == "average" else rates.at(ends)
+
+    def _rate(self, from_currency: str, to_currency: str, day: date) -> float:
+        """Rate converting one unit of `from_currency` into `to_currency` on a day"""
+        return float(self.convert([1.0], [from_currency], [day], [day], to_currency, rounded=False)[0])
+
+    def convert(
+        self,
+        amounts: Sequence[float],
+        currencies: Sequence[str],
+        period_starts: Sequence[date],
+        period_ends: Sequence[date],
+        to_currency: str,
+        method: str = "period_end",
+        strict: bool = True,
+        rounded: bool = True,
+    ) -> np.ndarray:
+        """
+        Convert a batch of amounts, each in its own currency and period, to one currency.
+
+        Rates are looked up once per distinct source currency for all of its rows, and the
+        results are rounded to cents. Rows without a rate raise `FxRateError`, or are NaN
+        when `strict` is False.
+        """
+        if method not in FX_METHODS:
+            raise ValueError(f"Unsupported FX method: {method}")
+
+        amounts = np.asarray(amounts, dtype=np.float64)
+        currencies = np.asarray(currencies, dtype=object)
+        ends = _ordinals(period_ends)
+        starts = _ordinals(period_starts) if method == "average" else ends
+        converted = np.empty(len(amounts))
+
+        target = self._base_rates(to_currency, starts, ends, method)
+        for currency in set(currencies.tolist()):
+            rows = currencies == currency
+            if currency == to_currency:
+                converted[rows] = amounts[rows]
+            else:
+                converted[rows] = amounts[rows] * self._base_rates(currency, starts[rows], ends[rows], method) / target[rows]
+
+        if strict and np.isnan(converted).any():
+            row = int(np.flatnonzero(np.isnan(converted))[0])
+            raise FxRateError(f"No {currencies[row]} to {to_currency} rate for {date.fromordinal(int(ends[row]))}")
+        return np.round(converted, 2) if rounded else converted
+
+
+def _read_rate_rows(path: Path) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if path.suffix == ".parquet":
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, columns=["date", "currency", "rate"])
+        days = pc.cast(pc.cast(table["date"], "date32"), "int32").to_numpy() + date(1970, 1, 1).toordinal()
+        return days.astype(np.int64), np.asarray(table["currency"].to_pylist(), dtype=object), table["rate"].to_numpy().astype(np.float64)
+
+    days, currencies, rates = [], [], []
+    with open(path, newline="", encoding="utf-8") as rate_file:
+        for row in csv.DictReader(rate_file):
+            days.append(date.fromisoformat(row["date"]).toordinal())
+            currencies.append(row["currency"].strip().upper())
+            rates.append(float(row["rate"]))
+    return np.array(days, dtype=np.int64), np.array(currencies, dtype=object), np.array(rates, dtype=np.float64)
+
+
+@lru_cache(maxsize=8)
+def _load_fx_rates(path: str, modified: float, base_currency: str) -> FxRateTable:
+    days, currencies, rates = _read_rate_rows(Path(path))
+    if (rates <= 0).any():
+        raise ValueError(f"FX rates must be positive: {path}")
+
+    return FxRateTable(
+        {currency: CurrencyRates(days[currencies == currency], rates[currencies == currency]) for currency in set(currencies.tolist())},
+        base_currency,
+    )
+
+
+def load_fx_rates(path: Union[str, Path], base_currency: str = DEFAULT_BASE_CURRENCY) -> FxRateTable:
+    """Load a CSV or Parquet rate file, once per file version"""
+    path = Path(path)
+    if not path.exists():
+        raise FxRateError(f"FX rate file not found: {path}")
+    return _load_fx_rates(str(path.resolve()), path.stat().st_mtime, base_currency)
+
+
+def get_fx_rates() -> FxRateTable:
+    """The rate table configured through FX_RATES_PATH and FX_BASE_CURRENCY"""
+    path: Optional[str] = os.getenv("FX_RATES_PATH")
+    if not path:
+        raise FxRateError("FX rates are not configured (FX_RATES_PATH is not set)")
+    return load_fx_rates(path, os.getenv("FX_BASE_CURRENCY", DEFAULT_BASE_CURRENCY))
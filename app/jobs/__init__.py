@@ -6,8 +6,17 @@ This package contains all Celery-based background jobs for the revenue automatio
 
 from .celery_config import celery_app
 from .revenue_recognition_job import revenue_recognition
+from .extraction_job import extract_contract
+from .journal_entry_job import close_period_journal_entries, generate_journal_entries_chunk
+from .usage_ingestion_job import ingest_usage_events
+from .contract_modification_job import apply_contract_modification
 
 __all__ = [
     'celery_app',
     'revenue_recognition',
+    'extract_contract',
+    'close_period_journal_entries',
+    'generate_journal_entries_chunk',
+    'ingest_usage_events',
+    'apply_contract_modification',
 ]
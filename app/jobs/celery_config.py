@@ -3,8 +3,11 @@ Celery configuration and app setup for background job processing.
 """
 
 from celery import Celery
+from kombu import Queue
 import os
 from dotenv import load_dotenv
+from app.tracing import instrument_celery
+from app.jobs.routing import CONTRACT_QUEUES, LLM_QUEUE
 
 load_dotenv()
 
@@ -15,7 +18,7 @@ celery_app = Celery(
     "revenue_automation",
     broker=CELERY_BROKER_URL,
     backend=CELERY_RESULT_BACKEND,
-    include=["app.jobs.revenue_recognition_job"]
+    include=["app.jobs.revenue_recognition_job", "app.jobs.extraction_job", "app.jobs.journal_entry_job", "app.jobs.usage_ingestion_job", "app.jobs.contract_modification_job"]
 )
 
 celery_app.conf.update(
@@ -30,4 +33,11 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     task_acks_late=True,
     worker_disable_rate_limits=True,
+    # Revenue recognition jobs are sent to the queue of their size class (see `app.jobs.routing`)
+    task_default_queue="celery",
+    task_queues=[Queue("celery")] + [Queue(queue) for queue in CONTRACT_QUEUES + [LLM_QUEUE]],
+    task_routes={"revenue_recognition": {"queue": CONTRACT_QUEUES[1]}, "extract_contract": {"queue": LLM_QUEUE}},
+    broker_transport_options={"queue_order_strategy": "priority"},
 )
+
+instrument_celery()
@@ -0,0 +1,58 @@
+"""
+Pipeline Checkpoints
+
+Each stage of the revenue recognition job stores its output under the contract's external id
+as soon as it completes. A retried job loads the checkpoints and resumes after the last
+completed stage, so a failure while persisting costs a database round trip to retry instead
+of another Gemini call.
+
+Stages, in order:
+- context: the cleaned and filtered contract text the extraction prompt is built from
+- extraction: the validated extraction, as JSON
+- recognition: the engine result
+- memo: the rendered and structured audit memo
+- persisted: written in the same transaction as the results, which replaces the others
+"""
+
+from typing import Any, Dict
+
+from sqlalchemy import delete
+from sqlmodel import select
+
+from app.db import get_session
+from app.models import PipelineCheckpoint
+
+STAGES = ["context", "extraction", "recognition", "memo", "persisted"]
+
+
+def load_checkpoints(external_id: str) -> Dict[str, Dict[str, Any]]:
+    """Payloads of the completed stages of a contract, by stage"""
+    with next(get_session()) as session:
+        return {
+            checkpoint.stage: checkpoint.payload
+            for checkpoint in session.exec(select(PipelineCheckpoint).where(PipelineCheckpoint.external_id == external_id))
+        }
+
+
+def save_checkpoint(external_id: str, stage: str, payload: Dict[str, Any]) -> None:
+    """Store a stage's output, committed on its own so it survives a later failure"""
+    if stage not in STAGES:
+        raise ValueError(f"Unknown pipeline stage: {stage}")
+    with next(get_session()) as session:
+        session.execute(
+            delete(PipelineCheckpoint)
+            .where(PipelineCheckpoint.external_id == external_id, PipelineCheckpoint.stage == stage)
+        )
+        session.add(PipelineCheckpoint(external_id=external_id, stage=stage, payload=payload))
+        session.commit()
+
+
+def complete_pipeline(session, external_id: str) -> None:
+    """
+    Replace a contract's checkpoints with the `persisted` marker.
+
+    Runs inside the transaction persisting the results, so a redelivered job finds either
+    the marker and stops, or the stage outputs and persists them again.
+    """
+    session.execute(delete(PipelineCheckpoint).where(PipelineCheckpoint.external_id == external_id))
+    session.add(PipelineCheckpoint(external_id=external_id, stage="persisted", payload={}))
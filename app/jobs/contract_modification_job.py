@@ -0,0 +1,197 @@
+"""
+Contract Modification Background Job
+
+This module defines the task that applies an amendment or change order to a processed
+contract. Only the delta is extracted (for amendment documents) or taken as given (for
+structured deltas); the stored extraction is then updated in place and the existing
+revenue schedule is adjusted by `ASC606Engine.process_modification` instead of being
+regenerated from a new upload.
+
+Targeted re-extractions run through the same task: only the requested fields are extracted
+again, from the contract's stored sections (see `app.extractor.sections`), and the schedule
+is restated from inception with the corrected terms.
+"""
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, insert, or_
+from sqlmodel import select
+
+from .celery_config import celery_app
+from app.db import get_session
+from app.models import AuditMessage, Contract, ContractModification, ContractObligation, RevenueSchedule
+from app.extractor.llm_extractor import extract_modification_delta
+from app.extractor.schemas import ContractLLMResponseJsonSchema, ContractModificationDelta
+from app.extractor.sections import load_section_index, merge_field_corrections, reextract_fields
+from app.ASC606 import ASC606Engine, RevenueScheduleModel, USAGE_RECOGNITION_METHOD, apply_modification_delta
+from app.ASC606.money import from_cents, to_cents
+from app.audit_memo import build_memo, get_memo_content_hash, render_memo
+from app.tracing import span
+from app.cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Modifications with this source correct the extraction instead of amending the contract
+REEXTRACTION_SOURCE = "reextraction"
+
+
+@celery_app.task(bind=True, name="apply_contract_modification")
+def apply_contract_modification(self, modification_id: int):
+    """
+    Apply a stored contract modification to its contract's extraction and revenue schedule.
+    """
+    try:
+        with next(get_session()) as session:
+            modification = session.get(ContractModification, modification_id)
+            contract = session.get(Contract, modification.contract_id)
+            logger.info("Applying modification %s to contract: %s", modification_id, contract.external_id)
+            
+            if modification.source == REEXTRACTION_SOURCE:
+                # A correction of the extraction: the schedule is restated from inception
+                if modification.delta is None:
+                    sections = load_section_index(session, contract)
+                    modification.delta = reextract_fields(contract.extracted_json, sections, modification.targets)
+                modified_data = ContractLLMResponseJsonSchema(**merge_field_corrections(contract.extracted_json, modification.delta))
+                modification.effective_date = modified_data.effective_date
+                modification.accounting_treatment = "cumulative_catch_up"
+                end_date = modified_data.end_date
+            else:
+                if modification.delta is None:
+                    modification.delta = extract_modification_delta(modification.amendment_text, contract.extracted_json).model_dump(mode='json')
+                delta = ContractModificationDelta(**modification.delta)
+                modification.effective_date = delta.effective_date
+                modification.accounting_treatment = delta.accounting_treatment.value
+                
+                modified_data = ContractLLMResponseJsonSchema(
+                    **apply_modification_delta(contract.extracted_json, delta.model_dump(mode='json'))
+                )
+                end_date = delta.end_date
+            modified_json = modified_data.model_dump(mode='json')
+            
+            usage_obligation_ids = select(ContractObligation.id).where(
+                ContractObligation.contract_id == contract.id,
+                ContractObligation.recognition_method == USAGE_RECOGNITION_METHOD,
+            )
+            stored_rows = session.exec(
+                select(RevenueSchedule, ContractObligation.name)
+                .join(ContractObligation, RevenueSchedule.obligation_id == ContractObligation.id, isouter=True)
+                .where(RevenueSchedule.contract_id == contract.id)
+                .where(or_(RevenueSchedule.obligation_id.is_(None), RevenueSchedule.obligation_id.not_in(usage_obligation_ids)))
+                .order_by(RevenueSchedule.period_start, RevenueSchedule.id)
+            ).all()
+            original_schedule = [
+                RevenueScheduleModel(
+                    contract_id=contract.external_id,
+                    obligation_name=name or "Unknown",
+                    period_start=row.period_start,
+                    period_end=row.period_end,
+                    amount=row.amount,
+                    recognition_method="",
+                    status="recognized" if row.recognized else "deferred",
+                    created_at=row.created_at,
+                )
+                for row, name in stored_rows
+                if modification.source != REEXTRACTION_SOURCE
+            ]
+            
+            engine = ASC606Engine()
+            revenue_result = engine.process_modification(
+                modified_data.model_dump(), original_schedule, modification.effective_date, modification.accounting_treatment,
+                result_format="columnar",
+            )
+            
+            # Update obligations in place, so the contract keeps one obligation per name
+            obligations = {
+                obligation.name: obligation
+                for obligation in session.exec(
+                    select(ContractObligation)
+                    .where(ContractObligation.contract_id == contract.id)
+                    .where(ContractObligation.id.not_in(usage_obligation_ids))
+                    .order_by(ContractObligation.id)
+                )
+            }
+            for obligation_data in modified_json["performance_obligations"]:
+                obligation = obligations.get(obligation_data["name"])
+                if obligation is None:
+                    obligation = obligations[obligation_data["name"]] = ContractObligation(contract_id=contract.id, name=obligation_data["name"])
+                obligation.type = obligation_data["type"]
+                obligation.standalone_price = obligation_data["ssp"]
+                obligation.allocated_amount = obligation_data["allocated_value"]
+                obligation.recognition_method = obligation_data["revenue_recognition_method"]
+                session.add(obligation)
+            session.flush()
+            
+            session.execute(
+                delete(RevenueSchedule)
+                .where(RevenueSchedule.id.in_([row.id for row, _ in stored_rows]))
+            )
+            
+            cumulative_cents = {}
+            schedule_rows = []
+            for entry in sorted(engine.revenue_schedule, key=lambda entry: (entry.obligation_name, entry.period_start, entry.period_end)):
+                obligation = obligations.get(entry.obligation_name)
+                obligation_id = obligation.id if obligation else None
+                cumulative_cents[obligation_id] = cumulative_cents.get(obligation_id, 0) + to_cents(entry.amount)
+                schedule_rows.append({
+                    "contract_id": contract.id,
+                    "obligation_id": obligation_id,
+                    "period_start": entry.period_start,
+                    "period_end": entry.period_end,
+                    "amount": entry.amount,
+                    "cumulative_amount": from_cents(cumulative_cents[obligation_id]),
+                    "recognized": entry.status == "recognized",
+                })
+            if schedule_rows:
+                session.execute(insert(RevenueSchedule), schedule_rows)
+            for obligation in obligations.values():
+                obligation.scheduled_amount = from_cents(cumulative_cents.get(obligation.id, 0))
+            
+            with span("generate_audit_memo"):
+                memo = build_memo(modified_json, revenue_result)
+                structured_memo = memo.to_structured()
+                memo_text = render_memo(memo)
+            session.add(AuditMessage(
+                contract_id=contract.id,
+                memo_text=memo_text,
+                structured_memo=structured_memo,
+                content_hash=get_memo_content_hash(structured_memo)
+            ))
+            
+            contract.extracted_json = modified_json
+            contract.total_value = modified_json["total_contract_value"]
+            contract.end_date = end_date or contract.end_date
+            if modification.source == REEXTRACTION_SOURCE:
+                contract.customer_name = modified_json["customer"]
+                contract.currency = modified_json["currency"]
+                contract.start_date = modified_data.effective_date
+            contract.updated_at = datetime.now(timezone.utc)
+            modification.status = "applied"
+            modification.applied_at = contract.updated_at
+            session.commit()
+            response_cache.invalidate([contract.external_id])
+            
+            logger.info("Applied modification %s with %d schedule entries", modification_id, len(schedule_rows))
+            
+            return {
+                "status": "success",
+                "modification_id": modification_id,
+                "contract_id": contract.external_id,
+                "accounting_treatment": modification.accounting_treatment,
+                "total_schedule_entries": len(schedule_rows)
+            }
+            
+    except Exception as e:
+        logger.exception("Error applying modification %s", modification_id)
+        
+        try:
+            with next(get_session()) as session:
+                modification = session.get(ContractModification, modification_id)
+                if modification:
+                    modification.status = "failed"
+                    modification.error = str(e)
+                    session.commit()
+        except Exception as db_error:
+            logger.error("Error updating modification status: %s", db_error)
+        
+        return {"status": "failed", "modification_id": modification_id, "error": str(e)}
@@ -0,0 +1,80 @@
+"""
+Contract Extraction Background Job
+
+This module defines the task that runs the Gemini extraction of a contract on its own
+queue, for deployments with LLM_STAGE_WORKERS set. The extraction is almost entirely a
+network wait, so the queue is served by workers with an I/O pool that keep many calls in
+flight per process:
+
+    celery -A app.jobs worker -Q contracts.llm -P gevent --concurrency 200
+
+The extraction is stored as the contract's `extraction` checkpoint and the revenue
+recognition job is enqueued again, resuming after it on the contract's size class queue.
+
+Every worker process configures its Gemini client once when it starts: prefork children
+after the fork, and the single process of the other pools before it consumes tasks.
+"""
+
+import logging
+
+from celery import signals
+
+from .celery_config import celery_app
+from .checkpoints import load_checkpoints, save_checkpoint
+from .routing import classify_contract, route_options
+from app.db import get_session
+from app.models import Contract
+from app.extractor.llm_extractor import extract_contract_data, init_gemini_client
+
+logger = logging.getLogger(__name__)
+
+
+def _init_client() -> None:
+    try:
+        init_gemini_client()
+    except Exception as e:
+        logger.warning("Gemini client not configured at worker start: %s", e)
+
+
+@signals.worker_init.connect(weak=False)
+def _init_worker_client(sender=None, **kwargs):
+    pool = getattr(sender, "pool_cls", None) or celery_app.conf.worker_pool
+    name = pool if isinstance(pool, str) else pool.__module__
+    # Prefork children configure their own client once forked
+    if "prefork" not in name:
+        _init_client()
+
+
+@signals.worker_process_init.connect(weak=False)
+def _init_process_client(**kwargs):
+    _init_client()
+
+
+@celery_app.task(bind=True, name="extract_contract")
+def extract_contract(self, contract_id: str, text_content: str, file_info: dict):
+    """
+    Extract a contract with Gemini and hand it back to the revenue recognition job.
+    """
+    try:
+        checkpoints = load_checkpoints(contract_id)
+        if "extraction" not in checkpoints:
+            context = checkpoints["context"]["text"] if "context" in checkpoints else None
+            extracted_data = extract_contract_data(text_content, contract_id, context=context)
+            save_checkpoint(contract_id, "extraction", extracted_data.model_dump(mode='json'))
+        
+        celery_app.send_task(
+            "revenue_recognition", (contract_id, text_content, file_info), **route_options(classify_contract(file_info))
+        )
+        return {"status": "success", "contract_id": contract_id, "message": "Contract extracted"}
+    
+    except Exception:
+        logger.exception("Error extracting contract %s", contract_id)
+        
+        try:
+            with next(get_session()) as session:
+                contract = session.query(Contract).filter(Contract.external_id == contract_id).first()
+                if contract:
+                    contract.status = "failed"
+                    session.commit()
+        except Exception as db_error:
+            logger.error("Error updating contract status: %s", db_error)
@@ -0,0 +1,93 @@
+"""
+Journal Entry Background Job
+
+This module defines the period-close job that turns recognized revenue into journal
+entries for the whole portfolio. The close is split into chunks of contracts, each
+processed by its own task, and every chunk replaces its contracts' entries for the period
+so the close can be re-run safely.
+"""
+
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import List
+
+from celery import group
+from sqlalchemy import delete, func, insert
+from sqlmodel import select
+
+from .celery_config import celery_app
+from app.db import get_session
+from app.models import JournalEntry, RevenueSchedule
+from app.ASC606 import JournalEntryGenerator, parse_close_period
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@celery_app.task(bind=True, name="close_period_journal_entries")
+def close_period_journal_entries(self, close_period: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Fan the journal entry generation for a close period out over chunks of contracts.
+    """
+    period_start, period_end = parse_close_period(close_period)
+    
+    with next(get_session()) as session:
+        contracts_in_period = (
+            select(RevenueSchedule.contract_id)
+            .where(RevenueSchedule.period_start >= period_start, RevenueSchedule.period_start <= period_end)
+            .distinct()
+        )
+        contract_ids = session.exec(contracts_in_period.order_by(RevenueSchedule.contract_id)).all()
+        
+        # Drop entries of contracts that no longer recognize revenue in this period
+        session.execute(
+            delete(JournalEntry)
+            .where(JournalEntry.close_period == close_period)
+            .where(JournalEntry.contract_id.not_in(contracts_in_period))
+        )
+        session.commit()
+    
+    chunks = [contract_ids[i:i + chunk_size] for i in range(0, len(contract_ids), chunk_size)]
+    if chunks:
+        group(generate_journal_entries_chunk.s(close_period, chunk) for chunk in chunks).apply_async()
+    
+    return {
+        "status": "started",
+        "close_period": close_period,
+        "contracts": len(contract_ids),
+        "chunks": len(chunks)
+    }
+
+
+@celery_app.task(bind=True, name="generate_journal_entries_chunk")
+def generate_journal_entries_chunk(self, close_period: str, contract_ids: List[int]):
+    """
+    Generate and bulk insert the journal entries of a chunk of contracts for a close period.
+    """
+    generator = JournalEntryGenerator(close_period)
+    
+    with next(get_session()) as session:
+        recognized_amounts = session.exec(
+            select(RevenueSchedule.contract_id, RevenueSchedule.obligation_id, func.sum(RevenueSchedule.amount))
+            .where(RevenueSchedule.contract_id.in_(contract_ids))
+            .where(RevenueSchedule.period_start >= generator.period_start, RevenueSchedule.period_start <= generator.period_end)
+            .group_by(RevenueSchedule.contract_id, RevenueSchedule.obligation_id)
+        ).all()
+        
+        lines = generator.generate(recognized_amounts)
+        created_at = datetime.now(timezone.utc)
+        
+        session.execute(
+            delete(JournalEntry)
+            .where(JournalEntry.close_period == close_period)
+            .where(JournalEntry.contract_id.in_(contract_ids))
+        )
+        if lines:
+            session.execute(insert(JournalEntry), [{**asdict(line), "created_at": created_at} for line in lines])
+        session.commit()
+    
+    return {
+        "status": "success",
+        "close_period": close_period,
+        "contracts": len(contract_ids),
+        "journal_entry_lines": len(lines)
+    }
@@ -5,15 +5,45 @@ This module defines the background task responsible for running the full
 revenue recognition workflow. It handles contract data extraction,
 applies ASC 606 accounting logic, and generates the corresponding
 audit memo for documentation.
+
+Every stage's output is checkpointed (see `app.jobs.checkpoints`). Failures after the
+extraction are retried automatically with exponential backoff, and the retry resumes
+from the last completed stage. Extraction failures are not retried here, since the
+extractor already retries its Gemini calls.
+
+A job whose tenant already runs its share of contracts of the same size class is sent back
+to its queue after a short delay (see `app.jobs.routing`). With LLM_STAGE_WORKERS set, the
+extraction is left to `extract_contract` on the LLM queue, which enqueues this job again
+once the extraction is checkpointed.
 """
 
+import logging
+
+from sqlalchemy import insert
+
 from .celery_config import celery_app
+from .checkpoints import complete_pipeline, load_checkpoints, save_checkpoint
+from .routing import FAIR_SHARE_DELAY_SECONDS, LLM_QUEUE, LLM_STAGE_WORKERS, claim_tenant_slot, classify_contract, route_options
+from .extraction_job import extract_contract
 from app.db import get_session
 from app.models import Contract, ContractObligation, RevenueSchedule, AuditMessage
 from app.extractor.llm_extractor import extract_contract_data
-from app.ASC606 import revenue_recognition as asc606_revenue_recognition
-from app.audit_memo import generate_audit_memo
-from datetime import datetime
+from app.extractor.preprocess import build_section_index, relevant_context
+from app.extractor.sections import save_section_index
+from app.extractor.schemas import ContractLLMResponseJsonSchema
+from app.ASC606 import ASC606Engine, RecognitionResult
+from app.ASC606.money import from_cents, to_cents
+from app.audit_memo import build_memo, render_memo, get_memo_content_hash
+from app.usage import refresh_usage_schedules
+from app.cache import response_cache
+from app.search import index_contract
+from app.tracing import span
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 2
 
 def calculate_time_saved(performance_obligations: int, revenue_schedules: int, audit_memo_length: int, contract_value: float) -> float:
     """
@@ -30,25 +60,83 @@ def calculate_time_saved(performance_obligations: int, revenue_schedules: int, a
     
     return round(total_time * 4) / 4;
 
-@celery_app.task(bind=True, name="revenue_recognition")
+@celery_app.task(bind=True, name="revenue_recognition", max_retries=MAX_RETRIES)
 def revenue_recognition(self, contract_id: str, text_content: str, file_info: dict):
     """
     Process the contract data through the full revenue recognition pipeline.
     
+    Stages completed by an earlier attempt are restored from their checkpoints.
     """
+    extracted = False
     try:
-        print(f"Starting revenue recognition processing for contract: {contract_id}")
+        logger.info("Starting revenue recognition processing for contract: %s", contract_id)
+        
+        checkpoints = load_checkpoints(contract_id)
+        if "persisted" in checkpoints:
+            logger.info("Contract %s has already been processed", contract_id)
+            return {"status": "success", "contract_id": contract_id, "message": "Contract already processed"}
         
-        extracted_data = extract_contract_data(text_content, contract_id)
-        print(f"Extracted data")
-        revenue_result = asc606_revenue_recognition(extracted_data.model_dump())     
-        print(f"Revenue result:")
-        audit_memo = generate_audit_memo(extracted_data.model_dump(), revenue_result)    
-        revenue_schedules = revenue_result.get('revenue_schedule', [])
-        print(f"Audit memo:")
+        size_class = classify_contract(file_info)
+        if not claim_tenant_slot(contract_id, size_class, celery_app.conf.task_time_limit):
+            logger.info("Tenant of contract %s is at its %s contract share, deferring", contract_id, size_class.name)
+            revenue_recognition.apply_async(
+                (contract_id, text_content, file_info), countdown=FAIR_SHARE_DELAY_SECONDS, **route_options(size_class)
+            )
+            return {"status": "deferred", "contract_id": contract_id, "message": "Tenant is at its share of running contracts"}
+        
+        if checkpoints:
+            logger.info("Resuming contract %s with completed stages: %s", contract_id, ", ".join(checkpoints))
+        
+        # The section index the context is built from is stored with the contract, for
+        # targeted re-extraction of its fields
+        if "context" in checkpoints:
+            context = checkpoints["context"]["text"]
+            sections = checkpoints["context"].get("sections")
+        else:
+            sections = build_section_index(text_content)
+            context = relevant_context(sections)
+            save_checkpoint(contract_id, "context", {"text": context, "sections": sections})
+        
+        # When the extraction streams, obligations are prepared by the engine as they arrive
+        engine = ASC606Engine()
+        if "extraction" in checkpoints:
+            extracted_json_data = checkpoints["extraction"]
+            extracted_data = ContractLLMResponseJsonSchema.model_validate(extracted_json_data)
+        elif LLM_STAGE_WORKERS:
+            extract_contract.apply_async((contract_id, text_content, file_info), queue=LLM_QUEUE)
+            return {"status": "extracting", "contract_id": contract_id, "message": "Extraction sent to the LLM workers"}
+        else:
+            extracted_data = extract_contract_data(
+                text_content,
+                contract_id,
+                on_obligation=lambda index, obligation, contract_terms: engine.prepare_obligation(index, obligation.model_dump(), contract_terms),
+                context=context,
+            )
+            extracted_json_data = extracted_data.model_dump(mode='json')
+            save_checkpoint(contract_id, "extraction", extracted_json_data)
+        extracted = True
+        
+        if "recognition" in checkpoints:
+            revenue_result = RecognitionResult.from_dict(checkpoints["recognition"])
+        else:
+            revenue_result = engine.recognize(extracted_data.model_dump())
+            save_checkpoint(contract_id, "recognition", revenue_result.to_dict())
+        
+        # The memo is immutable once the job finishes, so both the Markdown memo and
+        # the structured memo served by the API are rendered once here.
+        if "memo" in checkpoints:
+            audit_memo = checkpoints["memo"]["memo_text"]
+            structured_memo = checkpoints["memo"]["structured_memo"]
+        else:
+            with span("generate_audit_memo"):
+                memo = build_memo(extracted_json_data, revenue_result)
+                audit_memo = render_memo(memo)
+                structured_memo = memo.to_structured()
+            save_checkpoint(contract_id, "memo", {"memo_text": audit_memo, "structured_memo": structured_memo})
+        revenue_schedules = revenue_result.revenue_schedule
         
         revenue_schedule_count = len(revenue_schedules)
-        performance_obligations_count = revenue_result.get('performance_obligations_count', 0)
+        performance_obligations_count = len(revenue_result.performance_obligations)
         time_saved_hours = calculate_time_saved(
             performance_obligations_count, 
             revenue_schedule_count, 
@@ -56,11 +144,8 @@ def revenue_recognition(self, contract_id: str, text_content: str, file_info: di
             extracted_data.total_contract_value or 0
         )
         
-        print(f"Time saved hours: {time_saved_hours}")
-        
-        with next(get_session()) as session:
+        with span("persist_revenue_recognition", schedule_entries=len(revenue_schedules)), next(get_session()) as session:
             contract = session.query(Contract).filter(Contract.external_id == contract_id).first()
-            extracted_json_data = extracted_data.model_dump(mode='json')
             
             if contract:
                 contract.customer_name = extracted_data.customer
@@ -71,6 +156,7 @@ def revenue_recognition(self, contract_id: str, text_content: str, file_info: di
                 contract.end_date = extracted_data.end_date
                 contract.status = "processed"
                 contract.time_saved_hours = time_saved_hours
+                contract.updated_at = datetime.now(timezone.utc)
             else:
                 contract = Contract(
                     external_id=contract_id,
@@ -88,12 +174,13 @@ def revenue_recognition(self, contract_id: str, text_content: str, file_info: di
                 )
                 session.add(contract)
             
-            session.commit()
-            session.refresh(contract)
+            # Everything is written in one transaction, so a failed attempt leaves nothing behind
+            session.flush()
             
-            obligation_map = {}
-            for obligation_data in extracted_data.performance_obligations:
-                obligation = ContractObligation(
+            # An obligation's key is its position in the extraction, so the schedule rows
+            # reference these by index
+            obligations = [
+                ContractObligation(
                     contract_id=contract.id,
                     name=obligation_data.name,
                     type=obligation_data.type,
@@ -101,58 +188,85 @@ def revenue_recognition(self, contract_id: str, text_content: str, file_info: di
                     recognition_method=obligation_data.revenue_recognition_method,
                     standalone_price=obligation_data.ssp,
                 )
-                session.add(obligation)
-                session.flush()
-                obligation_map[obligation_data.name] = obligation.id
+                for obligation_data in extracted_data.performance_obligations
+            ]
+            session.add_all(obligations)
+            session.flush()
+            obligation_ids = [obligation.id for obligation in obligations]
             
-            for schedule_entry in revenue_schedules:
-                period_start = schedule_entry.get('period_start')
-                period_end = schedule_entry.get('period_end')
-                
-                if isinstance(period_start, str):
-                    period_start = datetime.fromisoformat(period_start).date()
-                if isinstance(period_end, str):
-                    period_end = datetime.fromisoformat(period_end).date()
-                
-                obligation_name = schedule_entry.get('obligation_name', '')
-                obligation_id = obligation_map.get(obligation_name)
-                
-                revenue_schedule = RevenueSchedule(
-                    contract_id=contract.id,
-                    obligation_id=obligation_id,
-                    period_start=period_start,
-                    period_end=period_end,
-                    amount=schedule_entry.get('amount', 0.0),
-                    recognized=schedule_entry.get('status') == 'recognized'
+            # The schedule columns convert straight to insert parameters, with no per-row dicts
+            # or date parsing in between
+            schedule_rows = [
+                {
+                    "contract_id": contract.id,
+                    "obligation_id": obligation_ids[key] if key >= 0 else None,
+                    "period_start": period_start,
+                    "period_end": period_end,
+                    "amount": amount,
+                    "recognized": status == "recognized",
+                }
+                for key, period_start, period_end, amount, status in zip(
+                    revenue_schedules.obligation_key.tolist(),
+                    revenue_schedules.period_start.tolist(),
+                    revenue_schedules.period_end.tolist(),
+                    revenue_schedules.amount.tolist(),
+                    revenue_schedules.status,
                 )
-                session.add(revenue_schedule)
+            ]
+            
+            # Store each obligation's running total so as-of balances are a single indexed lookup
+            cumulative_cents = {}
+            for schedule_row in sorted(schedule_rows, key=lambda row: (row["obligation_id"] or 0, row["period_start"], row["period_end"])):
+                total = cumulative_cents.get(schedule_row["obligation_id"], 0) + to_cents(schedule_row["amount"])
+                cumulative_cents[schedule_row["obligation_id"]] = total
+                schedule_row["cumulative_amount"] = from_cents(total)
+            if schedule_rows:
+                session.execute(insert(RevenueSchedule), schedule_rows)
+            for obligation in obligations:
+                obligation.scheduled_amount = from_cents(cumulative_cents.get(obligation.id, 0))
             
             audit_message = AuditMessage(
                 contract_id=contract.id,
-                memo_text=audit_memo
+                memo_text=audit_memo,
+                structured_memo=structured_memo,
+                content_hash=get_memo_content_hash(structured_memo)
             )
             session.add(audit_message)
             
+            # Usage may have been ingested before the contract was extracted
+            refresh_usage_schedules(session, [contract.id])
+            
+            index_contract(session, contract.id, text_content)
+            save_section_index(session, contract.id, sections if sections is not None else build_section_index(text_content))
+            
+            complete_pipeline(session, contract_id)
             session.commit()
+            response_cache.invalidate([contract_id])
             
             revenue_schedule_count = len(revenue_schedules)
-            print(f"Successfully processed contract {contract_id} with {revenue_schedule_count} schedule entries")
+            logger.info("Processed contract %s with %d schedule entries", contract_id, revenue_schedule_count)
             
             return {
                 "status": "success",
                 "contract_id": contract_id,
                 "message": "Contract processed successfully",
+                "resumed_stages": list(checkpoints),
                 "revenue_processing": {
                     "total_schedule_entries": revenue_schedule_count,
                     "performance_obligations": performance_obligations_count,
-                    "total_contract_value": revenue_result.get('total_contract_value', 0),
+                    "total_contract_value": extracted_data.total_contract_value or 0,
                     "audit_memo_length": len(audit_memo),
                     "time_saved_hours": time_saved_hours
                 }
             }
             
     except Exception as e:
-        print(f"Error processing contract {contract_id}: {str(e)}")
+        if extracted and self.request.retries < self.max_retries:
+            countdown = RETRY_BACKOFF_SECONDS * 2 ** self.request.retries
+            logger.warning("Error processing contract %s, retrying in %ds: %s", contract_id, countdown, e)
+            raise self.retry(exc=e, countdown=countdown)
+        
+        logger.exception("Error processing contract %s", contract_id)
         
         try:
             with next(get_session()) as session:
@@ -161,6 +275,4 @@ def revenue_recognition(self, contract_id: str, text_content: str, file_info: di
                     contract.status = "failed"
                     session.commit()
         except Exception as db_error:
-            print(f"Error updating contract status: {str(db_error)}")
-        
-        # raise self.retry(exc=e, countdown=60, max_retries=0)
+            logger.error("Error updating contract status: %s", db_error)
@@ -0,0 +1,141 @@
+"""
+Contract Routing
+
+Uploads are classified by the size signals in their `file_info` (page count, word count and
+file size) and the revenue recognition job is enqueued on the queue of that size class, so a
+burst of long master agreements cannot hold up a queue of two-page order forms.
+
+Run at least one worker dedicated to small contracts next to workers consuming every queue,
+listed in class order. On Redis, `queue_order_strategy="priority"` makes those workers drain
+the queues in the order given, and lower message priorities are served first:
+
+    celery -A app.jobs worker -Q contracts.small --concurrency 2
+    celery -A app.jobs worker -Q contracts.small,contracts.medium,contracts.large,celery
+
+Each tenant may also run only a limited number of contracts of a size class at once; a job
+over its tenant's share is re-enqueued after a short delay, leaving the worker slot to other
+tenants. The in-flight count comes from contract statuses and is checked without a lock, so
+concurrent starts can briefly exceed the limit by a job or two.
+
+Set CONTRACT_ROUTING=shared to send every contract to the default queue in arrival order,
+without tenant limits, for deployments with a single worker pool.
+
+With LLM_STAGE_WORKERS set, the Gemini extraction of every contract runs on the LLM queue
+instead, on workers with an I/O pool (see `app.jobs.extraction_job`), and the contract then
+returns to its size class's queue for the rest of the pipeline.
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlmodel import select
+
+from app.db import get_session
+from app.models import Contract
+from app.utils.file_processor import WORDS_PER_PAGE
+
+DEFAULT_TENANT = "default"
+ROUTING_MODES = ["sized", "shared"]
+SHARED_QUEUE = "celery"
+LLM_QUEUE = "contracts.llm"
+LLM_STAGE_WORKERS = os.getenv("LLM_STAGE_WORKERS", "").lower() in ("1", "true", "yes")
+FAIR_SHARE_DELAY_SECONDS = float(os.getenv("FAIR_SHARE_DELAY_SECONDS", "2"))
+
+
+@dataclass(frozen=True)
+class SizeClass:
+    """A size class of contracts, the queue its jobs run on and its limits"""
+    name: str
+    queue: str
+    priority: int
+    max_pages: Optional[int]
+    max_words: Optional[int]
+    max_kb: Optional[float]
+    tenant_limit: int
+
+    def fits(self, pages: int, words: int, size_in_kb: float) -> bool:
+        return all(
+            limit is None or value <= limit
+            for value, limit in ((pages, self.max_pages), (words, self.max_words), (size_in_kb, self.max_kb))
+        )
+
+
+# Checked in order; the last class takes everything
+SIZE_CLASSES = [
+    SizeClass("small", "contracts.small", 0, max_pages=10, max_words=5_000, max_kb=1_024, tenant_limit=8),
+    SizeClass("medium", "contracts.medium", 4, max_pages=60, max_words=30_000, max_kb=8_192, tenant_limit=4),
+    SizeClass("large", "contracts.large", 8, max_pages=None, max_words=None, max_kb=None, tenant_limit=2),
+]
+SIZE_CLASS_NAMES = [size_class.name for size_class in SIZE_CLASSES]
+CONTRACT_QUEUES = [size_class.queue for size_class in SIZE_CLASSES]
+
+
+def page_count(file_info: Dict[str, Any]) -> int:
+    """The document's page count, estimated from its words for uploads from before it was recorded"""
+    if file_info.get("page_count"):
+        return file_info["page_count"]
+    return max(1, -(-file_info.get("word_count", 0) // WORDS_PER_PAGE))
+
+
+def classify_contract(file_info: Dict[str, Any]) -> SizeClass:
+    """The size class of an upload"""
+    pages = page_count(file_info)
+    words = file_info.get("word_count", 0)
+    size_in_kb = file_info.get("size_in_kb", 0)
+    for size_class in SIZE_CLASSES[:-1]:
+        if size_class.fits(pages, words, size_in_kb):
+            return size_class
+    return SIZE_CLASSES[-1]
+
+
+def routing_mode() -> str:
+    mode = os.getenv("CONTRACT_ROUTING", "sized").lower()
+    if mode not in ROUTING_MODES:
+        raise ValueError(f"Unknown contract routing: {mode}")
+    return mode
+
+
+def route_options(size_class: SizeClass) -> Dict[str, Any]:
+    """`apply_async` options that send a job to its size class's queue"""
+    if routing_mode() == "shared":
+        return {"queue": SHARED_QUEUE}
+    return {"queue": size_class.queue, "priority": size_class.priority}
+
+
+def claim_tenant_slot(external_id: str, size_class: SizeClass, stale_after: float) -> bool:
+    """
+    Mark a contract as processing if its tenant runs fewer contracts of its size class than
+    its share, and return whether it did.
+
+    Contracts marked processing more than `stale_after` seconds ago are past the task time
+    limit and no longer count. A contract without a row, uploaded outside the API, always runs.
+    """
+    with next(get_session()) as session:
+        contract = session.exec(select(Contract).where(Contract.external_id == external_id)).first()
+        if contract is None:
+            return True
+
+        now = datetime.now(timezone.utc)
+        if routing_mode() == "sized":
+            running = session.exec(
+                select(func.count())
+                .select_from(Contract)
+                .where(
+                    Contract.tenant_id == contract.tenant_id,
+                    Contract.size_class == size_class.name,
+                    Contract.status == "processing",
+                    Contract.id != contract.id,
+                    Contract.updated_at > now - timedelta(seconds=stale_after),
+                )
+            ).one()
+            if running >= size_class.tenant_limit:
+                return False
+
+        contract.status = "processing"
+        contract.size_class = size_class.name
+        contract.updated_at = now
+        session.commit()
+        return True
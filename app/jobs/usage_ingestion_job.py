@@ -0,0 +1,45 @@
+"""
+Usage Ingestion Background Job
+
+This module defines the consumer for batches of usage events. Each batch is aggregated in
+memory, appended to the usage rollup table and then used to refresh the usage-based revenue
+schedule of the contracts it touched. Batches carry an id, so a redelivered batch is
+acknowledged without being counted twice.
+"""
+
+from sqlmodel import select
+
+from .celery_config import celery_app
+from app.cache import response_cache
+from app.db import get_session
+from app.models import Contract
+from app.usage import aggregate_usage_events, append_usage_rollups, batch_already_ingested, refresh_usage_schedules
+
+
+@celery_app.task(bind=True, name="ingest_usage_events")
+def ingest_usage_events(self, batch_id: str, payload: str, usage_format: str = "ndjson"):
+    """
+    Aggregate a batch of usage events into the rollup table and refresh usage revenue.
+    """
+    aggregate = aggregate_usage_events(payload, usage_format)
+    
+    with next(get_session()) as session:
+        if batch_already_ingested(session, batch_id):
+            return {"status": "duplicate", "batch_id": batch_id}
+        
+        contract_ids = append_usage_rollups(session, batch_id, aggregate)
+        schedule_rows = refresh_usage_schedules(session, contract_ids)
+        session.commit()
+        
+        if response_cache.enabled and contract_ids:
+            response_cache.invalidate(session.exec(select(Contract.external_id).where(Contract.id.in_(contract_ids))).all())
+    
+    return {
+        "status": "success",
+        "batch_id": batch_id,
+        "events": aggregate.events,
+        "accepted": aggregate.accepted,
+        "rejected": aggregate.rejected,
+        "contracts": len(contract_ids),
+        "usage_schedule_rows": schedule_rows
+    }
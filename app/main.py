@@ -1,13 +1,41 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from datetime import date
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, HTTPException, UploadFile, File, Header, Request, Response, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel import select
 from app.db import init_db, get_session
-from app.models import Contract, ContractObligation, RevenueSchedule, AuditMessage
-from app.jobs import revenue_recognition
+from app.models import Contract, ContractModification, ContractObligation, ContractSection, RevenueSchedule, AuditMessage
+from app.jobs import revenue_recognition, close_period_journal_entries, ingest_usage_events, apply_contract_modification
+from app.jobs.routing import DEFAULT_TENANT, classify_contract, route_options
+from app.jobs.contract_modification_job import REEXTRACTION_SOURCE
+from app.ASC606 import apply_modification_delta, parse_close_period
+from app.extractor.schemas import ContractModificationDelta, FieldReextractionRequest
+from app.extractor.sections import validate_reextraction_targets
+from app.audit_memo import get_structured_memo, get_memo_content_hash
+from app.exports import EXPORT_FORMATS, EXPORT_STATUSES, stream_csv, stream_parquet
+from app.fx import FX_METHODS, FxRateError, get_fx_rates
+from app.reporting import deferred_revenue_balances
+from app.usage import USAGE_FIELDS, USAGE_FORMATS
+from app.simulation import (
+    ContractNotFound,
+    ContractNotProcessed,
+    JsonPatchError,
+    JsonPatchTestFailed,
+    SimulationInputError,
+    simulate_contract,
+)
 from app.utils.file_processor import FileProcessor
+from app.tracing import TRACEPARENT_HEADER, span, tracing_enabled
+from app.cache import response_cache
+from app.search import SEARCH_MAX_LIMIT, SearchUnavailable, search_contracts
+import logging
+import os
 import uuid
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
@@ -24,17 +52,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+async def trace_requests(request: Request, call_next):
+    with span(f"{request.method} {request.url.path}", traceparent=request.headers.get(TRACEPARENT_HEADER)) as current:
+        response = await call_next(request)
+        current.set_attribute("http.status_code", response.status_code)
+        return response
+
+
+# Registered only when an exporter is configured, so requests skip the middleware otherwise
+if tracing_enabled():
+    app.middleware("http")(trace_requests)
+
 @app.get("/")
 def health_check():
     return {"message": "OK", "status": "running", "cors": "enabled"}
 
 @app.post("/contracts/upload")
-async def upload_contract(file: UploadFile = File(...)):
+async def upload_contract(file: UploadFile = File(...), x_tenant_id: Optional[str] = Header(default=None)):
     file_bytes = await file.read()
     
     text_content, file_info = FileProcessor.extract_text(file_bytes, file.filename, file.content_type)
     contract_id = str(uuid.uuid4())
     
+    # Long agreements run on their own queue so they do not delay short order forms
+    size_class = classify_contract(file_info)
+    
     try:
         with next(get_session()) as session:
             contract = Contract(
@@ -42,20 +85,24 @@ async def upload_contract(file: UploadFile = File(...)):
                 file_name=file_info["filename"],
                 content_type=file_info["content_type"],
                 raw_text=text_content,
-                status="uploaded"
+                status="uploaded",
+                tenant_id=x_tenant_id or DEFAULT_TENANT,
+                size_class=size_class.name
             )
             
             session.add(contract)
             session.commit()
             session.refresh(contract)
         
-        task = revenue_recognition.delay(contract_id, text_content, file_info)
+        with span("enqueue revenue_recognition", contract_id=contract_id, text_chars=len(text_content), size_class=size_class.name):
+            task = revenue_recognition.apply_async((contract_id, text_content, file_info), **route_options(size_class))
         
         return {
             "message": "Contract uploaded successfully. Processing started in background.",
             "contract_id": contract_id,
             "task_id": task.id,
             "file_info": file_info,
+            "size_class": size_class.name,
             "status": "uploaded",
             "processing_status": "started"
         }
@@ -87,8 +134,26 @@ def get_contracts():
             for contract in contracts
         ]
 
+@app.get("/contracts/search")
+def search(q: str, limit: int = 20, offset: int = 0):
+    """Ranked full-text search over contract text and section titles, with highlighted excerpts"""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query is empty")
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+    with next(get_session()) as session:
+        try:
+            results = search_contracts(session, q, limit=limit, offset=offset)
+        except SearchUnavailable as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    return {"query": q, "results": results}
+
 @app.get("/contracts/{contract_id}/revenue-schedules")
 def get_revenue_schedules(contract_id: str):
+    return response_cache.read_through(contract_id, "revenue-schedules", lambda: _revenue_schedules(contract_id))
+
+
+def _revenue_schedules(contract_id: str) -> List[Dict[str, Any]]:
     with next(get_session()) as session:
         contract = session.query(Contract).filter(Contract.external_id == contract_id).first()
         if not contract:
@@ -124,75 +189,380 @@ def get_revenue_schedules(contract_id: str):
 
 @app.get("/contracts/{contract_id}/audit-memos")
 def get_audit_memos(contract_id: str):
+    return response_cache.read_through(contract_id, "audit-memos", lambda: _audit_memos(contract_id))
+
+
+def _audit_memos(contract_id: str) -> List[Dict[str, Any]]:
     with next(get_session()) as session:
         contract = session.query(Contract).filter(Contract.external_id == contract_id).first()
         if not contract:
             raise HTTPException(status_code=404, detail="Contract not found")
         
         memos = session.exec(
-            select(AuditMessage).where(AuditMessage.contract_id == contract.id)
+            select(AuditMessage.id, AuditMessage.contract_id, AuditMessage.memo_text, AuditMessage.created_at)
+            .where(AuditMessage.contract_id == contract.id)
         ).all()
-        return memos
+        return [
+            {
+                "id": memo.id,
+                "contract_id": memo.contract_id,
+                "memo_text": memo.memo_text,
+                "created_at": memo.created_at
+            }
+            for memo in memos
+        ]
+
+@app.get("/metrics/response-cache")
+def get_response_cache_metrics():
+    return response_cache.stats()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+
+def _build_structured_memo(session, contract: Contract) -> dict:
+    """Rebuild the structured memo for contracts processed before it was materialized by the job."""
+    extracted_data = contract.extracted_json
+    
+    performance_obligations = []
+    for obligation in extracted_data.get("performance_obligations", []):
+        performance_obligations.append({
+            "name": obligation.get("name", ""),
+            "type": obligation.get("type", "Service"),
+            "revenue_recognition_method": obligation.get("revenue_recognition_method", "over_time"),
+            "ssp": obligation.get("ssp", 0),
+            "allocated_value": obligation.get("allocated_value", 0),
+            "recognition_trigger": obligation.get("recognition_trigger", "Monthly" if obligation.get("revenue_recognition_method") == "over_time" else "Upon Completion")
+        })
+    
+    contract_data = {
+        "contract_id": extracted_data.get("contract_id", contract.external_id or str(contract.id)),
+        "provider": extracted_data.get("provider", "Provider"),
+        "customer": extracted_data.get("customer", "Customer"),
+        "total_contract_value": extracted_data.get("total_contract_value", 0),
+        "effective_date": extracted_data.get("effective_date", ""),
+        "end_date": extracted_data.get("end_date", ""),
+        "currency": extracted_data.get("currency", "USD"),
+        "performance_obligations": performance_obligations,
+        "variable_considerations": extracted_data.get("variable_considerations", []),
+        "discounts": extracted_data.get("discounts", [])
+    }
+    
+    schedules = session.exec(
+        select(RevenueSchedule, ContractObligation)
+        .join(ContractObligation, RevenueSchedule.obligation_id == ContractObligation.id, isouter=True)
+        .where(RevenueSchedule.contract_id == contract.id)
+    ).all()
+    
+    revenue_result = {
+        "revenue_schedule": [
+            {
+                "period_start": schedule.period_start.strftime("%Y-%m-%d") if schedule.period_start else "",
+                "period_end": schedule.period_end.strftime("%Y-%m-%d") if schedule.period_end else "",
+                "amount": schedule.amount or 0,
+                "recognition_method": obligation.recognition_method if obligation else "over_time",
+                "status": "recognized" if schedule.recognized else "deferred"
+            }
+            for schedule, obligation in schedules
+        ]
+    }
+    
+    return get_structured_memo(contract_data, revenue_result)
+
 
 @app.get("/contracts/{contract_id}/audit-memos/structured")
-def get_structured_audit_memos(contract_id: str):
+def get_structured_audit_memos(contract_id: str, if_none_match: Optional[str] = Header(default=None)):
     try:
         with next(get_session()) as session:
-            contract = session.query(Contract).filter(Contract.external_id == contract_id).first()
-            if not contract:
+            row = session.exec(
+                select(Contract, AuditMessage.structured_memo, AuditMessage.content_hash)
+                .join(AuditMessage, AuditMessage.contract_id == Contract.id, isouter=True)
+                .where(Contract.external_id == contract_id)
+                .order_by(AuditMessage.id.desc())
+            ).first()
+            if not row:
                 raise HTTPException(status_code=404, detail="Contract not found")
             
-            if not contract.extracted_json:
-                raise HTTPException(status_code=404, detail="Contract data not found - contract may not be processed yet")
+            contract, structured_memo, content_hash = row
+            if structured_memo is None:
+                if not contract.extracted_json:
+                    raise HTTPException(status_code=404, detail="Contract data not found - contract may not be processed yet")
+                structured_memo = _build_structured_memo(session, contract)
+                content_hash = get_memo_content_hash(structured_memo)
             
-            extracted_data = contract.extracted_json
+            etag = f'"{content_hash}"'
+            if _etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag})
             
-            performance_obligations = []
-            for obligation in extracted_data.get("performance_obligations", []):
-                performance_obligations.append({
-                    "name": obligation.get("name", ""),
-                    "type": obligation.get("type", "Service"),
-                    "revenue_recognition_method": obligation.get("revenue_recognition_method", "over_time"),
-                    "ssp": obligation.get("ssp", 0),
-                    "allocated_value": obligation.get("allocated_value", 0),
-                    "recognition_trigger": obligation.get("recognition_trigger", "Monthly" if obligation.get("revenue_recognition_method") == "over_time" else "Upon Completion")
-                })
-            
-            contract_data = {
-                "contract_id": extracted_data.get("contract_id", contract.external_id or str(contract.id)),
-                "provider": extracted_data.get("provider", "Provider"),
-                "customer": extracted_data.get("customer", "Customer"),
-                "total_contract_value": extracted_data.get("total_contract_value", 0),
-                "effective_date": extracted_data.get("effective_date", ""),
-                "end_date": extracted_data.get("end_date", ""),
-                "currency": extracted_data.get("currency", "USD"),
-                "performance_obligations": performance_obligations,
-                "variable_considerations": extracted_data.get("variable_considerations", []),
-                "discounts": extracted_data.get("discounts", [])
+            return JSONResponse(content=structured_memo, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@app.post("/contracts/{contract_id}/simulate")
+def simulate(contract_id: str, patch: List[Dict[str, Any]] = Body(...)):
+    try:
+        with next(get_session()) as session:
+            return simulate_contract(session, contract_id, patch)
+    except ContractNotFound:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    except ContractNotProcessed:
+        raise HTTPException(status_code=404, detail="Contract data not found - contract may not be processed yet")
+    except JsonPatchTestFailed as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except JsonPatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SimulationInputError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _get_modifiable_contract(session, contract_id: str) -> Contract:
+    contract = session.query(Contract).filter(Contract.external_id == contract_id).first()
+    if not contract:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    if contract.status != "processed" or not contract.extracted_json:
+        raise HTTPException(status_code=409, detail="Contract must be processed before it can be modified")
+    return contract
+
+
+def _start_modification(session, modification: ContractModification) -> Dict[str, Any]:
+    session.add(modification)
+    session.commit()
+    session.refresh(modification)
+    
+    task = apply_contract_modification.delay(modification.id)
+    
+    return {
+        "message": "Contract modification accepted. Processing started in background.",
+        "modification_id": modification.id,
+        "task_id": task.id,
+        "status": modification.status,
+        "processing_status": "started"
+    }
+
+
+@app.post("/contracts/{contract_id}/modifications", status_code=202)
+def create_modification(contract_id: str, delta: ContractModificationDelta):
+    with next(get_session()) as session:
+        contract = _get_modifiable_contract(session, contract_id)
+        delta_json = delta.model_dump(mode='json')
+        try:
+            apply_modification_delta(contract.extracted_json, delta_json)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        return _start_modification(session, ContractModification(
+            contract_id=contract.id,
+            source="delta",
+            delta=delta_json,
+            effective_date=delta.effective_date,
+            accounting_treatment=delta.accounting_treatment.value
+        ))
+
+
+@app.post("/contracts/{contract_id}/modifications/upload", status_code=202)
+async def upload_modification(contract_id: str, file: UploadFile = File(...)):
+    file_bytes = await file.read()
+    
+    text_content, file_info = FileProcessor.extract_text(file_bytes, file.filename, file.content_type)
+    
+    with next(get_session()) as session:
+        contract = _get_modifiable_contract(session, contract_id)
+        return _start_modification(session, ContractModification(
+            contract_id=contract.id,
+            source="document",
+            amendment_text=text_content
+        ))
+
+
+@app.post("/contracts/{contract_id}/reextract", status_code=202)
+def reextract_fields(contract_id: str, request: FieldReextractionRequest):
+    """Re-extract some fields or obligations of a processed contract from their sections only"""
+    with next(get_session()) as session:
+        contract = _get_modifiable_contract(session, contract_id)
+        targets = request.model_dump()
+        try:
+            validate_reextraction_targets(contract.extracted_json, targets)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        return _start_modification(session, ContractModification(
+            contract_id=contract.id,
+            source=REEXTRACTION_SOURCE,
+            targets=targets
+        ))
+
+
+@app.get("/contracts/{contract_id}/sections")
+def get_sections(contract_id: str):
+    with next(get_session()) as session:
+        contract = session.query(Contract).filter(Contract.external_id == contract_id).first()
+        if not contract:
+            raise HTTPException(status_code=404, detail="Contract not found")
+        
+        sections = session.exec(
+            select(ContractSection)
+            .where(ContractSection.contract_id == contract.id)
+            .order_by(ContractSection.position)
+        ).all()
+        return [
+            {
+                "position": section.position,
+                "title": section.title,
+                "start_offset": section.start_offset,
+                "end_offset": section.end_offset,
+                "keywords": section.keywords,
+                "has_date": section.has_date,
+                "has_money": section.has_money,
+                "relevant": section.relevant
             }
-            
-            schedules = session.exec(
-                select(RevenueSchedule, ContractObligation)
-                .join(ContractObligation, RevenueSchedule.obligation_id == ContractObligation.id, isouter=True)
-                .where(RevenueSchedule.contract_id == contract.id)
-            ).all()
-            
-            revenue_result = {
-                "revenue_schedule": [
-                    {
-                        "period_start": schedule.period_start.strftime("%Y-%m-%d") if schedule.period_start else "",
-                        "period_end": schedule.period_end.strftime("%Y-%m-%d") if schedule.period_end else "",
-                        "amount": schedule.amount or 0,
-                        "recognition_method": obligation.recognition_method if obligation else "over_time",
-                        "status": "recognized" if schedule.recognized else "pending"
-                    }
-                    for schedule, obligation in schedules
-                ]
+            for section in sections
+        ]
+
+
+@app.get("/contracts/{contract_id}/modifications")
+def get_modifications(contract_id: str):
+    with next(get_session()) as session:
+        contract = session.query(Contract).filter(Contract.external_id == contract_id).first()
+        if not contract:
+            raise HTTPException(status_code=404, detail="Contract not found")
+        
+        modifications = session.exec(
+            select(ContractModification)
+            .where(ContractModification.contract_id == contract.id)
+            .order_by(ContractModification.id)
+        ).all()
+        return [
+            {
+                "id": modification.id,
+                "source": modification.source,
+                "effective_date": modification.effective_date,
+                "accounting_treatment": modification.accounting_treatment,
+                "delta": modification.delta,
+                "targets": modification.targets,
+                "status": modification.status,
+                "error": modification.error,
+                "created_at": modification.created_at,
+                "applied_at": modification.applied_at
             }
-            
-            from app.audit_memo import get_structured_memo
-            structured_memo = get_structured_memo(contract_data, revenue_result)
-            
-            return structured_memo
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
\ No newline at end of file
+            for modification in modifications
+        ]
+
+
+@app.get("/exports/revenue-schedules")
+def export_revenue_schedules(
+    format: str = "csv",
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    status: Optional[str] = None,
+    customer: Optional[str] = None,
+    reporting_currency: Optional[str] = None,
+    fx_method: str = "period_end",
+):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    if status and status not in EXPORT_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unsupported status: {status}")
+    if fx_method not in FX_METHODS:
+        raise HTTPException(status_code=400, detail=f"Unsupported FX method: {fx_method}")
+    if reporting_currency:
+        # Fail before streaming starts rather than midway through the file
+        try:
+            if not get_fx_rates().has_currency(reporting_currency):
+                raise HTTPException(status_code=400, detail=f"No FX rates for currency: {reporting_currency}")
+        except FxRateError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    filters = {
+        "period_from": period_from,
+        "period_to": period_to,
+        "status": status,
+        "customer": customer,
+        "reporting_currency": reporting_currency,
+        "fx_method": fx_method,
+    }
+    if format == "parquet":
+        return StreamingResponse(
+            stream_parquet(**filters),
+            media_type="application/vnd.apache.parquet",
+            headers={"Content-Disposition": 'attachment; filename="revenue-schedules.parquet"'}
+        )
+    
+    return StreamingResponse(
+        stream_csv(**filters),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="revenue-schedules.csv"'}
+    )
+
+
+@app.get("/deferred-revenue")
+def get_deferred_revenue(
+    as_of: date,
+    contract_id: Optional[str] = None,
+    customer: Optional[str] = None,
+    reporting_currency: Optional[str] = None,
+):
+    try:
+        with next(get_session()) as session:
+            balances = deferred_revenue_balances(
+                session, as_of, contract_id=contract_id, customer=customer, reporting_currency=reporting_currency
+            )
+    except FxRateError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if contract_id and not balances["contracts"]:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    return balances
+
+
+@app.post("/usage/events", status_code=202)
+async def ingest_usage(request: Request, format: Optional[str] = None, batch_id: Optional[str] = None):
+    usage_format = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if usage_format not in USAGE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported usage format: {usage_format}")
+    
+    try:
+        payload = (await request.body()).decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Usage events must be UTF-8 encoded")
+    if not payload.strip():
+        raise HTTPException(status_code=400, detail="No usage events in request body")
+    if usage_format == "csv":
+        header = payload.split("\n", 1)[0].strip().split(",")
+        missing = [name for name in USAGE_FIELDS if name not in header]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"CSV usage header is missing: {', '.join(missing)}")
+    
+    batch_id = batch_id or str(uuid.uuid4())
+    task = ingest_usage_events.delay(batch_id, payload, usage_format)
+    
+    return {
+        "message": "Usage events accepted. Aggregation runs in background.",
+        "batch_id": batch_id,
+        "task_id": task.id,
+        "processing_status": "started"
+    }
+
+
+@app.post("/journal-entries/close/{close_period}")
+def close_period(close_period: str):
+    try:
+        parse_close_period(close_period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    task = close_period_journal_entries.delay(close_period)
+    
+    return {
+        "message": "Period close started. Journal entries are generated in background.",
+        "close_period": close_period,
+        "task_id": task.id,
+        "processing_status": "started"
+    }
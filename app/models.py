@@ -1,13 +1,13 @@
 from datetime import datetime, date, timezone
 from typing import Optional
-from sqlalchemy import JSON
+from sqlalchemy import DDL, JSON, Index, UniqueConstraint, event
 from sqlmodel import Column, Field, SQLModel
 
 
 class Contract(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
     external_id: Optional[str] = Field(default=None, index=True)
-    customer_name: Optional[str]
+    customer_name: Optional[str] = Field(default=None, index=True)
     file_name: Optional[str]
     content_type: Optional[str]
     raw_text: Optional[str]
@@ -17,6 +17,8 @@ class Contract(SQLModel, table=True):
     start_date: Optional[date]
     end_date: Optional[date]
     status: str = Field(default="uploaded")
+    tenant_id: str = Field(default="default", index=True)
+    size_class: Optional[str] = Field(default=None)
     time_saved_hours: Optional[float]
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -30,23 +32,74 @@ class ContractObligation(SQLModel, table=True):
     standalone_price: Optional[float]
     allocated_amount: Optional[float]
     recognition_method: Optional[str]
+    scheduled_amount: Optional[float]
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
     
 class RevenueSchedule(SQLModel, table=True):
+    __table_args__ = (Index("ix_revenueschedule_obligation_period", "obligation_id", "period_start"),)
+    
     id: int = Field(default=None, primary_key=True)
     obligation_id: Optional[int] = Field(default=None, foreign_key="contractobligation.id")
-    contract_id: int = Field(default=None, foreign_key="contract.id")
-    period_start: Optional[date]
+    contract_id: int = Field(default=None, foreign_key="contract.id", index=True)
+    period_start: Optional[date] = Field(default=None, index=True)
     period_end: Optional[date]
     amount: Optional[float]
+    cumulative_amount: Optional[float]
     recognized: bool = Field(default=False)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
 class AuditMessage(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
-    contract_id: int = Field(default=None, foreign_key="contract.id")
+    contract_id: int = Field(default=None, foreign_key="contract.id", index=True)
     memo_text: Optional[str]
+    structured_memo: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    content_hash: Optional[str]
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    
+    
+class JournalEntry(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("close_period", "entry_id", "account"),)
+    
+    id: int = Field(default=None, primary_key=True)
+    close_period: str = Field(index=True)
+    entry_id: str
+    contract_id: int = Field(default=None, foreign_key="contract.id", index=True)
+    obligation_id: Optional[int] = Field(default=None, foreign_key="contractobligation.id")
+    entry_date: date
+    account: str
+    debit: float = Field(default=0.0)
+    credit: float = Field(default=0.0)
+    description: Optional[str]
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    
+    
+class ContractModification(SQLModel, table=True):
+    id: int = Field(default=None, primary_key=True)
+    contract_id: int = Field(default=None, foreign_key="contract.id", index=True)
+    source: str
+    amendment_text: Optional[str]
+    delta: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    effective_date: Optional[date]
+    accounting_treatment: Optional[str]
+    targets: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    status: str = Field(default="pending")
+    error: Optional[str]
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    applied_at: Optional[datetime]
+    
+    
+class UsageRollup(SQLModel, table=True):
+    __table_args__ = (Index("ix_usagerollup_contract_metric_period", "contract_id", "metric", "period_start"),)
+    
+    id: int = Field(default=None, primary_key=True)
+    batch_id: str = Field(index=True)
+    contract_id: int = Field(default=None, foreign_key="contract.id")
+    metric: str
+    period_start: date
+    period_end: date
+    quantity: float = Field(default=0.0)
+    event_count: int = Field(default=0)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
     
@@ -56,4 +109,71 @@ class AuditLog(SQLModel, table=True):
     contract_id: int = Field(default=None, foreign_key="contract.id")
     input: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     llm_response: Optional[dict] = Field(default=None, sa_column=Column(JSON))
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    
+    
+class PipelineCheckpoint(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("external_id", "stage"),)
+    
+    id: int = Field(default=None, primary_key=True)
+    external_id: str = Field(index=True)
+    stage: str
+    payload: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    
+    
+class ContractSection(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("contract_id", "position"),)
+    
+    id: int = Field(default=None, primary_key=True)
+    contract_id: int = Field(default=None, foreign_key="contract.id")
+    position: int
+    title: str
+    start_offset: int
+    end_offset: int
+    content: str
+    keywords: Optional[list] = Field(default=None, sa_column=Column(JSON))
+    has_date: bool = Field(default=False)
+    has_money: bool = Field(default=False)
+    relevant: bool = Field(default=False)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    
+    
+class ContractSearchDocument(SQLModel, table=True):
+    contract_id: int = Field(primary_key=True, foreign_key="contract.id")
+    titles: str = Field(default="")
+    body: str = Field(default="")
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# The full-text index is created with the search table, by dialect: a weighted tsvector
+# column with a GIN index on Postgres, and an external-content FTS5 table kept in sync by
+# triggers on SQLite (see `app.search`)
+_search_table = ContractSearchDocument.__table__.name
+
+for _statement in (
+    f"""ALTER TABLE {_search_table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', titles), 'A') || setweight(to_tsvector('english', body), 'B')
+    ) STORED""",
+    f"CREATE INDEX ix_{_search_table}_search_vector ON {_search_table} USING GIN (search_vector)",
+):
+    event.listen(ContractSearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+for _statement in (
+    f"""CREATE VIRTUAL TABLE {_search_table}_fts USING fts5(
+        titles, body, content='{_search_table}', content_rowid='contract_id', tokenize='porter unicode61'
+    )""",
+    # Rank by BM25 with matches in section titles weighted above matches in the body
+    f"INSERT INTO {_search_table}_fts({_search_table}_fts, rank) VALUES ('rank', 'bm25(4.0, 1.0)')",
+    f"""CREATE TRIGGER {_search_table}_fts_insert AFTER INSERT ON {_search_table} BEGIN
+        INSERT INTO {_search_table}_fts(rowid, titles, body) VALUES (new.contract_id, new.titles, new.body);
+    END""",
+    f"""CREATE TRIGGER {_search_table}_fts_delete AFTER DELETE ON {_search_table} BEGIN
+        INSERT INTO {_search_table}_fts({_search_table}_fts, rowid, titles, body) VALUES ('delete', old.contract_id, old.titles, old.body);
+    END""",
+    f"""CREATE TRIGGER {_search_table}_fts_update AFTER UPDATE ON {_search_table} BEGIN
+        INSERT INTO {_search_table}_fts({_search_table}_fts, rowid, titles, body) VALUES ('delete', old.contract_id, old.titles, old.body);
+        INSERT INTO {_search_table}_fts(rowid, titles, body) VALUES (new.contract_id, new.titles, new.body);
+    END""",
+):
+    event.listen(ContractSearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,10 @@
+"""
+Reporting package for balance queries over the stored revenue schedules.
+"""
+
+from .deferred_revenue import deferred_revenue_balances, recognized_as_of_query
+
+__all__ = [
+    'deferred_revenue_balances',
+    'recognized_as_of_query',
+]
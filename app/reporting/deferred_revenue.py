@@ -0,0 +1,121 @@
+"""
+Deferred Revenue Balances
+
+This module answers "what was deferred revenue as of date D" for a contract, a customer or
+the whole portfolio.
+
+Every schedule row stores the cumulative amount of its obligation through that row, and
+every obligation stores its total scheduled amount. A schedule row counts as recognized once
+its period has started, so the deferred balance of an obligation as of D is its scheduled
+amount minus the cumulative amount of its last row starting on or before D: one lookup on
+the (obligation_id, period_start) index, whatever the length of the schedule.
+
+Balances can be converted to a reporting currency at the rates in effect on the as-of date,
+in which case totals are given in that currency only.
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlmodel import select
+
+from app.ASC606.money import from_cents, to_cents
+from app.fx import get_fx_rates
+from app.models import Contract, ContractObligation, RevenueSchedule
+
+
+def recognized_as_of_query(as_of: date):
+    """Correlated scalar subquery: an obligation's cumulative recognized amount as of a date"""
+    return (
+        select(RevenueSchedule.cumulative_amount)
+        .where(RevenueSchedule.obligation_id == ContractObligation.id)
+        .where(RevenueSchedule.period_start <= as_of)
+        .order_by(RevenueSchedule.period_start.desc(), RevenueSchedule.id.desc())
+        .limit(1)
+        .correlate(ContractObligation)
+        .scalar_subquery()
+    )
+
+
+def deferred_revenue_balances(
+    session,
+    as_of: date,
+    contract_id: Optional[str] = None,
+    customer: Optional[str] = None,
+    reporting_currency: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Scheduled, recognized and deferred revenue per contract as of a date.
+
+    Filter by external contract id, by customer name, or neither for the whole portfolio.
+    Totals are given per currency, or in `reporting_currency` when converting.
+    """
+    scheduled = func.coalesce(func.sum(ContractObligation.scheduled_amount), 0)
+    recognized = func.coalesce(func.sum(func.coalesce(recognized_as_of_query(as_of), 0)), 0)
+
+    query = (
+        select(Contract.external_id, Contract.customer_name, Contract.currency, scheduled, recognized)
+        .join(ContractObligation, ContractObligation.contract_id == Contract.id)
+        .group_by(Contract.id, Contract.external_id, Contract.customer_name, Contract.currency)
+        .order_by(Contract.id)
+    )
+    if contract_id:
+        query = query.where(Contract.external_id == contract_id)
+    if customer:
+        query = query.where(Contract.customer_name == customer)
+
+    contracts: List[Dict[str, Any]] = []
+    for external_id, customer_name, currency, scheduled_amount, recognized_amount in session.exec(query):
+        scheduled_cents, recognized_cents = to_cents(scheduled_amount), to_cents(recognized_amount)
+        contracts.append({
+            "contract_id": external_id,
+            "customer_name": customer_name,
+            "currency": currency,
+            "scheduled_amount": from_cents(scheduled_cents),
+            "recognized_amount": from_cents(recognized_cents),
+            "deferred_amount": from_cents(scheduled_cents - recognized_cents),
+        })
+
+    if reporting_currency and contracts:
+        _convert_balances(contracts, as_of, reporting_currency)
+
+    totals: Dict[str, Dict[str, int]] = {}
+    for contract in contracts:
+        currency = reporting_currency or contract["currency"] or "N/A"
+        prefix = "reporting_" if reporting_currency else ""
+        currency_totals = totals.setdefault(currency, {"scheduled": 0, "recognized": 0})
+        currency_totals["scheduled"] += to_cents(contract[f"{prefix}scheduled_amount"])
+        currency_totals["recognized"] += to_cents(contract[f"{prefix}recognized_amount"])
+
+    return {
+        "as_of": as_of.isoformat(),
+        "reporting_currency": reporting_currency,
+        "contracts": contracts,
+        "totals": {
+            currency: {
+                "scheduled_amount": from_cents(values["scheduled"]),
+                "recognized_amount": from_cents(values["recognized"]),
+                "deferred_amount": from_cents(values["scheduled"] - values["recognized"]),
+            }
+            for currency, values in totals.items()
+        },
+    }
+
+
+def _convert_balances(contracts: List[Dict[str, Any]], as_of: date, reporting_currency: str) -> None:
+    """Add reporting currency balances to every contract, in one vectorized conversion per amount"""
+    currencies = [contract["currency"] for contract in contracts]
+    days = [as_of] * len(contracts)
+    fx_rates = get_fx_rates()
+
+    converted = {
+        field: fx_rates.convert([contract[field] for contract in contracts], currencies, days, days, reporting_currency)
+        for field in ("scheduled_amount", "recognized_amount")
+    }
+    for index, contract in enumerate(contracts):
+        scheduled_cents = to_cents(converted["scheduled_amount"][index])
+        recognized_cents = to_cents(converted["recognized_amount"][index])
+        contract["reporting_scheduled_amount"] = from_cents(scheduled_cents)
+        contract["reporting_recognized_amount"] = from_cents(recognized_cents)
+        contract["reporting_deferred_amount"] = from_cents(scheduled_cents - recognized_cents)
@@ -0,0 +1,15 @@
+"""
+Search package for full-text search over the stored contract text.
+"""
+
+from .index import build_search_document, index_contract, index_missing_contracts
+from .query import SEARCH_MAX_LIMIT, SearchUnavailable, search_contracts
+
+__all__ = [
+    'build_search_document',
+    'index_contract',
+    'index_missing_contracts',
+    'SEARCH_MAX_LIMIT',
+    'SearchUnavailable',
+    'search_contracts',
+]
@@ -0,0 +1,61 @@
+"""
+Contract Search Index
+
+This module keeps the searchable text of each contract: the contract text cleaned the same
+way as for extraction, and the titles of the sections `split_sections` finds in it, which
+rank above the body. The database indexes both (see `ContractSearchDocument`).
+
+Contracts are indexed when the revenue recognition job persists them; contracts stored
+before search existed are indexed in batches by `index_missing_contracts`.
+"""
+
+from datetime import datetime, timezone
+from typing import Tuple
+
+from sqlalchemy import insert
+from sqlmodel import select
+
+from app.extractor.preprocess import clean_text, normalize_lines, split_sections
+from app.models import Contract, ContractSearchDocument
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def build_search_document(raw_text: str) -> Tuple[str, str]:
+    """The section titles, one per line, and the cleaned text of a contract"""
+    body = normalize_lines(clean_text(raw_text or ""))
+    titles = "\n".join(section["title"] for section in split_sections(body))
+    return titles, body
+
+
+def index_contract(session, contract_id: int, raw_text: str) -> None:
+    """Add or replace a contract's search document, in the caller's transaction"""
+    titles, body = build_search_document(raw_text)
+    document = session.get(ContractSearchDocument, contract_id)
+    if document is None:
+        session.add(ContractSearchDocument(contract_id=contract_id, titles=titles, body=body))
+        return
+    document.titles = titles
+    document.body = body
+    document.updated_at = datetime.now(timezone.utc)
+
+
+def index_missing_contracts(session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Index the contracts that have text but no search document, committing per batch"""
+    indexed = 0
+    while True:
+        contracts = session.exec(
+            select(Contract.id, Contract.raw_text)
+            .outerjoin(ContractSearchDocument, ContractSearchDocument.contract_id == Contract.id)
+            .where(ContractSearchDocument.contract_id.is_(None), Contract.raw_text.is_not(None))
+            .limit(batch_size)
+        ).all()
+        if not contracts:
+            return indexed
+        documents = []
+        for contract_id, raw_text in contracts:
+            titles, body = build_search_document(raw_text)
+            documents.append({"contract_id": contract_id, "titles": titles, "body": body})
+        session.execute(insert(ContractSearchDocument), documents)
+        session.commit()
+        indexed += len(contracts)
@@ -0,0 +1,142 @@
+"""
+Contract Search Queries
+
+This module runs ranked full-text queries over the contract search index and returns the
+best matches with highlighted excerpts.
+
+Queries use web search syntax on every backend: words must all appear (in any inflection),
+"quoted phrases" must appear as written, OR separates alternatives and a leading - excludes
+a word or phrase. For example `"service credit" OR "early termination fee"`.
+
+- Postgres: `websearch_to_tsquery` against the weighted `tsvector` column and its GIN index,
+  ranked with `ts_rank_cd`, excerpts from `ts_headline`
+- SQLite: the FTS5 table, ranked with BM25 (titles weighted above the body), excerpts from
+  `snippet`; the query is translated to FTS5 syntax
+
+Matches are ranked first and excerpts are only built for the returned page. Matched terms
+are wrapped in <mark> tags; the indexed text is cleaned of angle brackets, so excerpts are
+safe to render as HTML.
+"""
+
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+from app.models import ContractSearchDocument
+
+SEARCH_MAX_LIMIT = 100
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+EXCERPT_WORDS = 24
+
+_TABLE = ContractSearchDocument.__table__.name
+_FTS_TABLE = f"{_TABLE}_fts"
+
+# A quoted phrase or a bare word, either optionally excluded with a leading -
+_QUERY_TOKEN = re.compile(r'(-?)"([^"]*)"?|(-?)(\S+)')
+
+_POSTGRES_SEARCH = text(f"""
+    WITH query AS (SELECT websearch_to_tsquery('english', :query) AS terms),
+    hits AS (
+        SELECT document.contract_id, ts_rank_cd(document.search_vector, query.terms, 32) AS score
+        FROM {_TABLE} AS document, query
+        WHERE document.search_vector @@ query.terms
+        ORDER BY score DESC, document.contract_id
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT contract.external_id, contract.customer_name, contract.file_name, contract.status, hits.score,
+        ts_headline('english', document.titles, query.terms,
+            'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords={EXCERPT_WORDS // 2}, MinWords=3') AS title_highlight,
+        ts_headline('english', document.body, query.terms,
+            'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords={EXCERPT_WORDS}, MinWords=8, FragmentDelimiter=" … "') AS highlight
+    FROM hits
+    JOIN {_TABLE} AS document ON document.contract_id = hits.contract_id
+    JOIN contract ON contract.id = hits.contract_id
+    CROSS JOIN query
+    ORDER BY hits.score DESC, hits.contract_id
+""")
+
+_SQLITE_SEARCH = text(f"""
+    WITH hits AS (
+        SELECT rowid AS contract_id, rank,
+            snippet({_FTS_TABLE}, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', ' … ', {EXCERPT_WORDS // 2}) AS title_highlight,
+            snippet({_FTS_TABLE}, 1, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', ' … ', {EXCERPT_WORDS}) AS highlight
+        FROM {_FTS_TABLE}
+        WHERE {_FTS_TABLE} MATCH :query
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT contract.external_id, contract.customer_name, contract.file_name, contract.status, -hits.rank AS score,
+        hits.title_highlight, hits.highlight
+    FROM hits
+    JOIN contract ON contract.id = hits.contract_id
+    ORDER BY hits.rank
+""")
+
+
+class SearchUnavailable(Exception):
+    """Raised when the database has no full-text search backend."""
+
+
+def to_fts5_query(query: str) -> str:
+    """
+    Translate a web search style query to an FTS5 query expression.
+
+    Words and phrases are quoted, so FTS5 operators and punctuation in them are matched as
+    text. An exclusion applies to the OR alternative it appears in, as in Postgres.
+    """
+    alternatives: List[List[str]] = [[]]
+    exclusions: List[List[str]] = [[]]
+    for match in _QUERY_TOKEN.finditer(query):
+        quoted_excluded, phrase, excluded, word = match.groups()
+        if phrase is None and word.upper() == "OR":
+            if alternatives[-1]:
+                alternatives.append([])
+                exclusions.append([])
+            continue
+        words = re.findall(r"\w+", phrase if phrase is not None else word)
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"'
+        if quoted_excluded or excluded:
+            exclusions[-1].append(term)
+        else:
+            alternatives[-1].append(term)
+
+    expressions = [
+        "(" + " AND ".join(terms) + "".join(f" NOT {term}" for term in excluded_terms) + ")"
+        for terms, excluded_terms in zip(alternatives, exclusions)
+        if terms
+    ]
+    return " OR ".join(expressions)
+
+
+def search_contracts(session, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+    """The contracts best matching a query, with highlighted excerpts of their titles and text"""
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    offset = max(0, offset)
+    dialect = session.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        rows = session.execute(_POSTGRES_SEARCH, {"query": query, "limit": limit, "offset": offset}).all()
+    elif dialect == "sqlite":
+        expression = to_fts5_query(query)
+        if not expression:
+            return []
+        rows = session.execute(_SQLITE_SEARCH, {"query": expression, "limit": limit, "offset": offset}).all()
+    else:
+        raise SearchUnavailable(f"Full-text search is not available on {dialect}")
+
+    return [
+        {
+            "contract_id": row.external_id,
+            "customer_name": row.customer_name,
+            "file_name": row.file_name,
+            "status": row.status,
+            "score": round(float(row.score), 6),
+            "title_highlight": row.title_highlight,
+            "highlight": row.highlight,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,29 @@
+"""
+Simulation package for what-if scenarios.
+
+This package re-runs the ASC 606 engine on patched copies of stored contract extractions
+without persisting anything, so deal desk can preview the effect of term changes.
+"""
+
+from .json_patch import PATCH_OPERATIONS, JsonPatchError, JsonPatchTestFailed, apply_json_patch
+from .simulator import (
+    ContractNotFound,
+    ContractNotProcessed,
+    SimulationInputError,
+    contract_cache,
+    diff_schedules,
+    simulate_contract,
+)
+
+__all__ = [
+    'PATCH_OPERATIONS',
+    'ContractNotFound',
+    'ContractNotProcessed',
+    'JsonPatchError',
+    'JsonPatchTestFailed',
+    'SimulationInputError',
+    'apply_json_patch',
+    'contract_cache',
+    'diff_schedules',
+    'simulate_contract',
+]
@@ -0,0 +1,128 @@
+"""
+JSON Patch
+
+This module applies RFC 6902 JSON Patch documents to extracted contract data.
+
+Supported operations are `add`, `remove`, `replace`, `move`, `copy` and `test`. Paths are
+JSON Pointers (RFC 6901), e.g. `/performance_obligations/0/ssp` or `/discounts/-`.
+"""
+
+import copy
+from typing import Any, Dict, List, Tuple
+
+PATCH_OPERATIONS = ["add", "remove", "replace", "move", "copy", "test"]
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch document is malformed or cannot be applied."""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """Raised when a `test` operation does not match the document."""
+
+
+def _parse_pointer(pointer: Any) -> List[str]:
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    if pointer == "":
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {token}")
+    return index
+
+
+def _resolve(document: Any, tokens: List[str]) -> Any:
+    current = document
+    for token in tokens:
+        if isinstance(current, dict):
+            if token not in current:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            current = current[token]
+        elif isinstance(current, list):
+            current = current[_list_index(current, token)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return current
+
+
+def _parent(document: Any, tokens: List[str]) -> Tuple[Any, str]:
+    if not tokens:
+        raise JsonPatchError("The document root cannot be the target of this operation")
+    return _resolve(document, tokens[:-1]), tokens[-1]
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent, key = _parent(document, tokens)
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, key, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to a scalar at /{'/'.join(tokens)}")
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    parent, key = _parent(document, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, key))
+    raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def apply_json_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """
+    Apply a JSON Patch to a copy of `document` and return the patched copy.
+
+    Operations are applied in order and the patch is atomic: if any operation fails, the
+    original document is left untouched and `JsonPatchError` is raised.
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch must be a list of operations")
+
+    result = copy.deepcopy(document)
+    for number, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get("op") not in PATCH_OPERATIONS:
+            raise JsonPatchError(f"Operation {number}: op must be one of {', '.join(PATCH_OPERATIONS)}")
+        op = operation["op"]
+        tokens = _parse_pointer(operation.get("path"))
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"Operation {number}: '{op}' requires a value")
+
+        if op == "add":
+            result = _add(result, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            _remove(result, tokens)
+        elif op == "replace":
+            _resolve(result, tokens)
+            if tokens:
+                _remove(result, tokens)
+            result = _add(result, tokens, copy.deepcopy(operation["value"]))
+        elif op == "test":
+            if _resolve(result, tokens) != operation["value"]:
+                raise JsonPatchTestFailed(f"Operation {number}: test failed at {operation['path']}")
+        else:
+            source = _parse_pointer(operation.get("from"))
+            if op == "move":
+                if tokens[:len(source)] == source and tokens != source:
+                    raise JsonPatchError(f"Operation {number}: cannot move a value into itself")
+                value = _remove(result, source) if source else result
+            else:
+                value = copy.deepcopy(_resolve(result, source))
+            result = _add(result, tokens, value)
+
+    return result
@@ -0,0 +1,198 @@
+"""
+Contract Simulation
+
+This module runs what-if scenarios against processed contracts. A scenario is a JSON Patch
+applied to the contract's stored extraction; the patched contract is validated, run through
+the ASC 606 engine in-process and compared with the stored revenue schedule. Nothing is
+written to the database.
+
+The stored extraction and schedule of recently simulated contracts are kept in an in-process
+LRU cache, keyed by the contract's `updated_at`, so repeated scenarios on the same contract
+cost a single primary-key lookup plus the engine run.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlmodel import select
+
+from app.ASC606 import ASC606Engine
+from app.ASC606.money import from_cents, to_cents
+from app.extractor.schemas import ContractLLMResponseJsonSchema
+from app.models import Contract, ContractObligation, RevenueSchedule
+from app.simulation.json_patch import apply_json_patch
+
+DEFAULT_CACHE_SIZE = 256
+
+ScheduleKey = Tuple[str, date, date]
+
+
+class ContractNotFound(LookupError):
+    """Raised when the contract does not exist."""
+
+
+class ContractNotProcessed(ValueError):
+    """Raised when the contract has no stored extraction to simulate on."""
+
+
+class SimulationInputError(ValueError):
+    """Raised when the patched contract fails schema validation or the engine rejects it."""
+
+
+@dataclass(frozen=True)
+class CachedContract:
+    """Stored extraction and schedule of a contract at a given version"""
+    version: datetime
+    extracted_json: Dict[str, Any]
+    schedule: Dict[ScheduleKey, int]
+
+
+class ContractCache:
+    """Thread-safe LRU cache of `CachedContract` entries keyed by external contract id"""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, CachedContract]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, contract_id: str, version: datetime) -> Optional[CachedContract]:
+        with self._lock:
+            entry = self._entries.get(contract_id)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(contract_id)
+            self.hits += 1
+            return entry
+
+    def put(self, contract_id: str, entry: CachedContract) -> None:
+        with self._lock:
+            self._entries[contract_id] = entry
+            self._entries.move_to_end(contract_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, contract_id: Optional[str] = None) -> None:
+        with self._lock:
+            if contract_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(contract_id, None)
+
+
+contract_cache = ContractCache(int(os.getenv("SIMULATION_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
+
+
+def _load_contract(session, contract_id: str) -> CachedContract:
+    """Load a contract's extraction and stored schedule, through the cache"""
+    row = session.exec(
+        select(Contract.id, Contract.updated_at).where(Contract.external_id == contract_id)
+    ).first()
+    if row is None:
+        raise ContractNotFound(contract_id)
+
+    contract_pk, version = row
+    cached = contract_cache.get(contract_id, version)
+    if cached is not None:
+        return cached
+
+    extracted_json = session.exec(select(Contract.extracted_json).where(Contract.id == contract_pk)).first()
+    if not extracted_json:
+        raise ContractNotProcessed(contract_id)
+
+    schedule: Dict[ScheduleKey, int] = {}
+    rows = session.exec(
+        select(ContractObligation.name, RevenueSchedule.period_start, RevenueSchedule.period_end, RevenueSchedule.amount)
+        .join(ContractObligation, RevenueSchedule.obligation_id == ContractObligation.id, isouter=True)
+        .where(RevenueSchedule.contract_id == contract_pk)
+    )
+    for name, period_start, period_end, amount in rows:
+        key = (name or "Unknown", period_start, period_end)
+        schedule[key] = schedule.get(key, 0) + to_cents(amount)
+
+    cached = CachedContract(version=version, extracted_json=extracted_json, schedule=schedule)
+    contract_cache.put(contract_id, cached)
+    return cached
+
+
+def diff_schedules(baseline: Dict[ScheduleKey, int], simulated: Dict[ScheduleKey, int]) -> Dict[str, Any]:
+    """
+    Compare two schedules keyed by (obligation, period start, period end), in cents.
+
+    Only periods whose amount changed are listed; periods present on one side only are
+    reported as added or removed.
+    """
+    changes = []
+    for key in sorted(baseline.keys() | simulated.keys(), key=lambda key: (key[1], key[2], key[0])):
+        before, after = baseline.get(key), simulated.get(key)
+        if before == after:
+            continue
+        obligation_name, period_start, period_end = key
+        changes.append({
+            "obligation_name": obligation_name,
+            "period_start": period_start.isoformat() if period_start else None,
+            "period_end": period_end.isoformat() if period_end else None,
+            "change": "added" if before is None else "removed" if after is None else "changed",
+            "stored_amount": from_cents(before) if before is not None else None,
+            "simulated_amount": from_cents(after) if after is not None else None,
+            "delta": from_cents((after or 0) - (before or 0)),
+        })
+
+    stored_total, simulated_total = sum(baseline.values()), sum(simulated.values())
+    return {
+        "stored_total": from_cents(stored_total),
+        "simulated_total": from_cents(simulated_total),
+        "total_delta": from_cents(simulated_total - stored_total),
+        "changed_periods": len(changes),
+        "changes": changes,
+    }
+
+
+def simulate_contract(session, contract_id: str, patch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply a JSON Patch to a contract's stored extraction, run the ASC 606 engine on the result
+    and diff the simulated schedule against the stored one.
+    """
+    cached = _load_contract(session, contract_id)
+    patched = apply_json_patch(cached.extracted_json, patch)
+
+    try:
+        contract_data = ContractLLMResponseJsonSchema.model_validate(patched).model_dump()
+    except ValidationError as e:
+        raise SimulationInputError(str(e)) from e
+
+    engine = ASC606Engine()
+    try:
+        revenue_result = engine.process_contract(contract_data)
+    except (KeyError, TypeError, ValueError) as e:
+        raise SimulationInputError(f"{type(e).__name__}: {e}") from e
+
+    simulated: Dict[ScheduleKey, int] = {}
+    for entry in engine.revenue_schedule:
+        key = (entry.obligation_name, entry.period_start, entry.period_end)
+        simulated[key] = simulated.get(key, 0) + to_cents(entry.amount)
+
+    return {
+        "contract_id": contract_id,
+        "operations_applied": len(patch),
+        "total_discount_amount": revenue_result["total_discount_amount"],
+        "diff": diff_schedules(cached.schedule, simulated),
+        "revenue_schedule": [
+            {
+                "obligation_name": entry["obligation_name"],
+                "period_start": entry["period_start"],
+                "period_end": entry["period_end"],
+                "amount": entry["amount"],
+                "recognition_method": entry["recognition_method"],
+                "status": entry["status"],
+            }
+            for entry in revenue_result["revenue_schedule"]
+        ],
+    }
@@ -0,0 +1,272 @@
+"""
+Tracing
+
+Lightweight spans for following a contract from the API through the Celery queue, Gemini
+extraction, the ASC 606 engine, audit memo rendering and persistence.
+
+Spans nest through a context variable and carry a W3C `traceparent`, which is propagated
+to Celery tasks in the message headers. Finished spans are handed to the exporter selected
+by the TRACING_EXPORTER environment variable:
+- unset or `none`: tracing disabled, `span()` returns a shared no-op context manager
+- `stdout`: one JSON line per span on stdout
+- `file:<path>`: one JSON line per span appended to a file
+- `<module>:<attribute>`: an exporter object, or a factory returning one
+"""
+
+import importlib
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+TRACEPARENT_HEADER = "traceparent"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_time: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    duration_ms: Optional[float] = None
+    status: str = "ok"
+    error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """Receives every finished span"""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class StdoutSpanExporter(SpanExporter):
+    """Writes spans as JSON lines to stdout"""
+
+    def export(self, span: Span) -> None:
+        sys.stdout.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends spans as JSON lines to a local file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+def exporter_from_string(spec: str) -> Optional[SpanExporter]:
+    """Build an exporter from a TRACING_EXPORTER value"""
+    spec = spec.strip()
+    if spec in ("", "none"):
+        return None
+    if spec == "stdout":
+        return StdoutSpanExporter()
+    if spec.startswith("file:"):
+        return FileSpanExporter(spec[len("file:"):])
+
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"Unsupported tracing exporter: {spec}")
+    exporter = getattr(importlib.import_module(module_name), attribute)
+    return exporter() if isinstance(exporter, type) or not hasattr(exporter, "export") else exporter
+
+
+_exporter: Optional[SpanExporter] = None
+_configured = False
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """The active exporter, configured from the environment on first use"""
+    global _exporter, _configured
+    if not _configured:
+        _exporter = exporter_from_string(os.getenv("TRACING_EXPORTER", ""))
+        _configured = True
+    return _exporter
+
+
+def set_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Replace the active exporter; `None` disables tracing"""
+    global _exporter, _configured
+    if _exporter is not None and _exporter is not exporter:
+        _exporter.shutdown()
+    _exporter = exporter
+    _configured = True
+
+
+def tracing_enabled() -> bool:
+    return get_exporter() is not None
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Trace and parent span ids from a W3C traceparent header, or None if it is malformed"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_traceparent() -> Optional[str]:
+    span = _current_span.get()
+    return span.traceparent if span else None
+
+
+class _NoopSpan:
+    """Returned by `span()` while tracing is disabled"""
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _SpanContext:
+    __slots__ = ("name", "attributes", "traceparent", "exporter", "span", "token", "started")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], traceparent: Optional[str], exporter: SpanExporter):
+        self.name = name
+        self.attributes = attributes
+        self.traceparent = traceparent
+        self.exporter = exporter
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = parse_traceparent(self.traceparent) or (secrets.token_hex(16), None)
+
+        self.span = Span(
+            name=self.name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent_id,
+            start_time=time.time(),
+            attributes=self.attributes,
+        )
+        self.token = _current_span.set(self.span)
+        self.started = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.span.duration_ms = round((time.perf_counter() - self.started) * 1000, 3)
+        if exc is not None:
+            self.span.status = "error"
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self.token)
+        self.exporter.export(self.span)
+        return False
+
+
+def span(name: str, traceparent: Optional[str] = None, **attributes: Any):
+    """
+    Context manager timing a block as a span, yielding the span or None when tracing is disabled.
+
+    The span is a child of the current span; without one, `traceparent` continues a remote trace.
+    """
+    exporter = _exporter if _configured else get_exporter()
+    if exporter is None:
+        return _NOOP_SPAN
+    return _SpanContext(name, attributes, traceparent, exporter)
+
+
+def traced(name: str) -> Callable:
+    """Decorator running each call of a function inside a span"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_task_spans: Dict[str, _SpanContext] = {}
+
+
+def instrument_celery() -> None:
+    """
+    Propagate the current trace into published tasks and run each task inside a span.
+
+    The traceparent travels as a message header, so the time a task spent queued shows up
+    as the gap between the publishing span and the task span.
+    """
+    from celery import signals
+
+    @signals.before_task_publish.connect(weak=False)
+    def _inject_traceparent(headers=None, **kwargs):
+        traceparent = current_traceparent()
+        if traceparent and headers is not None:
+            headers[TRACEPARENT_HEADER] = traceparent
+
+    @signals.task_prerun.connect(weak=False)
+    def _start_task_span(task_id=None, task=None, **kwargs):
+        if not tracing_enabled():
+            return
+        context = span(f"celery.task {task.name}", traceparent=task.request.get(TRACEPARENT_HEADER), task_id=task_id)
+        context.__enter__()
+        _task_spans[task_id] = context
+
+    @signals.task_postrun.connect(weak=False)
+    def _finish_task_span(task_id=None, state=None, **kwargs):
+        context = _task_spans.pop(task_id, None)
+        if context is None:
+            return
+        context.span.set_attribute("state", state)
+        if state != "SUCCESS":
+            context.span.status = "error"
+        context.__exit__(None, None, None)
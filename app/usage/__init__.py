@@ -0,0 +1,19 @@
+"""
+Usage package for metered variable consideration.
+
+This package ingests batches of usage events, rolls them up per contract and fiscal period,
+and keeps the usage-based revenue schedule rows up to date.
+"""
+
+from .ingestion import USAGE_FIELDS, USAGE_FORMATS, UsageAggregate, aggregate_usage_events
+from .rollup import append_usage_rollups, batch_already_ingested, refresh_usage_schedules
+
+__all__ = [
+    'USAGE_FIELDS',
+    'USAGE_FORMATS',
+    'UsageAggregate',
+    'aggregate_usage_events',
+    'append_usage_rollups',
+    'batch_already_ingested',
+    'refresh_usage_schedules',
+]
@@ -0,0 +1,119 @@
+"""
+Usage Event Ingestion
+
+This module parses batches of metering events and aggregates them into usage totals per
+contract, metric and fiscal period.
+
+Events are NDJSON objects or CSV rows with the fields `contract_id` (the external contract
+id), `metric`, `quantity` and `timestamp` (ISO date or datetime). Events are first summed per
+contract, metric and day using the date prefix of the timestamp as is, and only the distinct
+days are parsed and mapped to fiscal periods, so the per-event work is a parse and a dict
+update. Malformed events are counted and skipped rather than failing the batch.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.ASC606.fiscal_calendar import FiscalCalendar, get_default_fiscal_calendar
+
+USAGE_FORMATS = ["ndjson", "csv"]
+
+USAGE_FIELDS = ["contract_id", "metric", "quantity", "timestamp"]
+
+# (external contract id, metric, period start, period end)
+UsageKey = Tuple[str, str, date, date]
+
+
+@dataclass
+class UsageAggregate:
+    """Usage totals of a batch, with [quantity, event count] per contract, metric and period"""
+    totals: Dict[UsageKey, List] = field(default_factory=dict)
+    events: int = 0
+    rejected: int = 0
+
+    @property
+    def accepted(self) -> int:
+        return self.events - self.rejected
+
+
+def _iter_ndjson(payload: str) -> Iterator[Optional[Tuple[str, str, float, str]]]:
+    loads = json.loads
+    for line in payload.splitlines():
+        if not line.strip():
+            continue
+        try:
+            event = loads(line)
+            yield str(event["contract_id"]), str(event["metric"]), float(event["quantity"]), str(event["timestamp"])[:10]
+        except (ValueError, KeyError, TypeError):
+            yield None
+
+
+def _iter_csv(payload: str) -> Iterator[Optional[Tuple[str, str, float, str]]]:
+    reader = csv.reader(io.StringIO(payload))
+    header = next(reader, None)
+    if header is None:
+        return
+    try:
+        contract_index, metric_index, quantity_index, timestamp_index = (header.index(name) for name in USAGE_FIELDS)
+    except ValueError:
+        raise ValueError(f"CSV usage header must include: {', '.join(USAGE_FIELDS)}")
+
+    for row in reader:
+        if not row:
+            continue
+        try:
+            yield row[contract_index], row[metric_index], float(row[quantity_index]), row[timestamp_index][:10]
+        except (ValueError, IndexError):
+            yield None
+
+
+def aggregate_usage_events(payload: str, usage_format: str = "ndjson", fiscal_calendar: Optional[FiscalCalendar] = None) -> UsageAggregate:
+    """
+    Aggregate a batch of usage events into totals per contract, metric and fiscal period.
+    """
+    if usage_format not in USAGE_FORMATS:
+        raise ValueError(f"Unsupported usage format: {usage_format}")
+    fiscal_calendar = fiscal_calendar or get_default_fiscal_calendar()
+
+    aggregate = UsageAggregate()
+    daily: Dict[Tuple[str, str, str], List] = {}
+    events = _iter_ndjson(payload) if usage_format == "ndjson" else _iter_csv(payload)
+    for event in events:
+        aggregate.events += 1
+        if event is None:
+            aggregate.rejected += 1
+            continue
+        contract_id, metric, quantity, day = event
+        key = (contract_id, metric, day)
+        total = daily.get(key)
+        if total is None:
+            daily[key] = [quantity, 1]
+        else:
+            total[0] += quantity
+            total[1] += 1
+
+    periods: Dict[str, Optional[Tuple[date, date]]] = {}
+    for (contract_id, metric, day), (quantity, count) in daily.items():
+        if day not in periods:
+            try:
+                periods[day] = fiscal_calendar.period_containing(date.fromisoformat(day))
+            except ValueError:
+                periods[day] = None
+        period = periods[day]
+        if period is None:
+            aggregate.rejected += count
+            continue
+
+        key = (contract_id, metric, period[0], period[1])
+        total = aggregate.totals.get(key)
+        if total is None:
+            aggregate.totals[key] = [quantity, count]
+        else:
+            total[0] += quantity
+            total[1] += count
+
+    return aggregate
@@ -0,0 +1,142 @@
+"""
+Usage Rollup Persistence
+
+This module writes aggregated usage to the append-only `UsageRollup` table and keeps each
+contract's usage-based revenue schedule in line with its rolled-up totals.
+
+Every ingested batch appends its own rollup rows, tagged with the batch id; totals are the
+sum over all batches. After new usage arrives, the usage-based schedule rows of the touched contracts
+are recomputed from those totals through `VariableConsiderationHandler`.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Set, Tuple
+
+from sqlalchemy import delete, func, insert
+from sqlmodel import select
+
+from app.ASC606 import USAGE_RECOGNITION_METHOD, VariableConsiderationHandler
+from app.ASC606.money import from_cents, to_cents
+from app.models import Contract, ContractObligation, RevenueSchedule, UsageRollup
+from app.usage.ingestion import UsageAggregate
+
+
+def batch_already_ingested(session, batch_id: str) -> bool:
+    """Whether a batch has been ingested before, so redelivered batches are not counted twice"""
+    return session.exec(select(UsageRollup.id).where(UsageRollup.batch_id == batch_id).limit(1)).first() is not None
+
+
+def append_usage_rollups(session, batch_id: str, aggregate: UsageAggregate) -> Set[int]:
+    """
+    Append a batch's usage totals for known contracts and return the contracts it touched.
+
+    Events for unknown contracts are counted as rejected.
+    """
+    external_ids = {contract_id for contract_id, _, _, _ in aggregate.totals}
+    contracts = {
+        external_id: contract_pk
+        for contract_pk, external_id in session.exec(
+            select(Contract.id, Contract.external_id).where(Contract.external_id.in_(external_ids))
+        )
+    } if external_ids else {}
+
+    created_at = datetime.now(timezone.utc)
+    rows = []
+    for (external_id, metric, period_start, period_end), (quantity, count) in aggregate.totals.items():
+        contract_pk = contracts.get(external_id)
+        if contract_pk is None:
+            aggregate.rejected += count
+            continue
+        rows.append({
+            "batch_id": batch_id,
+            "contract_id": contract_pk,
+            "metric": metric,
+            "period_start": period_start,
+            "period_end": period_end,
+            "quantity": quantity,
+            "event_count": count,
+            "created_at": created_at,
+        })
+
+    if rows:
+        session.execute(insert(UsageRollup), rows)
+
+    return {row["contract_id"] for row in rows}
+
+
+def refresh_usage_schedules(session, contract_ids: Iterable[int]) -> int:
+    """
+    Recompute the usage-based schedule rows of several contracts from their rolled-up usage.
+
+    Usage totals, obligations and schedule rows are read and written with one statement each
+    for all contracts. Returns the number of usage schedule rows written; contracts without
+    metered variable consideration are left untouched.
+    """
+    handlers: Dict[int, Tuple[str, VariableConsiderationHandler]] = {}
+    for contract_pk, external_id, extracted_json in session.exec(
+        select(Contract.id, Contract.external_id, Contract.extracted_json).where(Contract.id.in_(set(contract_ids)))
+    ):
+        handler = VariableConsiderationHandler()
+        handler.process_variable_considerations(extracted_json or {})
+        if handler.variable_considerations:
+            handlers[contract_pk] = (external_id, handler)
+    if not handlers:
+        return 0
+
+    usage = defaultdict(list)
+    for contract_pk, metric, period_start, period_end, quantity in session.exec(
+        select(UsageRollup.contract_id, UsageRollup.metric, UsageRollup.period_start, UsageRollup.period_end, func.sum(UsageRollup.quantity))
+        .where(UsageRollup.contract_id.in_(handlers))
+        .group_by(UsageRollup.contract_id, UsageRollup.metric, UsageRollup.period_start, UsageRollup.period_end)
+    ):
+        usage[contract_pk].append((metric, period_start, period_end, quantity))
+
+    obligations: Dict[Tuple[int, str], ContractObligation] = {
+        (obligation.contract_id, obligation.name): obligation
+        for obligation in session.exec(
+            select(ContractObligation)
+            .where(ContractObligation.contract_id.in_(handlers))
+            .where(ContractObligation.recognition_method == USAGE_RECOGNITION_METHOD)
+        )
+    }
+    for contract_pk, (_, handler) in handlers.items():
+        for variable_consideration in handler.variable_considerations:
+            if (contract_pk, variable_consideration.name) not in obligations:
+                obligation = ContractObligation(
+                    contract_id=contract_pk,
+                    name=variable_consideration.name,
+                    type="Variable Consideration",
+                    recognition_method=USAGE_RECOGNITION_METHOD,
+                )
+                session.add(obligation)
+                obligations[(contract_pk, variable_consideration.name)] = obligation
+    session.flush()
+
+    session.execute(
+        delete(RevenueSchedule).where(RevenueSchedule.obligation_id.in_([obligation.id for obligation in obligations.values()]))
+    )
+
+    # Entries come sorted by period, so running totals can be accumulated in order
+    cumulative_cents = defaultdict(int)
+    rows = []
+    for contract_pk, (external_id, handler) in handlers.items():
+        for entry in handler.generate_usage_schedule(external_id, usage.get(contract_pk, [])):
+            obligation = obligations[(contract_pk, entry.obligation_name)]
+            cumulative_cents[obligation.id] += to_cents(entry.amount)
+            rows.append({
+                "contract_id": contract_pk,
+                "obligation_id": obligation.id,
+                "period_start": entry.period_start,
+                "period_end": entry.period_end,
+                "amount": entry.amount,
+                "cumulative_amount": from_cents(cumulative_cents[obligation.id]),
+                "recognized": entry.status == "recognized",
+            })
+    if rows:
+        session.execute(insert(RevenueSchedule), rows)
+
+    for obligation in obligations.values():
+        obligation.scheduled_amount = from_cents(cumulative_cents[obligation.id])
+
+    return len(rows)
@@ -10,6 +10,8 @@ import docx2txt
 from bs4 import BeautifulSoup
 import re
 
+WORDS_PER_PAGE = 500
+
 class FileProcessor:
     SUPPORTED_FILE_TYPES = ["pdf", "docx", "txt", "md", "html"]
     
@@ -25,8 +27,9 @@ class FileProcessor:
             raise HTTPException(status_code=400, detail=f"Unsupported file type: .{extension}")
         
         try:
+            page_count = None
             if extension == "pdf":
-                text = FileProcessor._extract_pdf(file_bytes)
+                text, page_count = FileProcessor._extract_pdf(file_bytes)
             elif extension == "docx":
                 text = FileProcessor._extract_docx(file_bytes)
             elif extension in ["txt", "md"]:
@@ -36,13 +39,19 @@ class FileProcessor:
             else:
                 raise HTTPException(status_code=400, detail=f"Unsupported file type: .{extension}")
             
+            word_count = len(text.split())
+            if page_count is None:
+                # Formats without pages are counted in pages of typical contract density
+                page_count = max(1, -(-word_count // WORDS_PER_PAGE))
+            
             file_info = {
                 "filename": filename,
                 "content_type": content_type,
                 "size_in_kb": round(len(file_bytes) / 1024, 2),
                 "line_count": len(text.splitlines()),
                 "character_count": len(text),
-                "word_count": len(text.split()),
+                "word_count": word_count,
+                "page_count": page_count,
                 "file_extension": extension
             }
             
@@ -55,8 +64,8 @@ class FileProcessor:
         
         
     @staticmethod
-    def _extract_pdf(file_bytes: bytes) -> str:
-        """Extract text from PDF file using pdfplumber."""
+    def _extract_pdf(file_bytes: bytes) -> Tuple[str, int]:
+        """Extract text and the page count from PDF file using pdfplumber."""
         try:
             text = ""
             with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
@@ -64,7 +73,8 @@ class FileProcessor:
                     page_text = page.extract_text()
                     if page_text:
                         text += page_text + "\n"
-            return text
+                page_count = len(pdf.pages)
+            return text, page_count
         except Exception as e:
             raise Exception(f"PDF extraction failed: {str(e)}")
     
@@ -0,0 +1,13 @@
+"""
+Benchmarks for the revenue automation platform.
+
+Each module is runnable with ``python -m benchmarks.<name>`` and prints one JSON result per
+measurement, so results can be collected and compared between commits:
+
+    python -m benchmarks.run_suite --output results/base.jsonl
+    python -m benchmarks.run_suite --output results/head.jsonl
+    python -m benchmarks.compare results/base.jsonl results/head.jsonl
+
+Everything runs offline: contracts come from the seeded generator in ``benchmarks.synthetic``
+and Gemini is replaced by ``benchmarks.stub_llm``.
+"""
@@ -0,0 +1,127 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+
+import json
+import os
+import random
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Dict, Iterator
+
+DEFAULT_DATABASE_URL = "sqlite:////tmp/revenue_automation_bench.db"
+
+ROWS_PER_CONTRACT = 36
+INSERT_CHUNK = 50000
+
+
+def use_benchmark_database() -> None:
+    """
+    Point the app at the benchmark database before `app.db` is imported.
+
+    Falls back to a local SQLite file when DATABASE_URL is not set, and turns off SQL echo
+    so statement logging does not dominate the measurements.
+    """
+    os.environ.setdefault("DATABASE_URL", DEFAULT_DATABASE_URL)
+
+    from app import models  # noqa: F401 - registers the tables with the metadata
+    from app.db import engine, init_db
+    engine.echo = False
+    init_db()
+
+
+def seed_schedule_rows(rows: int) -> None:
+    """Top up the benchmark database to at least `rows` schedule rows."""
+    use_benchmark_database()
+
+    from sqlalchemy import func, insert
+    from sqlmodel import select
+    from app.db import get_session
+    from app.models import Contract, ContractObligation, RevenueSchedule
+
+    rng = random.Random(606)
+
+    with next(get_session()) as session:
+        existing = session.exec(select(func.count()).select_from(RevenueSchedule)).one()
+        missing = rows - existing
+        if missing <= 0:
+            return
+
+        pending = []
+        for _ in range(0, missing, ROWS_PER_CONTRACT):
+            contract = Contract(
+                customer_name=f"Customer {rng.randint(1, 500)}",
+                currency="USD",
+                status="processed",
+            )
+            session.add(contract)
+            session.flush()
+            amount_cents = rng.randint(10000, 1000000)
+            obligation = ContractObligation(
+                contract_id=contract.id,
+                name="SaaS Subscription",
+                type="Service",
+                recognition_method="over_time",
+                scheduled_amount=amount_cents * ROWS_PER_CONTRACT / 100,
+            )
+            session.add(obligation)
+            session.flush()
+
+            for month in range(ROWS_PER_CONTRACT):
+                year, month_index = 2023 + month // 12, month % 12 + 1
+                pending.append({
+                    "contract_id": contract.id,
+                    "obligation_id": obligation.id,
+                    "period_start": date(year, month_index, 1),
+                    "period_end": date(year, month_index, 28),
+                    "amount": amount_cents / 100,
+                    "cumulative_amount": amount_cents * (month + 1) / 100,
+                    "recognized": year < 2025,
+                })
+
+            if len(pending) >= INSERT_CHUNK:
+                session.execute(insert(RevenueSchedule), pending)
+                pending.clear()
+
+        if pending:
+            session.execute(insert(RevenueSchedule), pending)
+        session.commit()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@contextmanager
+def timer() -> Iterator[Dict[str, float]]:
+    """Measure wall-clock time of a block; the elapsed seconds are stored under `seconds`."""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+
+def emit(benchmark: str, **metrics: Any) -> Dict[str, Any]:
+    """
+    Print one benchmark result as a JSON line.
+
+    When BENCH_OUTPUT is set, the result is also appended to that file.
+    """
+    record = {"benchmark": benchmark, **metrics}
+    line = json.dumps(record, default=str)
+    print(line, flush=True)
+
+    output_path = os.getenv("BENCH_OUTPUT")
+    if output_path:
+        with open(output_path, "a", encoding="utf-8") as output:
+            output.write(line + "\n")
+
+    return record
@@ -0,0 +1,99 @@
+"""
+Compare two benchmark result files.
+
+Records are matched by benchmark name and their text parameters (size, format, ...). Each
+pair is compared on one headline metric: the median latency where one is reported, else the
+elapsed seconds, else the first throughput metric. A change beyond the threshold in the
+slower direction is reported as a regression and makes the command exit non-zero.
+
+    python -m benchmarks.compare results/base.jsonl results/HEAD.jsonl --threshold 0.10
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# Headline metrics in order of preference, and whether lower values are better
+LATENCY_METRICS = ["median_us", "p50_ms", "median_ms", "seconds"]
+
+
+def load_results(path: str) -> Dict[Tuple, List[Dict[str, Any]]]:
+    """Group the records of a results file by benchmark name and text parameters"""
+    results: Dict[Tuple, List[Dict[str, Any]]] = {}
+    with open(path, encoding="utf-8") as results_file:
+        for line in results_file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("benchmark") == "suite":
+                continue
+            parameters = tuple(sorted((key, value) for key, value in record.items() if key != "benchmark" and isinstance(value, str)))
+            results.setdefault((record["benchmark"], parameters), []).append(record)
+    return results
+
+
+def headline_metric(record: Dict[str, Any]) -> Optional[Tuple[str, bool]]:
+    """Name of the metric a record is compared on, and whether lower is better"""
+    for metric in LATENCY_METRICS:
+        if isinstance(record.get(metric), (int, float)):
+            return metric, True
+    for metric, value in record.items():
+        if metric.endswith("_per_second") and isinstance(value, (int, float)):
+            return metric, False
+    return None
+
+
+def compare(base_path: str, head_path: str, threshold: float) -> List[Dict[str, Any]]:
+    base, head = load_results(base_path), load_results(head_path)
+    comparisons = []
+
+    for key in sorted(base.keys() & head.keys(), key=str):
+        metric = headline_metric(base[key][0])
+        if metric is None:
+            continue
+        name, lower_is_better = metric
+        base_values = [record[name] for record in base[key] if isinstance(record.get(name), (int, float))]
+        head_values = [record[name] for record in head[key] if isinstance(record.get(name), (int, float))]
+        if not base_values or not head_values:
+            continue
+
+        base_value, head_value = statistics.median(base_values), statistics.median(head_values)
+        if not base_value:
+            continue
+        change = (head_value - base_value) / base_value
+        slower = change > threshold if lower_is_better else change < -threshold
+        faster = change < -threshold if lower_is_better else change > threshold
+
+        comparisons.append({
+            "benchmark": key[0],
+            **dict(key[1]),
+            "metric": name,
+            "base": base_value,
+            "head": head_value,
+            "change": round(change, 4),
+            "verdict": "regression" if slower else "improvement" if faster else "unchanged",
+        })
+
+    return comparisons
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change treated as significant")
+    args = parser.parse_args()
+
+    comparisons = compare(args.base, args.head, args.threshold)
+    for comparison in comparisons:
+        print(json.dumps(comparison))
+
+    regressions = [comparison for comparison in comparisons if comparison["verdict"] == "regression"]
+    if regressions:
+        sys.exit(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Contract search benchmark.
+
+Seeds `--contracts` synthetic contracts, a small fraction of them with a service credit or
+early termination clause, indexes them for search and times ranked, highlighted queries
+through `search_contracts`:
+- selective phrases, matching a few hundred contracts
+- an OR of two phrases
+- words every contract contains, where ranking cost grows with the match count
+- a word with an excluded word
+
+The index build rate is reported separately. Contracts are created once per database, so
+later runs only time the queries. Runs on the benchmark database's full-text backend:
+FTS5 on the default SQLite file, or the GIN-indexed tsvector with a Postgres DATABASE_URL.
+
+    python -m benchmarks.contract_search --contracts 100000 --repeat 50
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.common import emit, use_benchmark_database
+from benchmarks.synthetic import synthetic_documents
+
+EXTERNAL_ID_PREFIX = "search-bench"
+INSERT_CHUNK = 5000
+
+RARE_CLAUSES = [
+    "### 9. Service Credits\n\nIf monthly availability falls below 99.9%, the Customer is entitled to a "
+    "service credit of 10% of the monthly fees for the affected service.",
+    "### 9. Early Termination\n\nThe Customer may terminate this Agreement for convenience on ninety days "
+    "notice upon payment of an early termination fee equal to the remaining subscription fees.",
+]
+
+QUERIES = {
+    "selective_phrase": '"service credit"',
+    "selective_or": '"service credit" OR "early termination fee"',
+    "common_words": "revenue recognition",
+    "excluded_word": "availability -termination",
+}
+
+
+def seed_contracts(contracts: int, rare_fraction: float, seed: int) -> int:
+    """Top up the benchmark database to `contracts` search contracts and return how many were added"""
+    from sqlalchemy import func, insert
+    from sqlmodel import select
+    from app.db import get_session
+    from app.models import Contract
+
+    rng = random.Random(seed)
+    with next(get_session()) as session:
+        existing = session.exec(
+            select(func.count()).select_from(Contract).where(Contract.external_id.like(f"{EXTERNAL_ID_PREFIX}-%"))
+        ).one()
+        rows = []
+        for index, (text, contract) in enumerate(synthetic_documents(contracts - existing, seed=seed + existing, pages=1)):
+            if rng.random() < rare_fraction:
+                text += "\n\n" + rng.choice(RARE_CLAUSES)
+            rows.append({
+                "external_id": f"{EXTERNAL_ID_PREFIX}-{existing + index:06d}",
+                "customer_name": contract["customer"],
+                "currency": "USD",
+                "status": "processed",
+                "raw_text": text,
+            })
+            if len(rows) == INSERT_CHUNK:
+                session.execute(insert(Contract), rows)
+                rows = []
+        if rows:
+            session.execute(insert(Contract), rows)
+        session.commit()
+    return max(0, contracts - existing)
+
+
+def time_query(query: str, repeat: int) -> Tuple[List[float], List[Dict[str, Any]]]:
+    from app.db import get_session
+    from app.search import search_contracts
+
+    latencies = []
+    with next(get_session()) as session:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = search_contracts(session, query, limit=20)
+            latencies.append(time.perf_counter() - started)
+    return latencies, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=100_000)
+    parser.add_argument("--rare-fraction", type=float, default=0.005, help="share of contracts with a rare clause")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    use_benchmark_database()
+    from app.db import get_session
+    from app.search import index_missing_contracts
+
+    started = time.perf_counter()
+    added = seed_contracts(args.contracts, args.rare_fraction, args.seed)
+    seed_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with next(get_session()) as session:
+        indexed = index_missing_contracts(session)
+    index_seconds = time.perf_counter() - started
+    emit(
+        "contract_search.index",
+        contracts=args.contracts,
+        seeded=added,
+        seed_seconds=round(seed_seconds, 2),
+        indexed=indexed,
+        index_seconds=round(index_seconds, 2),
+        indexed_per_second=round(indexed / index_seconds, 1) if indexed else None,
+    )
+
+    for name, query in QUERIES.items():
+        # The first run warms the page cache
+        time_query(query, 1)
+        latencies, results = time_query(query, args.repeat)
+        latencies.sort()
+        emit(
+            "contract_search.query",
+            query=name,
+            contracts=args.contracts,
+            results=len(results),
+            median_ms=round(statistics.median(latencies) * 1e3, 2),
+            p95_ms=round(latencies[int(len(latencies) * 0.95)] * 1e3, 2),
+        )
+
+
+if __name__ == "__main__":
+    main()
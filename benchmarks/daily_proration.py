@@ -0,0 +1,121 @@
+"""
+Daily ratable proration benchmark.
+
+Checks that daily-prorated schedules sum exactly to each obligation's allocated amount and
+stay within a cent of the exact day-count share, then compares the grouped array allocation
+against allocating obligation by obligation, and engine throughput for even vs daily
+proration on long contracts.
+
+    python -m benchmarks.daily_proration --contracts 2000 --term-months 120
+"""
+
+import argparse
+import random
+import sys
+
+import numpy as np
+
+from app.ASC606 import ASC606Engine, revenue_recognition
+from app.ASC606.money import allocate_cents, allocate_cents_grouped, to_cents
+from benchmarks.common import emit, timer
+from benchmarks.synthetic import synthetic_contract, synthetic_portfolio
+
+
+def check_proration(contracts: int, seed: int) -> int:
+    """Return the largest deviation in cents from the exact sum or day-count share"""
+    rng = random.Random(seed)
+    max_error = 0
+    periods_checked = 0
+
+    for index in range(contracts):
+        contract = synthetic_contract(
+            rng,
+            obligations=rng.randint(1, 8),
+            discounts=rng.randint(0, 3),
+            term_months=rng.randint(1, 120),
+            index=index,
+            ratable_method="daily",
+        )
+        engine = ASC606Engine()
+        engine.process_contract(contract)
+
+        rows = {}
+        for entry in engine.revenue_schedule:
+            rows.setdefault(entry.obligation_name, []).append(entry)
+
+        for obligation in engine.performance_obligations:
+            if obligation.recognition_method != "over_time":
+                continue
+            entries = rows.get(obligation.name, [])
+            allocated = to_cents(obligation.allocated_amount)
+            days = [(entry.period_end - entry.period_start).days + 1 for entry in entries]
+            total_days = sum(days)
+            max_error = max(max_error, abs(sum(to_cents(entry.amount) for entry in entries) - allocated))
+            for entry, day_count in zip(entries, days):
+                exact = allocated * day_count / total_days
+                max_error = max(max_error, int(abs(to_cents(entry.amount) - exact) >= 1))
+            periods_checked += len(entries)
+
+    emit("daily_proration.check", contracts=contracts, periods=periods_checked, max_error_cents=max_error)
+    return max_error
+
+
+def compare_allocation_speed(obligations: int, periods: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    totals = rng.integers(100000, 100000000, obligations)
+    sizes = rng.integers(1, periods + 1, obligations)
+    weights = rng.integers(28, 32, int(sizes.sum()))
+    starts = np.cumsum(sizes) - sizes
+
+    with timer() as elapsed:
+        allocate_cents_grouped(totals, weights, sizes)
+    emit(
+        "daily_proration.allocate.grouped",
+        obligations=obligations,
+        periods=len(weights),
+        seconds=round(elapsed["seconds"], 3),
+    )
+
+    with timer() as elapsed:
+        for total, start, size in zip(totals, starts, sizes):
+            allocate_cents(int(total), weights[start:start + size])
+    emit(
+        "daily_proration.allocate.per_obligation",
+        obligations=obligations,
+        periods=len(weights),
+        seconds=round(elapsed["seconds"], 3),
+    )
+
+
+def compare_engine_throughput(contracts: int, term_months: int, seed: int) -> None:
+    for ratable_method in ("even", "daily"):
+        with timer() as elapsed:
+            for contract in synthetic_portfolio(contracts, seed=seed, term_months=term_months, ratable_method=ratable_method):
+                revenue_recognition(contract)
+        emit(
+            f"daily_proration.engine.{ratable_method}",
+            contracts=contracts,
+            term_months=term_months,
+            seconds=round(elapsed["seconds"], 3),
+            contracts_per_second=round(contracts / elapsed["seconds"]),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=2000)
+    parser.add_argument("--term-months", type=int, default=120)
+    parser.add_argument("--obligations", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    error = check_proration(args.contracts, args.seed)
+    compare_allocation_speed(args.obligations, args.term_months, args.seed)
+    compare_engine_throughput(args.contracts, args.term_months, args.seed)
+
+    if error:
+        sys.exit(f"Daily proration deviated by up to {error} cents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+As-of deferred revenue benchmark.
+
+Seeds contracts whose obligations have schedules of increasing length and times as-of
+balance lookups through `deferred_revenue_balances` against summing the schedule rows in
+Python. The cumulative lookup should stay flat as schedules grow; the row scan should not.
+
+    python -m benchmarks.deferred_revenue --lengths 12 120 1200 12000 --lookups 500
+"""
+
+import argparse
+import os
+import random
+from datetime import date, timedelta
+
+from benchmarks.common import emit, timer
+
+DEFAULT_DATABASE_URL = "sqlite:////tmp/revenue_automation_deferred_bench.db"
+
+
+def seed(lengths, contracts_per_length: int) -> None:
+    """Create `contracts_per_length` single-obligation contracts per schedule length"""
+    from sqlalchemy import insert
+    from app.db import get_session
+    from app.models import Contract, ContractObligation, RevenueSchedule
+
+    rng = random.Random(606)
+    with next(get_session()) as session:
+        for length in lengths:
+            for number in range(contracts_per_length):
+                contract = Contract(external_id=f"DEF-{length}-{number}", customer_name=f"Customer {length}", currency="USD", status="processed")
+                session.add(contract)
+                session.flush()
+                obligation = ContractObligation(contract_id=contract.id, name="SaaS Subscription", type="Service", recognition_method="over_time")
+                session.add(obligation)
+                session.flush()
+
+                amount_cents = rng.randint(10000, 1000000)
+                rows = []
+                for day in range(length):
+                    period_start = date(2000, 1, 1) + timedelta(days=day)
+                    rows.append({
+                        "contract_id": contract.id,
+                        "obligation_id": obligation.id,
+                        "period_start": period_start,
+                        "period_end": period_start,
+                        "amount": amount_cents / 100,
+                        "cumulative_amount": amount_cents * (day + 1) / 100,
+                        "recognized": False,
+                    })
+                session.execute(insert(RevenueSchedule), rows)
+                obligation.scheduled_amount = amount_cents * length / 100
+        session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[12, 120, 1200, 12000])
+    parser.add_argument("--contracts", type=int, default=10, help="contracts per schedule length")
+    parser.add_argument("--lookups", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", DEFAULT_DATABASE_URL)
+    database_path = os.environ["DATABASE_URL"].removeprefix("sqlite:///")
+    if os.environ["DATABASE_URL"] == DEFAULT_DATABASE_URL and os.path.exists(database_path):
+        os.remove(database_path)
+
+    from benchmarks.common import use_benchmark_database
+    use_benchmark_database()
+    seed(args.lengths, args.contracts)
+
+    from sqlmodel import select
+    from app.db import get_session
+    from app.models import Contract, RevenueSchedule
+    from app.reporting import deferred_revenue_balances
+
+    rng = random.Random(606)
+    with next(get_session()) as session:
+        for length in args.lengths:
+            cases = [
+                (f"DEF-{length}-{rng.randrange(args.contracts)}", date(2000, 1, 1) + timedelta(days=rng.randrange(length)))
+                for _ in range(args.lookups)
+            ]
+
+            with timer() as elapsed:
+                for contract_id, as_of in cases:
+                    deferred_revenue_balances(session, as_of, contract_id=contract_id)
+            emit(
+                "deferred_revenue.cumulative_lookup",
+                schedule_rows=length,
+                lookups=args.lookups,
+                microseconds_per_lookup=round(elapsed["seconds"] / args.lookups * 1e6, 1),
+            )
+
+            with timer() as elapsed:
+                for contract_id, as_of in cases:
+                    amounts = session.exec(
+                        select(RevenueSchedule.period_start, RevenueSchedule.amount)
+                        .join(Contract, RevenueSchedule.contract_id == Contract.id)
+                        .where(Contract.external_id == contract_id)
+                    ).all()
+                    sum(amount for period_start, amount in amounts if period_start > as_of)
+            emit(
+                "deferred_revenue.row_scan",
+                schedule_rows=length,
+                lookups=args.lookups,
+                microseconds_per_lookup=round(elapsed["seconds"] / args.lookups * 1e6, 1),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Revenue schedule export benchmark.
+
+Seeds the benchmark database with synthetic schedule rows (once) and streams the full
+export as CSV and Parquet, reporting throughput and peak memory.
+
+    python -m benchmarks.export_revenue_schedules --rows 5000000
+"""
+
+import argparse
+import multiprocessing
+
+from benchmarks.common import emit, peak_rss_mb, seed_schedule_rows, timer, use_benchmark_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "parquet"])
+    args = parser.parse_args()
+
+    # Seed in a child process so the seeding does not count towards this process' peak memory
+    seeder = multiprocessing.Process(target=seed_schedule_rows, args=(args.rows,))
+    seeder.start()
+    seeder.join()
+    if seeder.exitcode != 0:
+        raise SystemExit("Seeding the benchmark database failed")
+
+    use_benchmark_database()
+    from sqlalchemy import func
+    from sqlmodel import select
+    from app.db import get_session
+    from app.exports import stream_csv, stream_parquet
+    from app.models import RevenueSchedule
+
+    with next(get_session()) as session:
+        rows = session.exec(select(func.count()).select_from(RevenueSchedule)).one()
+
+    for export_format in args.formats:
+        stream = stream_csv if export_format == "csv" else stream_parquet
+        exported_bytes = 0
+        with timer() as elapsed:
+            for chunk in stream():
+                exported_bytes += len(chunk)
+
+        emit(
+            f"export_revenue_schedules.{export_format}",
+            rows=rows,
+            seconds=round(elapsed["seconds"], 3),
+            rows_per_second=round(rows / elapsed["seconds"]),
+            megabytes=round(exported_bytes / (1024 * 1024), 1),
+            peak_rss_mb=round(peak_rss_mb(), 1),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Period close journal entry benchmark.
+
+Seeds the benchmark database and runs the chunked period close for one month with the
+Celery tasks executed in-process, reporting contracts and journal entry lines per second.
+
+    python -m benchmarks.journal_entries --contracts 100000 --period 2024-06
+"""
+
+import argparse
+
+from benchmarks.common import ROWS_PER_CONTRACT, emit, seed_schedule_rows, timer, use_benchmark_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=100000)
+    parser.add_argument("--period", default="2024-06")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    seed_schedule_rows(args.contracts * ROWS_PER_CONTRACT)
+    use_benchmark_database()
+
+    from sqlalchemy import func
+    from sqlmodel import select
+    from app.db import get_session
+    from app.jobs import celery_app, close_period_journal_entries
+    from app.models import JournalEntry
+
+    celery_app.conf.task_always_eager = True
+
+    with timer() as elapsed:
+        result = close_period_journal_entries.run(args.period, chunk_size=args.chunk_size)
+
+    with next(get_session()) as session:
+        lines = session.exec(
+            select(func.count()).select_from(JournalEntry).where(JournalEntry.close_period == args.period)
+        ).one()
+
+    emit(
+        "journal_entries.close_period",
+        close_period=args.period,
+        contracts=result["contracts"],
+        chunks=result["chunks"],
+        journal_entry_lines=lines,
+        seconds=round(elapsed["seconds"], 3),
+        contracts_per_second=round(result["contracts"] / elapsed["seconds"]),
+    )
+
+
+if __name__ == "__main__":
+    main()
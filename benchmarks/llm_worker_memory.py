@@ -0,0 +1,147 @@
+"""
+LLM worker memory benchmark.
+
+Measures how many Gemini extraction calls a worker keeps in flight per GB of memory under
+each Celery pool model, with the offline Gemini stub holding every call for a fixed
+network wait:
+- `prefork`: a forked process per call, as `-P prefork` runs one task per child
+- `threads`: one process with a thread per call, as `-P threads`
+- `gevent`: one monkey-patched process with a greenlet per call, as `-P gevent`
+
+Each run is a fresh process that imports the Celery app like a worker does, then starts
+`--concurrency` extractions of a checkpointed context at once and, while they all wait, samples the proportional set
+size (PSS, from /proc/<pid>/smaps_rollup, so Linux only) of the worker and its children.
+PSS divides pages shared after a fork among the processes sharing them, so prefork
+children are charged only for the memory they no longer share with their parent. The idle
+figure is the pool before any call starts: for prefork, the parent and its children.
+
+    python -m benchmarks.llm_worker_memory --concurrency 8 32 128 --latency 2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+POOLS = ["prefork", "threads", "gevent"]
+
+
+def pss_mb(pids: List[int]) -> float:
+    """Proportional set size of the processes in MB"""
+    total_kb = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            for line in smaps:
+                if line.startswith("Pss:"):
+                    total_kb += int(line.split()[1])
+                    break
+    return total_kb / 1024
+
+
+def serve(pool: str, concurrency: int, latency: float, seed: int) -> Dict[str, Any]:
+    """Run one measurement in this process and return it"""
+    if pool == "gevent":
+        from gevent import monkey
+        monkey.patch_all()
+
+    import threading
+
+    from benchmarks.common import use_benchmark_database
+    use_benchmark_database()
+
+    import app.jobs  # noqa: F401 - the modules a worker imports
+    from app.extractor.llm_extractor import build_extraction_context, extract_contract_data
+    from benchmarks.stub_llm import stub_gemini
+    from benchmarks.synthetic import synthetic_documents
+
+    # The LLM stage receives the context checkpointed by the revenue recognition job
+    text, contract = next(synthetic_documents(1, seed=seed))
+    context = build_extraction_context(text)
+    with stub_gemini({}, latency) as model:
+        model.default = contract
+
+        def call() -> None:
+            extract_contract_data(text, contract["contract_id"], stream=False, context=context)
+
+        if pool == "prefork":
+            # Children are forked up front like a prefork pool's, and all start their call
+            # when the parent closes the pipe
+            ready, release = os.pipe()
+            children = []
+            for _ in range(concurrency):
+                pid = os.fork()
+                if pid == 0:
+                    os.close(release)
+                    os.read(ready, 1)
+                    call()
+                    os._exit(0)
+                children.append(pid)
+            os.close(ready)
+            time.sleep(0.5)
+            idle_mb = pss_mb([os.getpid()] + children)
+            started = time.perf_counter()
+            os.close(release)
+            time.sleep(latency / 2)
+            in_flight_mb = pss_mb([os.getpid()] + children)
+            for pid in children:
+                os.waitpid(pid, 0)
+        else:
+            idle_mb = pss_mb([os.getpid()])
+            started = time.perf_counter()
+            workers = [threading.Thread(target=call) for _ in range(concurrency)]
+            for worker in workers:
+                worker.start()
+            time.sleep(latency / 2)
+            in_flight_mb = pss_mb([os.getpid()])
+            for worker in workers:
+                worker.join()
+        seconds = time.perf_counter() - started
+
+    return {
+        "idle_mb": round(idle_mb, 1),
+        "in_flight_mb": round(in_flight_mb, 1),
+        "seconds": round(seconds, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pools", nargs="+", choices=POOLS, default=POOLS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--latency", type=float, default=2.0, help="seconds each call waits on the network")
+    parser.add_argument("--seed", type=int, default=606)
+    parser.add_argument("--serve", choices=POOLS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        print(json.dumps(serve(args.serve, args.concurrency[0], args.latency, args.seed)), flush=True)
+        return
+
+    from benchmarks.common import emit
+
+    for concurrency in args.concurrency:
+        for pool in args.pools:
+            command = [
+                sys.executable, "-m", "benchmarks.llm_worker_memory", "--serve", pool,
+                "--concurrency", str(concurrency), "--latency", str(args.latency), "--seed", str(args.seed),
+            ]
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            emit(
+                "llm_worker_memory.pool",
+                pool=pool,
+                concurrency=concurrency,
+                latency=args.latency,
+                **result,
+                # Calls finish together when they all wait at once
+                effective_concurrency=round(concurrency * args.latency / result["seconds"], 1),
+                per_call_mb=round(result["in_flight_mb"] / concurrency, 2),
+                calls_per_gb=round(concurrency / (result["in_flight_mb"] / 1024), 1),
+            )
+
+
+if __name__ == "__main__":
+    main()
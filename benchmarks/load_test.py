@@ -0,0 +1,414 @@
+"""
+End-to-end load test for upload -> Celery -> database.
+
+Boots the FastAPI app under uvicorn and a Celery worker pool with the Gemini extraction
+stubbed out, then uploads synthetic contracts over HTTP at a fixed rate (open loop) and
+follows each contract until the worker marks it processed. Each worker count in the sweep
+reports completed throughput, Celery queue depth, upload and end-to-end latency percentiles
+and database write rates, so the saturation point per worker count can be read off.
+
+Two setups are supported:
+- `--in-process` (default when CELERY_BROKER_URL is not set): in-memory broker and a threaded
+  worker pool inside this process; needs no Redis and is useful for relative comparisons
+- otherwise the broker from CELERY_BROKER_URL (e.g. a local Redis), with each worker count
+  started as a separate prefork `celery worker` process
+
+Point DATABASE_URL at a local Postgres for realistic write rates; without it a SQLite file
+is used, which serializes writers.
+
+`--large-fraction` mixes long master agreements from one tenant into the order forms of the
+others, with the stub's latency growing with the page count. `--routing shared sized` then
+runs the same load once with every contract on one queue and once with size-class queues,
+`--small-workers` of the worker slots reserved for small contracts and tenant fair share
+(see `app.jobs.routing`), reporting end-to-end percentiles per size class.
+
+    python -m benchmarks.load_test --workers 1 2 4 --rate 20 --duration 30 --llm-latency 0.5
+    CELERY_BROKER_URL=redis://localhost:6379/0 DATABASE_URL=postgresql://... \\
+        python -m benchmarks.load_test --workers 2 4 8 16 --rate 50 --duration 60
+    python -m benchmarks.load_test --workers 4 --rate 6 --duration 30 --llm-latency 0.2 \\
+        --large-fraction 0.1 --large-pages 120 --tenants 4 --routing shared sized
+"""
+
+import argparse
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_DATABASE_URL = "sqlite:////tmp/revenue_automation_load.db"
+
+CONTRACT_ID_PATTERN = re.compile(r"Contract ID:\s*SYN-(\d+)")
+PAGE_FOOTER_PATTERN = re.compile(r"Page \d+ of (\d+)")
+
+POLL_INTERVAL = 0.25
+QUERY_CHUNK = 500
+IN_PROCESS_PREFETCH = 64
+
+
+def load_contract(index: int, seed: int, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """The synthetic extraction for upload `index`, reproducible in any process"""
+    from benchmarks.synthetic import synthetic_contract
+    return synthetic_contract(random.Random(seed * 1_000_003 + index), index=index, **profile)
+
+
+def install_stub_extractor(seed: int, profile: Dict[str, Any], latency: float, pages: int) -> None:
+    """
+    Replace Gemini extraction in the revenue recognition job with the synthetic extraction
+    named by the uploaded text, after `latency` seconds to model the LLM round trip; longer
+    documents than `pages` pages take proportionally longer.
+    """
+    import app.jobs.extraction_job as extraction_job
+    import app.jobs.revenue_recognition_job as job
+    from app.extractor.schemas import ContractLLMResponseJsonSchema
+
+    def extract_contract_data(raw_text: str, contract_id: str, llm_model: str = "stub", **options: Any) -> ContractLLMResponseJsonSchema:
+        match = CONTRACT_ID_PATTERN.search(raw_text)
+        if not match:
+            raise ValueError("Uploaded text does not name a synthetic contract")
+        if latency:
+            footer = PAGE_FOOTER_PATTERN.search(raw_text)
+            time.sleep(latency * max(1.0, (int(footer.group(1)) if footer else pages) / pages))
+        return ContractLLMResponseJsonSchema(**load_contract(int(match.group(1)), seed, profile))
+
+    job.extract_contract_data = extract_contract_data
+    extraction_job.extract_contract_data = extract_contract_data
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _milliseconds(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 1) if value is not None else None
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@contextmanager
+def run_api() -> Iterator[str]:
+    """Serve the FastAPI app from a background thread and yield its base URL"""
+    import uvicorn
+    from app.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def all_queues() -> List[str]:
+    from app.jobs.routing import CONTRACT_QUEUES, LLM_QUEUE, SHARED_QUEUE
+    return [SHARED_QUEUE] + CONTRACT_QUEUES + [LLM_QUEUE]
+
+
+def worker_pools(workers: int, args: argparse.Namespace) -> List[Tuple[int, List[str]]]:
+    """
+    Task slots and the queues they consume: with size-class routing, `--small-workers` of the
+    slots only take small contracts and the others take every queue, smallest class first.
+    """
+    from app.jobs.routing import CONTRACT_QUEUES, LLM_QUEUE, SHARED_QUEUE, routing_mode
+
+    if routing_mode() == "shared" or not 0 < args.small_workers < workers:
+        return [(workers, all_queues())]
+    return [(args.small_workers, CONTRACT_QUEUES[:1]), (workers - args.small_workers, CONTRACT_QUEUES + [SHARED_QUEUE, LLM_QUEUE])]
+
+
+@contextmanager
+def run_workers(workers: int, in_process: bool, args: argparse.Namespace) -> Iterator[None]:
+    """Start worker pools with `workers` concurrent task slots in total for the duration of a run"""
+    from app.jobs import celery_app
+
+    pools = worker_pools(workers, args)
+    if in_process:
+        from celery.contrib.testing.worker import start_worker
+        with ExitStack() as stack:
+            for number, (concurrency, queues) in enumerate(pools):
+                stack.enter_context(start_worker(
+                    celery_app, pool="threads", concurrency=concurrency, perform_ping_check=False, shutdown_timeout=60,
+                    queues=queues, hostname=f"load-{number}@localhost",
+                ))
+            yield
+        return
+
+    processes = []
+    for number, (concurrency, queues) in enumerate(pools):
+        processes.append(subprocess.Popen([
+            sys.executable, "-m", "benchmarks.load_test", "--serve-worker",
+            "--concurrency", str(concurrency),
+            "--queues", ",".join(queues),
+            "--hostname", f"load-{number}@%h",
+            "--seed", str(args.seed),
+            "--llm-latency", str(args.llm_latency),
+            "--obligations", str(args.obligations),
+            "--term-months", str(args.term_months),
+            "--pages", str(args.pages),
+        ]))
+    try:
+        deadline = time.monotonic() + 60
+        while len(celery_app.control.ping(timeout=1.0)) < len(processes):
+            if any(process.poll() is not None for process in processes) or time.monotonic() > deadline:
+                raise RuntimeError("Celery workers did not start")
+        yield
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+def queue_depth(in_process: bool) -> int:
+    """Tasks waiting to start: messages in the Celery queues, plus tasks prefetched by in-process workers"""
+    from app.jobs import celery_app
+
+    with celery_app.connection_for_write() as connection:
+        depth = sum(connection.default_channel.queue_declare(queue=queue, passive=True).message_count for queue in all_queues())
+
+    if in_process:
+        from celery.worker import state
+        depth += len(state.reserved_requests) - len(state.active_requests)
+    return depth
+
+
+def run_load(base_url: str, workers: int, in_process: bool, args: argparse.Namespace) -> Dict[str, Any]:
+    """Upload at the offered rate for the run duration and follow every contract to completion"""
+    import httpx
+    from sqlalchemy import func
+    from sqlmodel import select
+    from app.db import get_session
+    from app.models import AuditMessage, Contract, ContractObligation, RevenueSchedule
+    from benchmarks.synthetic import synthetic_contract_text
+
+    profile = {"obligations": args.obligations, "term_months": args.term_months}
+    rng = random.Random(args.seed)
+    uploads = int(args.rate * args.duration)
+    # Long agreements all come from the first tenant, order forms from every tenant in turn
+    large = [rng.random() < args.large_fraction for _ in range(uploads)]
+    tenants = [f"tenant-{0 if large[index] else index % args.tenants}" for index in range(uploads)]
+    documents = [
+        synthetic_contract_text(load_contract(index, args.seed, profile), rng, args.large_pages if large[index] else args.pages).encode("utf-8")
+        for index in range(uploads)
+    ]
+
+    submitted: Dict[str, float] = {}
+    size_classes: Dict[str, str] = {}
+    upload_latencies: List[float] = []
+    upload_errors = 0
+    lock = threading.Lock()
+    client = httpx.Client(base_url=base_url, timeout=60)
+
+    def upload(index: int) -> None:
+        nonlocal upload_errors
+        start = time.time()
+        try:
+            response = client.post(
+                "/contracts/upload",
+                files={"file": (f"SYN-{index:06d}.md", documents[index], "text/markdown")},
+                headers={"X-Tenant-ID": tenants[index]},
+            )
+            response.raise_for_status()
+            body = response.json()
+        except Exception:
+            with lock:
+                upload_errors += 1
+            return
+        contract_id = body["contract_id"]
+        with lock:
+            submitted[contract_id] = start
+            size_classes[contract_id] = body["size_class"]
+            upload_latencies.append(time.time() - start)
+
+    finished: Dict[str, float] = {}
+    failed: Dict[str, float] = {}
+    depths: List[int] = []
+    sending = threading.Event()
+    sending.set()
+
+    def poll() -> None:
+        while sending.is_set() or len(finished) + len(failed) < len(submitted):
+            depths.append(queue_depth(in_process))
+            with lock:
+                pending = [contract_id for contract_id in submitted if contract_id not in finished and contract_id not in failed]
+            with next(get_session()) as session:
+                for offset in range(0, len(pending), QUERY_CHUNK):
+                    rows = session.exec(
+                        select(Contract.external_id, Contract.status, Contract.updated_at)
+                        .where(Contract.external_id.in_(pending[offset:offset + QUERY_CHUNK]))
+                        .where(Contract.status.in_(["processed", "failed"]))
+                    ).all()
+                    observed = time.time()
+                    for external_id, status, updated_at in rows:
+                        if status == "failed" or updated_at is None:
+                            failed[external_id] = observed
+                            continue
+                        if updated_at.tzinfo is None:
+                            updated_at = updated_at.replace(tzinfo=timezone.utc)
+                        finished[external_id] = updated_at.timestamp()
+            if time.time() > drain_deadline:
+                return
+            time.sleep(POLL_INTERVAL)
+
+    drain_deadline = float("inf")
+    poller = threading.Thread(target=poll, daemon=True)
+    poller.start()
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=args.connections) as executor:
+        for index in range(uploads):
+            delay = started + index / args.rate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(upload, index)
+    sent = time.time()
+    drain_deadline = sent + args.drain_timeout
+    sending.clear()
+    poller.join()
+    client.close()
+
+    end_to_end = [finished[contract_id] - submitted[contract_id] for contract_id in finished]
+    last_completion = max(finished.values(), default=sent)
+    elapsed = max(last_completion - started, 1e-9)
+
+    # Rows the job wrote for the contracts of this run
+    written = {"contracts": 0, "obligations": 0, "schedule_rows": 0, "audit_memos": 0}
+    contract_ids = list(finished)
+    with next(get_session()) as session:
+        for offset in range(0, len(contract_ids), QUERY_CHUNK):
+            ids = session.exec(select(Contract.id).where(Contract.external_id.in_(contract_ids[offset:offset + QUERY_CHUNK]))).all()
+            written["contracts"] += len(ids)
+            for key, table in (("obligations", ContractObligation), ("schedule_rows", RevenueSchedule), ("audit_memos", AuditMessage)):
+                written[key] += session.exec(select(func.count()).select_from(table).where(table.contract_id.in_(ids))).one()
+
+    # End-to-end latency of each size class, to compare short contracts under mixed load
+    by_size_class: Dict[str, Any] = {}
+    for size_class in sorted(set(size_classes.values())):
+        latencies = [latency for contract_id, latency in zip(finished, end_to_end) if size_classes[contract_id] == size_class]
+        by_size_class[f"{size_class}_completed"] = len(latencies)
+        by_size_class[f"{size_class}_p50_ms"] = _milliseconds(percentile(latencies, 0.50))
+        by_size_class[f"{size_class}_p95_ms"] = _milliseconds(percentile(latencies, 0.95))
+
+    throughput = len(finished) / elapsed
+    return {
+        "workers": workers,
+        "pools": [f"{concurrency}:{'+'.join(queues)}" for concurrency, queues in worker_pools(workers, args)],
+        "offered_rate": args.rate,
+        "duration": args.duration,
+        "uploaded": len(submitted),
+        "upload_errors": upload_errors,
+        "completed": len(finished),
+        "failed": len(failed),
+        "timed_out": len(submitted) - len(finished) - len(failed),
+        "throughput_per_second": round(throughput, 2),
+        "upload_p50_ms": _milliseconds(percentile(upload_latencies, 0.50)),
+        "upload_p95_ms": _milliseconds(percentile(upload_latencies, 0.95)),
+        "end_to_end_p50_ms": _milliseconds(percentile(end_to_end, 0.50)),
+        "end_to_end_p95_ms": _milliseconds(percentile(end_to_end, 0.95)),
+        "end_to_end_p99_ms": _milliseconds(percentile(end_to_end, 0.99)),
+        "queue_depth_max": max(depths, default=0),
+        "queue_depth_mean": round(statistics.fmean(depths), 1) if depths else 0,
+        "schedule_rows_per_second": round(written["schedule_rows"] / elapsed, 1),
+        "db_rows_per_second": round(sum(written.values()) / elapsed, 1),
+        "saturated": throughput < 0.95 * args.rate,
+        **by_size_class,
+    }
+
+
+def serve_worker(args: argparse.Namespace) -> None:
+    """Run a prefork Celery worker with the stub extractor installed before forking"""
+    from benchmarks.common import use_benchmark_database
+    use_benchmark_database()
+    install_stub_extractor(args.seed, {"obligations": args.obligations, "term_months": args.term_months}, args.llm_latency, args.pages)
+
+    from app.jobs import celery_app
+    celery_app.worker_main([
+        "worker", "--pool", "prefork", "--concurrency", str(args.concurrency),
+        "--queues", args.queues, "--hostname", args.hostname,
+        "--loglevel", "WARNING", "--without-gossip", "--without-mingle",
+    ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rate", type=float, default=10.0, help="uploads per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of uploads per worker count")
+    parser.add_argument("--drain-timeout", type=float, default=120.0, help="seconds to wait for the queue to drain")
+    parser.add_argument("--connections", type=int, default=32, help="concurrent upload connections")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds the stub extractor sleeps per contract")
+    parser.add_argument("--obligations", type=int, default=4)
+    parser.add_argument("--term-months", type=int, default=36)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--large-fraction", type=float, default=0.0, help="share of uploads that are long agreements")
+    parser.add_argument("--large-pages", type=int, default=120)
+    parser.add_argument("--tenants", type=int, default=1)
+    parser.add_argument("--routing", nargs="+", choices=["shared", "sized"], default=["sized"], help="contract routing modes to compare")
+    parser.add_argument("--small-workers", type=int, default=1, help="slots reserved for small contracts with sized routing")
+    parser.add_argument("--seed", type=int, default=606)
+    parser.add_argument("--in-process", action="store_true", help="use an in-memory broker and threaded workers")
+    parser.add_argument("--serve-worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--concurrency", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--queues", default="celery", help=argparse.SUPPRESS)
+    parser.add_argument("--hostname", default="load@%h", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", DEFAULT_DATABASE_URL)
+    if args.serve_worker:
+        serve_worker(args)
+        return
+
+    in_process = args.in_process or "CELERY_BROKER_URL" not in os.environ
+    if in_process:
+        os.environ["CELERY_BROKER_URL"] = "memory://"
+        os.environ["CELERY_RESULT_BACKEND"] = "cache+memory://"
+
+    from benchmarks.common import emit, use_benchmark_database
+    use_benchmark_database()
+    if in_process:
+        install_stub_extractor(args.seed, {"obligations": args.obligations, "term_months": args.term_months}, args.llm_latency, args.pages)
+
+    from app.jobs import celery_app
+    if in_process:
+        # The in-memory transport runs the worker's blocking loop, which polls for messages and
+        # only updates prefetch limits between two-second waits. Fetch well ahead instead, and
+        # count prefetched tasks that have not started as queued (see `queue_depth`).
+        celery_app.conf.broker_transport_options = {"polling_interval": 0.01}
+        celery_app.conf.task_acks_late = False
+        celery_app.conf.worker_prefetch_multiplier = IN_PROCESS_PREFETCH
+    emit("load_test.setup", broker="memory" if in_process else celery_app.conf.broker_url.split("://")[0],
+         database=os.environ["DATABASE_URL"].split(":")[0], llm_latency=args.llm_latency)
+
+    with run_api() as base_url:
+        for routing in args.routing:
+            # Read by the API and by the workers, including worker processes started after this
+            os.environ["CONTRACT_ROUTING"] = routing
+            for workers in args.workers:
+                celery_app.control.purge()
+                with run_workers(workers, in_process, args):
+                    emit("load_test.run", mode="in_process" if in_process else "broker", routing=routing,
+                         **run_load(base_url, workers, in_process, args))
+
+
+if __name__ == "__main__":
+    main()
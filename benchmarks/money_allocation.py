@@ -0,0 +1,101 @@
+"""
+Integer-cent allocation benchmark and drift check.
+
+Runs random synthetic contracts through the engine and checks that every over-time
+obligation's schedule rows sum exactly to its allocated amount (zero drift), then compares
+the array-based cent split against per-row Decimal and float rounding.
+
+    python -m benchmarks.money_allocation --contracts 2000 --splits 100000
+"""
+
+import argparse
+import random
+import sys
+from decimal import ROUND_HALF_UP, Decimal
+
+from app.ASC606 import ASC606Engine
+from app.ASC606.money import split_evenly, to_cents
+from benchmarks.common import emit, timer
+from benchmarks.synthetic import synthetic_contract
+
+
+def check_drift(contracts: int, seed: int) -> int:
+    """Return the largest absolute drift in cents between an obligation and its schedule rows"""
+    rng = random.Random(seed)
+    max_drift = 0
+    obligations_checked = 0
+
+    for index in range(contracts):
+        contract = synthetic_contract(
+            rng,
+            obligations=rng.randint(1, 8),
+            discounts=rng.randint(0, 3),
+            term_months=rng.randint(1, 120),
+            index=index,
+        )
+        engine = ASC606Engine()
+        engine.process_contract(contract)
+
+        scheduled = {}
+        for entry in engine.revenue_schedule:
+            scheduled[entry.obligation_name] = scheduled.get(entry.obligation_name, 0) + to_cents(entry.amount)
+
+        for obligation in engine.performance_obligations:
+            if obligation.recognition_method != "over_time":
+                continue
+            obligations_checked += 1
+            max_drift = max(max_drift, abs(scheduled.get(obligation.name, 0) - to_cents(obligation.allocated_amount)))
+
+    emit("money_allocation.drift", contracts=contracts, obligations=obligations_checked, max_drift_cents=max_drift)
+    return max_drift
+
+
+def _split_decimal(amount: float, count: int) -> list:
+    total = Decimal(str(amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    shares = [(total / count).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) for _ in range(count - 1)]
+    shares.append(total - sum(shares))
+    return shares
+
+
+def _split_float(amount: float, count: int) -> list:
+    return [round(amount / count, 2) for _ in range(count)]
+
+
+def compare_split_speed(splits: int, seed: int) -> None:
+    rng = random.Random(seed)
+    cases = [(round(rng.uniform(100, 1000000), 2), rng.randint(1, 120)) for _ in range(splits)]
+    rows = sum(count for _, count in cases)
+
+    for name, split in (
+        ("integer_cents", lambda amount, count: split_evenly(to_cents(amount), count)),
+        ("decimal_per_row", _split_decimal),
+        ("float_per_row", _split_float),
+    ):
+        with timer() as elapsed:
+            for amount, count in cases:
+                split(amount, count)
+        emit(
+            f"money_allocation.split.{name}",
+            splits=splits,
+            rows=rows,
+            seconds=round(elapsed["seconds"], 3),
+            rows_per_second=round(rows / elapsed["seconds"]),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=2000)
+    parser.add_argument("--splits", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    drift = check_drift(args.contracts, args.seed)
+    compare_split_speed(args.splits, args.seed)
+
+    if drift:
+        sys.exit(f"Schedule rows drifted from allocated amounts by up to {drift} cents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Engine to persistence handoff benchmark.
+
+Times the CPU work between the ASC 606 engine and the database insert per contract, without
+a database: running the engine and turning its result into `RevenueSchedule` insert
+parameters. Two handoffs are compared on the same seeded contracts:
+- `records`: the dict result, whose ISO date strings are parsed back and whose obligations
+  are matched to their ids by name
+- `typed`: `ASC606Engine.recognize`, whose native columns and obligation keys are used as is
+
+    python -m benchmarks.persistence_handoff --contracts 500 --obligations 8 --term-months 60
+"""
+
+import argparse
+import statistics
+from datetime import datetime
+from typing import Any, Dict, List
+
+from app.ASC606 import ASC606Engine, revenue_recognition
+from benchmarks.common import emit
+from benchmarks.pipeline_stages import measure
+from benchmarks.synthetic import synthetic_portfolio
+
+
+def records_handoff(contract_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    revenue_result = revenue_recognition(contract_data)
+    obligation_map = {obligation["name"]: key for key, obligation in enumerate(contract_data["performance_obligations"])}
+
+    schedule_rows = []
+    for entry in revenue_result["revenue_schedule"]:
+        schedule_rows.append({
+            "contract_id": 1,
+            "obligation_id": obligation_map.get(entry["obligation_name"]),
+            "period_start": datetime.fromisoformat(entry["period_start"]).date(),
+            "period_end": datetime.fromisoformat(entry["period_end"]).date(),
+            "amount": entry["amount"],
+            "recognized": entry["status"] == "recognized",
+        })
+    return schedule_rows
+
+
+def typed_handoff(contract_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    schedule = ASC606Engine().recognize(contract_data).revenue_schedule
+    obligation_ids = list(range(len(contract_data["performance_obligations"])))
+
+    return [
+        {
+            "contract_id": 1,
+            "obligation_id": obligation_ids[key] if key >= 0 else None,
+            "period_start": period_start,
+            "period_end": period_end,
+            "amount": amount,
+            "recognized": status == "recognized",
+        }
+        for key, period_start, period_end, amount, status in zip(
+            schedule.obligation_key.tolist(),
+            schedule.period_start.tolist(),
+            schedule.period_end.tolist(),
+            schedule.amount.tolist(),
+            schedule.status,
+        )
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=500)
+    parser.add_argument("--obligations", type=int, default=8)
+    parser.add_argument("--term-months", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    contracts = list(synthetic_portfolio(args.contracts, seed=args.seed, obligations=args.obligations, term_months=args.term_months))
+    size = f"{args.obligations}x{args.term_months}"
+
+    for contract in contracts[:20]:
+        if records_handoff(contract) != typed_handoff(contract):
+            raise AssertionError(f"Handoffs disagree for contract {contract['contract_id']}")
+
+    records = measure("persistence_handoff.records", size, contracts, records_handoff, args.repeat)
+    typed = measure("persistence_handoff.typed", size, contracts, typed_handoff, args.repeat)
+    emit(
+        "persistence_handoff.saving",
+        size=size,
+        rows_per_contract=round(statistics.fmean(len(typed_handoff(contract)) for contract in contracts[:50]), 1),
+        saved_us_per_contract=round(records["median_us"] - typed["median_us"], 1),
+        saved_percent=round((1 - typed["median_us"] / records["median_us"]) * 100, 1),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Per-stage pipeline benchmark.
+
+Generates seeded synthetic contracts (text and matching extraction) at a size profile, then
+times each stage of the upload pipeline in isolation on the output of the stage before it:
+file text extraction, preprocessing, prompt building, extraction against the offline Gemini
+stub, discounts, schedule generation, the full engine and audit memo rendering. A final
+end-to-end run chains every stage per contract.
+
+    python -m benchmarks.pipeline_stages --size medium --contracts 50 --repeat 5
+    python -m benchmarks.pipeline_stages --size custom --obligations 20 --term-months 240 --pages 80
+"""
+
+import argparse
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+from app.ASC606 import ASC606Engine, DiscountHandler, RevenueScheduleGenerator, revenue_recognition
+from app.audit_memo import build_memo, render_memo
+from app.extractor.llm_extractor import extract_contract_data
+from app.extractor.preprocess import clean_text, filter_relevant_sections, split_sections
+from app.extractor.prompts import get_revenue_recognition_prompt
+from app.utils.file_processor import FileProcessor
+from benchmarks.common import emit
+from benchmarks.stub_llm import stub_gemini
+from benchmarks.synthetic import synthetic_documents
+
+SIZES = {
+    "small": {"obligations": 2, "discounts": 0, "term_months": 12, "pages": 2},
+    "medium": {"obligations": 4, "discounts": 1, "term_months": 36, "pages": 8},
+    "large": {"obligations": 12, "discounts": 4, "term_months": 120, "pages": 40},
+}
+
+
+def measure(benchmark: str, size: str, inputs: Sequence[Any], stage: Callable[[Any], Any], repeat: int) -> Dict[str, Any]:
+    """Time `stage` once per input per round and emit per-call latency statistics"""
+    samples: List[float] = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            stage(item)
+            samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    return emit(
+        benchmark,
+        size=size,
+        calls=len(samples),
+        median_us=round(statistics.median(samples) * 1e6, 1),
+        p95_us=round(samples[int(len(samples) * 0.95) - 1 if len(samples) > 1 else 0] * 1e6, 1),
+        mean_us=round(statistics.fmean(samples) * 1e6, 1),
+        calls_per_second=round(len(samples) / sum(samples), 1),
+    )
+
+
+def _process_obligations(contract_data: Dict[str, Any]) -> List[Any]:
+    engine = ASC606Engine()
+    engine.contract_data = contract_data
+    engine._process_performance_obligations()
+    return engine.performance_obligations
+
+
+def _apply_discounts(contract_data: Dict[str, Any]) -> List[Any]:
+    obligations = _process_obligations(contract_data)
+    handler = DiscountHandler()
+    handler.process_discounts(contract_data)
+    handler.apply_discounts(obligations)
+    return obligations
+
+
+def _end_to_end(document: Any) -> str:
+    file_bytes, filename = document
+    text_content, _ = FileProcessor.extract_text(file_bytes, filename, "text/markdown")
+    extracted = extract_contract_data(text_content, filename)
+    revenue_result = revenue_recognition(extracted.model_dump())
+    return render_memo(build_memo(extracted.model_dump(mode="json"), revenue_result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=[*SIZES, "custom"], default="medium")
+    parser.add_argument("--contracts", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--obligations", type=int, default=4)
+    parser.add_argument("--discounts", type=int, default=1)
+    parser.add_argument("--term-months", type=int, default=36)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    profile = SIZES.get(args.size) or {
+        "obligations": args.obligations,
+        "discounts": args.discounts,
+        "term_months": args.term_months,
+        "pages": args.pages,
+    }
+    documents = list(synthetic_documents(args.contracts, seed=args.seed, **profile))
+    emit("pipeline_stages.profile", size=args.size, contracts=args.contracts, repeat=args.repeat, **profile,
+         average_characters=round(statistics.fmean(len(text) for text, _ in documents)))
+
+    files = [(text.encode("utf-8"), f"{contract['contract_id']}.md") for text, contract in documents]
+    texts = [text for text, _ in documents]
+    cleaned = [clean_text(text) for text in texts]
+    sections = [split_sections(text) for text in cleaned]
+    contexts = ["\n\n".join(filter_relevant_sections(found)) for found in sections]
+
+    with stub_gemini({contract["contract_id"]: contract for _, contract in documents}) as model:
+        extracted = []
+        for text, contract in documents:
+            model.default = contract
+            extracted.append(extract_contract_data(text, contract["contract_id"]))
+        contract_data = [item.model_dump() for item in extracted]
+        json_data = [item.model_dump(mode="json") for item in extracted]
+        discounted = [_apply_discounts(data) for data in contract_data]
+        results = [revenue_recognition(data) for data in contract_data]
+        memos = [build_memo(data, result) for data, result in zip(json_data, results)]
+
+        by_file = {filename: contract for (_, filename), (_, contract) in zip(files, documents)}
+
+        def extract(item):
+            model.default = item[1]
+            return extract_contract_data(item[0], item[1]["contract_id"])
+
+        def end_to_end(item):
+            model.default = by_file[item[1]]
+            return _end_to_end(item)
+
+        stages = [
+            ("file_processor.extract_text", files, lambda item: FileProcessor.extract_text(item[0], item[1], "text/markdown")),
+            ("preprocess.clean_text", texts, clean_text),
+            ("preprocess.split_sections", cleaned, split_sections),
+            ("preprocess.filter_relevant_sections", sections, filter_relevant_sections),
+            ("prompts.revenue_recognition", contexts, get_revenue_recognition_prompt),
+            ("extractor.extract_contract_data", documents, extract),
+            ("asc606.discounts", contract_data, _apply_discounts),
+            ("asc606.revenue_schedule", list(zip(contract_data, discounted)),
+             lambda item: RevenueScheduleGenerator(item[0]).generate_schedule(item[1])),
+            ("asc606.engine", contract_data, revenue_recognition),
+            ("audit_memo.build", list(zip(json_data, results)), lambda item: build_memo(*item)),
+            ("audit_memo.render_markdown", memos, lambda memo: render_memo(memo, "markdown")),
+            ("audit_memo.render_html", memos, lambda memo: render_memo(memo, "html")),
+            ("audit_memo.structured", memos, lambda memo: memo.to_structured()),
+            ("pipeline.end_to_end", files, end_to_end),
+        ]
+
+        for benchmark, inputs, stage in stages:
+            measure(f"pipeline_stages.{benchmark}", args.size, inputs, stage, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
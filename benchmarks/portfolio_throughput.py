@@ -0,0 +1,65 @@
+"""
+Portfolio throughput benchmark.
+
+Runs a seeded synthetic portfolio through a serial `revenue_recognition` loop and through
+`process_portfolio` at several worker counts, reporting contracts per second.
+
+    python -m benchmarks.portfolio_throughput --contracts 20000 --workers 1 2 4 8
+"""
+
+import argparse
+
+from app.ASC606 import process_portfolio, revenue_recognition
+from benchmarks.common import emit, timer
+from benchmarks.synthetic import synthetic_portfolio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=20000)
+    parser.add_argument("--obligations", type=int, default=4)
+    parser.add_argument("--term-months", type=int, default=36)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    options = {"obligations": args.obligations, "term_months": args.term_months}
+
+    errors = 0
+    with timer() as elapsed:
+        for contract in synthetic_portfolio(args.contracts, seed=args.seed, **options):
+            try:
+                revenue_recognition(contract)
+            except Exception:
+                errors += 1
+    emit(
+        "portfolio_throughput.serial_loop",
+        contracts=args.contracts,
+        errors=errors,
+        seconds=round(elapsed["seconds"], 3),
+        contracts_per_second=round(args.contracts / elapsed["seconds"]),
+    )
+
+    for workers in args.workers:
+        errors = 0
+        with timer() as elapsed:
+            for result in process_portfolio(
+                synthetic_portfolio(args.contracts, seed=args.seed, **options),
+                workers=workers,
+                chunk_size=args.chunk_size,
+            ):
+                errors += not result.ok
+        emit(
+            "portfolio_throughput.process_portfolio",
+            contracts=args.contracts,
+            workers=workers,
+            chunk_size=args.chunk_size,
+            errors=errors,
+            seconds=round(elapsed["seconds"], 3),
+            contracts_per_second=round(args.contracts / elapsed["seconds"]),
+        )
+
+
+if __name__ == "__main__":
+    main()
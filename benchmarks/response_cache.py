@@ -0,0 +1,143 @@
+"""
+Response cache benchmark.
+
+Replays dashboard refreshes against the contract read endpoints: random reads of the
+revenue schedules and audit memos of `--contracts` seeded contracts, once with the response
+cache off and once through Redis, counting the SQL statements each run sends to the database.
+A final run invalidates a contract between reads, as the jobs do when they commit.
+
+Needs a Redis server; RESPONSE_CACHE_URL defaults to redis://localhost:6379/15 and the
+benchmark's keys are removed from it before each run.
+
+    RESPONSE_CACHE_URL=redis://localhost:6379/15 python -m benchmarks.response_cache --reads 20000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import emit, use_benchmark_database
+
+DEFAULT_CACHE_URL = "redis://localhost:6379/15"
+EXTERNAL_ID_PREFIX = "cache-bench"
+
+
+def seed_contracts(contracts: int, periods: int) -> List[str]:
+    """Contracts with a schedule and an audit memo, created once per database"""
+    from sqlalchemy import insert
+    from sqlmodel import select
+    from app.db import get_session
+    from app.models import AuditMessage, Contract, ContractObligation, RevenueSchedule
+
+    external_ids = [f"{EXTERNAL_ID_PREFIX}-{index:05d}" for index in range(contracts)]
+    with next(get_session()) as session:
+        existing = set(session.exec(select(Contract.external_id).where(Contract.external_id.in_(external_ids))).all())
+        for external_id in external_ids:
+            if external_id in existing:
+                continue
+            contract = Contract(external_id=external_id, customer_name="Customer", currency="USD", status="processed")
+            session.add(contract)
+            session.flush()
+            obligation = ContractObligation(contract_id=contract.id, name="SaaS Subscription", type="Service", recognition_method="over_time")
+            session.add(obligation)
+            session.flush()
+            session.execute(insert(RevenueSchedule), [
+                {
+                    "contract_id": contract.id,
+                    "obligation_id": obligation.id,
+                    "period_start": date(2024 + month // 12, month % 12 + 1, 1),
+                    "period_end": date(2024 + month // 12, month % 12 + 1, 28),
+                    "amount": 1000.0,
+                    "cumulative_amount": 1000.0 * (month + 1),
+                    "recognized": month < 12,
+                }
+                for month in range(periods)
+            ])
+            session.add(AuditMessage(contract_id=contract.id, memo_text="# Revenue Recognition Memo\n\n" + "Analysis. " * 400))
+        session.commit()
+    return external_ids
+
+
+def replay(label: str, external_ids: List[str], reads: int, seed: int, between: Callable[[int], None] = lambda index: None) -> Dict[str, Any]:
+    from sqlalchemy import event
+    from app.cache import response_cache
+    from app.db import engine
+    from app.main import get_audit_memos, get_revenue_schedules
+
+    statements = 0
+
+    def count(*args: Any) -> None:
+        nonlocal statements
+        statements += 1
+
+    endpoints = [get_revenue_schedules, get_audit_memos]
+    rng = random.Random(seed)
+    latencies = []
+    before = response_cache.stats()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for index in range(reads):
+            between(index)
+            endpoint = endpoints[index % 2]
+            external_id = rng.choice(external_ids)
+            started = time.perf_counter()
+            endpoint(external_id)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    after = response_cache.stats()
+
+    latencies.sort()
+    return emit(
+        "response_cache.replay",
+        run=label,
+        reads=reads,
+        contracts=len(external_ids),
+        median_us=round(statistics.median(latencies) * 1e6, 1),
+        p95_us=round(latencies[int(len(latencies) * 0.95)] * 1e6, 1),
+        db_statements=statements,
+        db_statements_per_read=round(statements / reads, 3),
+        hits=after["hits"] - before["hits"],
+        misses=after["misses"] - before["misses"],
+        errors=after["errors"] - before["errors"],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=500)
+    parser.add_argument("--periods", type=int, default=36, help="schedule rows per contract")
+    parser.add_argument("--reads", type=int, default=20000)
+    parser.add_argument("--invalidate-every", type=int, default=100, help="reads between invalidations in the last run")
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    os.environ.setdefault("RESPONSE_CACHE_URL", DEFAULT_CACHE_URL)
+    use_benchmark_database()
+    from app.cache import response_cache
+
+    external_ids = seed_contracts(args.contracts, args.periods)
+    cache_url = response_cache.url
+
+    response_cache.url = None
+    replay("uncached", external_ids, args.reads, args.seed)
+
+    response_cache.url = cache_url
+    response_cache.invalidate(external_ids)
+    replay("cached", external_ids, args.reads, args.seed)
+
+    rng = random.Random(args.seed + 1)
+    response_cache.invalidate(external_ids)
+    replay(
+        "cached_with_invalidation", external_ids, args.reads, args.seed,
+        between=lambda index: index % args.invalidate_every or response_cache.invalidate([rng.choice(external_ids)]),
+    )
+    emit("response_cache.stats", **response_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
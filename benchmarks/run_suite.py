@@ -0,0 +1,84 @@
+"""
+Benchmark suite runner.
+
+Runs every offline benchmark with suite-sized arguments, each in its own process, and
+collects their JSON lines into one results file headed by a record describing the commit
+and interpreter. Results from two commits can then be compared with `benchmarks.compare`.
+
+    python -m benchmarks.run_suite --output results/HEAD.jsonl
+    python -m benchmarks.run_suite --output results/HEAD.jsonl --only pipeline_stages --database
+"""
+
+import argparse
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.common import emit
+
+SUITE = [
+    ("pipeline_stages", ["--size", "small", "--contracts", "50", "--repeat", "5"]),
+    ("pipeline_stages", ["--size", "medium", "--contracts", "50", "--repeat", "5"]),
+    ("pipeline_stages", ["--size", "large", "--contracts", "20", "--repeat", "3"]),
+    ("money_allocation", ["--contracts", "500", "--splits", "20000"]),
+    ("daily_proration", ["--contracts", "500", "--obligations", "20000"]),
+    ("portfolio_throughput", ["--contracts", "2000", "--workers", "1", "2"]),
+    ("schedule_memory", ["--rows", "200000", "--contracts", "500"]),
+    ("persistence_handoff", ["--contracts", "300", "--repeat", "3"]),
+    ("streaming_extraction", ["--size", "medium", "--contracts", "20"]),
+    ("targeted_reextraction", ["--size", "medium", "--contracts", "10"]),
+    ("llm_worker_memory", ["--concurrency", "8", "64", "--latency", "1"]),
+]
+
+# These seed and query a database (a local SQLite file unless DATABASE_URL is set)
+DATABASE_SUITE = [
+    ("deferred_revenue", ["--lengths", "12", "120", "1200", "--lookups", "200"]),
+    ("export_revenue_schedules", ["--rows", "100000"]),
+    ("journal_entries", ["--contracts", "5000"]),
+    ("usage_ingestion", ["--events", "100000", "--batch-size", "20000", "--contracts", "200"]),
+    ("contract_search", ["--contracts", "20000", "--repeat", "20"]),
+]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True, help="JSON lines file the results are appended to")
+    parser.add_argument("--only", nargs="+", help="run only these benchmark modules")
+    parser.add_argument("--database", action="store_true", help="include the database-backed benchmarks")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    os.environ["BENCH_OUTPUT"] = args.output
+
+    emit(
+        "suite",
+        commit=_git_commit(),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        cpus=os.cpu_count(),
+        started_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+    failures = []
+    for module, module_args in SUITE + (DATABASE_SUITE if args.database else []):
+        if args.only and module not in args.only:
+            continue
+        completed = subprocess.run([sys.executable, "-m", f"benchmarks.{module}", *module_args])
+        if completed.returncode:
+            failures.append(module)
+
+    if failures:
+        sys.exit(f"Benchmarks failed: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Revenue schedule memory benchmark.
+
+Holds the same schedule in each representation the engine has used and reports the memory
+it retains, measured with tracemalloc, along with the time to build it:
+- `legacy_rows`: dataclass rows with an instance dict and a timestamp per row
+- `records`: the engine's `records` result format, one JSON-ready dict per row
+- `slots_rows`: `RevenueScheduleModel` rows with slots and a shared timestamp
+- `columnar`: the engine's `columnar` result format, `RevenueScheduleColumns`
+
+The schedule is built from a fixed seed with the obligation names, methods and statuses of
+real schedules. A final pair of runs times the engine itself in both result formats.
+
+    python -m benchmarks.schedule_memory --rows 1000000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from app.ASC606 import RevenueScheduleColumns, RevenueScheduleModel, revenue_recognition
+from benchmarks.common import emit, timer
+from benchmarks.synthetic import synthetic_portfolio
+
+OBLIGATIONS = ["SaaS Subscription", "Premium Support", "Implementation Services", "Training", "Analytics Add-on"]
+
+
+@dataclass
+class LegacyRevenueScheduleModel:
+    """Schedule row as stored before slots: an instance dict and its own timestamp"""
+    contract_id: str
+    obligation_name: str
+    period_start: date
+    period_end: date
+    amount: float
+    recognition_method: str
+    status: str
+    created_at: datetime
+
+
+def _source(rows: int, seed: int) -> Dict[str, Any]:
+    """Compact description of a schedule the representations are built from"""
+    rng = np.random.default_rng(seed)
+    base = date(2020, 1, 1).toordinal()
+    starts = base + rng.integers(0, 3650, rows)
+    return {
+        "contract_id": sys.intern("SYN-000001"),
+        "names": rng.integers(0, len(OBLIGATIONS), rows).tolist(),
+        "starts": starts.tolist(),
+        "ends": (starts + 29).tolist(),
+        "amounts": np.round(rng.uniform(10, 10000, rows), 2).tolist(),
+        "recognized": (rng.random(rows) < 0.5).tolist(),
+    }
+
+
+def _rows(source: Dict[str, Any], row_type: type, shared_created_at: bool) -> List[Any]:
+    created_at = datetime.now()
+    return [
+        row_type(
+            source["contract_id"],
+            OBLIGATIONS[name],
+            date.fromordinal(start),
+            date.fromordinal(end),
+            amount,
+            "over_time",
+            "recognized" if recognized else "scheduled",
+            created_at if shared_created_at else datetime.now(),
+        )
+        for name, start, end, amount, recognized in zip(
+            source["names"], source["starts"], source["ends"], source["amounts"], source["recognized"]
+        )
+    ]
+
+
+def _records(source: Dict[str, Any]) -> List[Dict[str, Any]]:
+    created_at = datetime.now().isoformat()
+    return [
+        {
+            "contract_id": source["contract_id"],
+            "obligation_name": OBLIGATIONS[name],
+            "period_start": date.fromordinal(start).isoformat(),
+            "period_end": date.fromordinal(end).isoformat(),
+            "amount": amount,
+            "recognition_method": "over_time",
+            "status": "recognized" if recognized else "scheduled",
+            "created_at": created_at,
+        }
+        for name, start, end, amount, recognized in zip(
+            source["names"], source["starts"], source["ends"], source["amounts"], source["recognized"]
+        )
+    ]
+
+
+def _columnar(source: Dict[str, Any]) -> RevenueScheduleColumns:
+    epoch = date(1970, 1, 1).toordinal()
+    return RevenueScheduleColumns(
+        contract_id=source["contract_id"],
+        created_at=datetime.now(),
+        obligation_name=[OBLIGATIONS[name] for name in source["names"]],
+        period_start=(np.array(source["starts"]) - epoch).astype("datetime64[D]"),
+        period_end=(np.array(source["ends"]) - epoch).astype("datetime64[D]"),
+        amount=np.array(source["amounts"], dtype=np.float64),
+        recognition_method=["over_time"] * len(source["names"]),
+        status=["recognized" if recognized else "scheduled" for recognized in source["recognized"]],
+    )
+
+
+def measure_memory(representation: str, rows: int, build: Callable[[], Any]) -> Dict[str, Any]:
+    """Build a representation under tracemalloc and emit the memory it retains"""
+    gc.collect()
+    tracemalloc.start()
+    with timer() as elapsed:
+        schedule = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del schedule
+    gc.collect()
+
+    return emit(
+        "schedule_memory.representation",
+        representation=representation,
+        rows=rows,
+        seconds=round(elapsed["seconds"], 3),
+        retained_mb=round(retained / 2**20, 1),
+        peak_mb=round(peak / 2**20, 1),
+        bytes_per_row=round(retained / rows, 1),
+    )
+
+
+def measure_engine(result_format: str, contracts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = 0
+    with timer() as elapsed:
+        for contract in contracts:
+            rows += len(revenue_recognition(contract, result_format=result_format)["revenue_schedule"])
+    return emit(
+        "schedule_memory.engine",
+        format=result_format,
+        contracts=len(contracts),
+        rows=rows,
+        seconds=round(elapsed["seconds"], 3),
+        rows_per_second=round(rows / elapsed["seconds"]),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--contracts", type=int, default=500, help="contracts for the engine timing runs")
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    source = _source(args.rows, args.seed)
+    measure_memory("legacy_rows", args.rows, lambda: _rows(source, LegacyRevenueScheduleModel, shared_created_at=False))
+    measure_memory("records", args.rows, lambda: _records(source))
+    measure_memory("slots_rows", args.rows, lambda: _rows(source, RevenueScheduleModel, shared_created_at=True))
+    measure_memory("columnar", args.rows, lambda: _columnar(source))
+
+    contracts = list(synthetic_portfolio(args.contracts, seed=args.seed))
+    for result_format in ("records", "columnar"):
+        measure_engine(result_format, contracts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Streaming extraction benchmark.
+
+Runs seeded synthetic contracts through extraction against the offline Gemini stub and the
+ASC 606 engine, with the response delivered at a fixed output rate, once waiting for the
+whole response and once streaming it with obligations prepared by the engine as they arrive.
+Per contract it reports the end-to-end time, the time to the first validated obligation and
+the tail: the time from the last response chunk to the finished engine result.
+
+    python -m benchmarks.streaming_extraction --size large --contracts 20 --chars-per-second 20000
+"""
+
+import argparse
+import statistics
+import time
+from typing import Any, Dict, List
+
+from app.ASC606 import ASC606Engine
+from app.extractor.llm_extractor import extract_contract_data
+from benchmarks.common import emit
+from benchmarks.pipeline_stages import SIZES
+from benchmarks.stub_llm import stub_gemini
+from benchmarks.synthetic import synthetic_documents
+
+
+def _ms(samples: List[float], fraction: float = 0.5) -> float:
+    ordered = sorted(samples)
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * 1000, 3)
+
+
+def run(mode: str, size: str, documents: List[Any], model: Any, repeat: int) -> Dict[str, Any]:
+    stream = mode == "streaming"
+    totals, tails, first_items = [], [], []
+    for _ in range(repeat):
+        for text, contract in documents:
+            model.default = contract
+            engine = ASC606Engine()
+            started = time.perf_counter()
+            first_item = []
+
+            def prepare(index, obligation, contract_terms):
+                if not first_item:
+                    first_item.append(time.perf_counter() - started)
+                engine.prepare_obligation(index, obligation.model_dump(), contract_terms)
+
+            extracted = extract_contract_data(text, contract["contract_id"], stream=stream, on_obligation=prepare)
+            engine.recognize(extracted.model_dump())
+            finished = time.perf_counter()
+
+            totals.append(finished - started)
+            tails.append(finished - model.last_chunk_at)
+            first_items.extend(first_item)
+
+    return emit(
+        "streaming_extraction.contract",
+        mode=mode,
+        size=size,
+        contracts=len(totals),
+        median_ms=_ms(totals),
+        p95_ms=_ms(totals, 0.95),
+        tail_median_ms=_ms(tails),
+        first_obligation_median_ms=_ms(first_items) if first_items else None,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=list(SIZES), default="large")
+    parser.add_argument("--contracts", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before the first response chunk")
+    parser.add_argument("--chars-per-second", type=float, default=20000, help="response output rate, 0 for no delay")
+    parser.add_argument("--chunk-chars", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    documents = list(synthetic_documents(args.contracts, seed=args.seed, **SIZES[args.size]))
+    with stub_gemini({}, args.latency, args.chars_per_second, args.chunk_chars) as model:
+        results = {mode: run(mode, args.size, documents, model, args.repeat) for mode in ("buffered", "streaming")}
+
+    emit(
+        "streaming_extraction.saving",
+        size=args.size,
+        chars_per_second=args.chars_per_second,
+        saved_median_ms=round(results["buffered"]["median_ms"] - results["streaming"]["median_ms"], 3),
+        tail_saved_median_ms=round(results["buffered"]["tail_median_ms"] - results["streaming"]["tail_median_ms"], 3),
+    )
+
+
+if __name__ == "__main__":
+    main()
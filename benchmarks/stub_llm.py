@@ -0,0 +1,110 @@
+"""
+Offline stand-in for the Gemini client.
+
+`stub_gemini` swaps the client used by `app.extractor.llm_extractor` for one that answers
+each prompt with the `extracted_json` of the synthetic contract named in it (or with a
+default response when the prompt names none), wrapped in a JSON code fence as Gemini
+returns it. Prompt building, response parsing and schema
+validation still run, so extraction can be benchmarked without network access.
+
+Responses can be streamed in chunks like `generate_content(..., stream=True)` does, with an
+optional output rate so streaming and non-streaming extraction can be compared.
+"""
+
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, Optional
+
+CONTRACT_ID_PATTERN = re.compile(r"Contract ID:\s*(SYN-\d+)")
+
+
+class StubGenerativeModel:
+    """Mimics `genai.GenerativeModel.generate_content` for known synthetic contracts"""
+
+    def __init__(
+        self,
+        responses: Dict[str, Dict[str, Any]],
+        latency: float = 0.0,
+        chars_per_second: float = 0.0,
+        chunk_chars: int = 256,
+    ):
+        self.responses = responses
+        self.latency = latency
+        self.chars_per_second = chars_per_second
+        self.chunk_chars = chunk_chars
+        self.default: Optional[Dict[str, Any]] = None
+        self.calls = 0
+        # perf_counter time the last response, or last chunk of one, was handed out
+        self.last_chunk_at = 0.0
+
+    def generate_content(self, prompt: str, generation_config: Any = None, stream: bool = False) -> Any:
+        match = CONTRACT_ID_PATTERN.search(prompt)
+        response = self.responses.get(match.group(1)) if match else self.default
+        if response is None:
+            raise ValueError("Prompt does not name a known synthetic contract")
+        self.calls += 1
+
+        text = f"```json\n{json.dumps(response)}\n```"
+        if stream:
+            return self._stream(text)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.chars_per_second:
+            time.sleep(len(text) / self.chars_per_second)
+        self.last_chunk_at = time.perf_counter()
+        return _response(text)
+
+    def _stream(self, text: str) -> Iterator[Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        for start in range(0, len(text), self.chunk_chars):
+            chunk = text[start:start + self.chunk_chars]
+            if self.chars_per_second:
+                time.sleep(len(chunk) / self.chars_per_second)
+            self.last_chunk_at = time.perf_counter()
+            yield _response(chunk)
+
+
+def _response(text: str) -> Any:
+    part = SimpleNamespace(text=text)
+    return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+@contextmanager
+def stub_gemini(
+    responses: Dict[str, Dict[str, Any]],
+    latency: float = 0.0,
+    chars_per_second: float = 0.0,
+    chunk_chars: int = 256,
+) -> Iterator[StubGenerativeModel]:
+    """
+    Route Gemini calls made by the extractor to a `StubGenerativeModel`.
+
+    `responses` maps contract ids to the extracted contracts returned for them; `latency`
+    adds a fixed delay per call to model the round trip, and `chars_per_second` the time
+    to generate the response, delivered in `chunk_chars` chunks when streamed.
+    """
+    from app.extractor import llm_extractor
+
+    model = StubGenerativeModel(responses, latency, chars_per_second, chunk_chars)
+    original_genai = llm_extractor.genai
+    original_key = os.environ.get("GOOGLE_API_KEY")
+
+    llm_extractor.genai = SimpleNamespace(
+        configure=lambda **kwargs: None,
+        GenerativeModel=lambda name: model,
+        types=original_genai.types,
+    )
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    llm_extractor.reset_gemini_client()
+    try:
+        yield model
+    finally:
+        llm_extractor.genai = original_genai
+        llm_extractor.reset_gemini_client()
+        if original_key is None:
+            os.environ.pop("GOOGLE_API_KEY", None)
@@ -0,0 +1,236 @@
+"""
+Seeded synthetic contract generator.
+
+Produces `extracted_json` payloads shaped like `ContractLLMResponseJsonSchema` output, so the
+engine and the memo can be exercised on portfolios of any size without the LLM, and contract
+text describing the same terms, so the extraction stages can be exercised as well.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+FREQUENCIES = ["monthly", "quarterly", "yearly", "every_2_months", "every_6_months"]
+
+OBLIGATION_NAMES = [
+    "SaaS Subscription", "Premium Support", "Implementation Services", "Training Workshop",
+    "Analytics Module", "Data Migration", "Post-Contract Support", "API Access",
+]
+
+
+def _add_months(start: date, months: int) -> date:
+    month_index = start.month - 1 + months
+    return date(start.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def synthetic_contract(
+    rng: random.Random,
+    obligations: int = 4,
+    discounts: int = 1,
+    term_months: int = 36,
+    index: int = 0,
+    ratable_method: str = "even",
+) -> Dict[str, Any]:
+    """Generate one synthetic extracted contract"""
+    effective_date = date(2022, 1, 1) + timedelta(days=rng.randrange(0, 3 * 365))
+    end_date = _add_months(effective_date, term_months) - timedelta(days=1)
+
+    performance_obligations = []
+    for number in range(obligations):
+        ssp = round(rng.uniform(1000, 250000), 2)
+        name = f"{OBLIGATION_NAMES[number % len(OBLIGATION_NAMES)]} {number + 1}"
+        if rng.random() < 0.75:
+            performance_obligations.append({
+                "name": name,
+                "type": "Service",
+                "ssp": ssp,
+                "allocated_value": ssp,
+                "revenue_recognition_method": "over_time",
+                "recognition_trigger": "Ratably over the service period",
+                "recognition_period": {
+                    "start_date": effective_date.isoformat(),
+                    "end_date": end_date.isoformat(),
+                    "frequency": rng.choice(FREQUENCIES),
+                    "ratable_method": ratable_method,
+                },
+                "milestones": [],
+            })
+        else:
+            performance_obligations.append({
+                "name": name,
+                "type": "Service",
+                "ssp": ssp,
+                "allocated_value": ssp,
+                "revenue_recognition_method": "point_in_time",
+                "recognition_trigger": "Upon customer acceptance",
+                "milestones": [],
+            })
+
+    contract_discounts = []
+    for number in range(discounts):
+        if rng.random() < 0.5:
+            contract_discounts.append({
+                "name": f"Volume Discount {number + 1}",
+                "type": "contract_level",
+                "amount": round(rng.uniform(1, 20), 1),
+                "is_percentage": True,
+                "scope": "global",
+                "description": "Multi-year commitment discount",
+            })
+        else:
+            target = rng.choice(performance_obligations)
+            contract_discounts.append({
+                "name": f"Promotional Credit {number + 1}",
+                "type": "obligation_level",
+                "amount": round(min(rng.uniform(100, 5000), target["ssp"] / 2), 2),
+                "is_percentage": False,
+                "scope": "obligation_specific",
+                "target_obligations": [target["name"]],
+                "description": "One-time promotional credit",
+            })
+
+    return {
+        "contract_id": f"SYN-{index:06d}",
+        "provider": "Synthetic Provider Inc.",
+        "customer": f"Customer {rng.randint(1, 5000)}",
+        "effective_date": effective_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "currency": "USD",
+        "total_contract_value": round(sum(obligation["ssp"] for obligation in performance_obligations), 2),
+        "contract_type": "SaaS",
+        "performance_obligations": performance_obligations,
+        "discounts": contract_discounts,
+        "variable_considerations": [],
+        "termination_clause": None,
+    }
+
+
+def synthetic_portfolio(count: int, seed: int = 606, **options: Any) -> Iterator[Dict[str, Any]]:
+    """Lazily generate `count` synthetic contracts from a fixed seed"""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield synthetic_contract(rng, index=index, **options)
+
+
+PAGE_CHARACTERS = 3000
+
+BOILERPLATE_SECTIONS = [
+    "Confidentiality",
+    "Intellectual Property",
+    "Warranties",
+    "Limitation of Liability",
+    "Indemnification",
+    "Governing Law",
+    "Force Majeure",
+    "Notices",
+    "Assignment",
+    "Entire Agreement",
+]
+
+BOILERPLATE_SENTENCES = [
+    "Each party shall hold the other party's confidential information in strict confidence.",
+    "Nothing in this clause shall be construed as granting any licence by implication or estoppel.",
+    "The parties shall cooperate in good faith to resolve any dispute arising under this clause.",
+    "Neither party shall be liable for any indirect, incidental or consequential loss.",
+    "This clause survives the expiry of the agreement for a period of five years.",
+    "Written notice shall be delivered by hand, by courier or by electronic mail.",
+    "The rights of each party under this clause are cumulative and not exclusive.",
+    "No waiver of any breach shall be deemed a waiver of any subsequent breach.",
+]
+
+
+def _long_date(value: str) -> str:
+    day = date.fromisoformat(value)
+    return f"{day:%B} {day.day}, {day.year}"
+
+
+def _money(value: float) -> str:
+    return f"${value:,.2f}"
+
+
+def synthetic_contract_text(contract: Dict[str, Any], rng: random.Random, pages: int = 4) -> str:
+    """
+    Render a synthetic extracted contract as Markdown contract text of roughly `pages` pages.
+
+    The commercial sections describe exactly the terms in `contract`; boilerplate sections
+    without revenue keywords pad the document to the requested length, with page footers.
+    """
+    lines: List[str] = [
+        "# Software as a Service Agreement",
+        "",
+        f"**Contract ID:** {contract['contract_id']}",
+        f"**Effective Date:** {_long_date(contract['effective_date'])}",
+        "",
+        "### 1. Parties",
+        "",
+        f"Contract ID: {contract['contract_id']}",
+        "",
+        f"This Agreement is made between {contract['provider']} (the \"Provider\") and "
+        f"{contract['customer']} (the \"Customer\"), as of {_long_date(contract['effective_date'])}.",
+        "",
+        "### 2. Term",
+        "",
+        f"This Agreement commences on {_long_date(contract['effective_date'])} and remains in effect "
+        f"until {_long_date(contract['end_date'])} (the \"Initial Term\").",
+        "",
+        "### 3. Scope of Deliverables (Performance Obligations)",
+        "",
+    ]
+
+    for number, obligation in enumerate(contract["performance_obligations"], 1):
+        lines.append(f"#### 3.{number} {obligation['name']}")
+        lines.append("")
+        if obligation["revenue_recognition_method"] == "over_time":
+            period = obligation["recognition_period"]
+            lines.append(
+                f"The Provider shall deliver {obligation['name']} from {_long_date(period['start_date'])} to "
+                f"{_long_date(period['end_date'])}, billed {period['frequency'].replace('_', ' ')}."
+            )
+            lines.append("**Revenue Recognition:** Over time, ratably over the service period.")
+        else:
+            lines.append(f"The Provider shall deliver {obligation['name']} upon customer acceptance.")
+            lines.append("**Revenue Recognition:** Point in time, upon customer acceptance.")
+        lines.append("")
+
+    lines += ["### 4. Fees and Payment Terms", "", "| Deliverable | Standalone Selling Price |", "|---|---|"]
+    for obligation in contract["performance_obligations"]:
+        lines.append(f"| {obligation['name']} | {_money(obligation['ssp'])} |")
+    lines += ["", f"Total Contract Value: {_money(contract['total_contract_value'])} ({contract['currency']}).", ""]
+
+    if contract["discounts"]:
+        lines += ["### 5. Discounts", ""]
+        for discount in contract["discounts"]:
+            amount = f"{discount['amount']}%" if discount["is_percentage"] else _money(discount["amount"])
+            targets = ", ".join(discount.get("target_obligations") or []) or "the total contract value"
+            lines.append(f"- {discount['name']}: {amount} applied to {targets}. {discount['description']}.")
+        lines.append("")
+
+    text = "\n".join(lines)
+    target = pages * PAGE_CHARACTERS
+    body: List[str] = [text]
+    length = len(text)
+    section = 6
+    while length < target:
+        title = BOILERPLATE_SECTIONS[(section - 6) % len(BOILERPLATE_SECTIONS)]
+        paragraph = " ".join(rng.choice(BOILERPLATE_SENTENCES) for _ in range(12))
+        chunk = f"\n### {section}. {title}\n\n{paragraph}\n"
+        body.append(chunk)
+        length += len(chunk)
+        section += 1
+
+    # Page footers, as left behind by PDF text extraction
+    text = "".join(body)
+    page_count = max(1, -(-len(text) // PAGE_CHARACTERS))
+    paged = []
+    for page in range(page_count):
+        paged.append(text[page * PAGE_CHARACTERS:(page + 1) * PAGE_CHARACTERS])
+        paged.append(f"\nPage {page + 1} of {page_count}\n")
+    return "".join(paged)
+
+
+def synthetic_documents(count: int, seed: int = 606, pages: int = 4, **options: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Lazily generate `count` (contract text, extracted contract) pairs from a fixed seed"""
+    rng = random.Random(seed)
+    for index in range(count):
+        contract = synthetic_contract(rng, index=index, **options)
+        yield synthetic_contract_text(contract, rng, pages), contract
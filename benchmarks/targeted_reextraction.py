@@ -0,0 +1,106 @@
+"""
+Targeted re-extraction benchmark.
+
+Compares correcting one field of a processed contract by extracting the whole contract
+again with re-extracting only that field from its stored sections
+(`app.extractor.sections`), against the offline Gemini stub with a fixed round trip and
+output rate. For seeded synthetic contracts it reports, per target, the prompt and response
+sizes (with tokens estimated at 4 characters each), the time per call and their ratios to
+the full extraction:
+- `end_date`: a contract field
+- `discounts`: a list of the contract
+- `recognition_period`: one field of one performance obligation
+- `obligation`: one whole performance obligation
+
+    python -m benchmarks.targeted_reextraction --size large --contracts 20 --chars-per-second 2000
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from app.extractor.llm_extractor import build_extraction_context, extract_contract_data, extract_contract_fields
+from app.extractor.preprocess import build_section_index
+from app.extractor.prompts import get_field_reextraction_prompt, get_revenue_recognition_prompt
+from app.extractor.sections import build_reextraction, current_values
+from benchmarks.common import emit
+from benchmarks.pipeline_stages import SIZES
+from benchmarks.stub_llm import stub_gemini
+from benchmarks.synthetic import synthetic_documents
+
+CHARS_PER_TOKEN = 4
+
+
+def targets_for(contract: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    obligation = contract["performance_obligations"][-1]["name"]
+    return {
+        "end_date": {"fields": ["end_date"], "obligations": [], "obligation_fields": []},
+        "discounts": {"fields": ["discounts"], "obligations": [], "obligation_fields": []},
+        "recognition_period": {"fields": [], "obligations": [obligation], "obligation_fields": ["recognition_period"]},
+        "obligation": {"fields": [], "obligations": [obligation], "obligation_fields": []},
+    }
+
+
+def summarize(target: str, size: str, samples: List[Dict[str, float]], full: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    summary = {
+        key: round(statistics.median(sample[key] for sample in samples), 1)
+        for key in ("prompt_chars", "response_chars", "ms")
+    }
+    summary["tokens"] = round((summary["prompt_chars"] + summary["response_chars"]) / CHARS_PER_TOKEN)
+    ratios = {}
+    if full:
+        ratios = {
+            "token_ratio": round(summary["tokens"] / full["tokens"], 3),
+            "time_ratio": round(summary["ms"] / full["ms"], 3),
+        }
+    emit("targeted_reextraction.call", target=target, size=size, calls=len(samples), **summary, **ratios)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=list(SIZES), default="medium")
+    parser.add_argument("--contracts", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds of round trip per call")
+    parser.add_argument("--chars-per-second", type=float, default=2000, help="response output rate, 0 for no delay")
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    documents = list(synthetic_documents(args.contracts, seed=args.seed, **SIZES[args.size]))
+    full_samples = []
+    target_samples: Dict[str, List[Dict[str, float]]] = {}
+    with stub_gemini({}, args.latency, args.chars_per_second) as model:
+        for text, contract in documents:
+            model.responses = {contract["contract_id"]: contract}
+            started = time.perf_counter()
+            extract_contract_data(text, contract["contract_id"], stream=False)
+            full_samples.append({
+                "prompt_chars": len(get_revenue_recognition_prompt(build_extraction_context(text))),
+                "response_chars": len(json.dumps(contract)),
+                "ms": (time.perf_counter() - started) * 1000,
+            })
+
+            sections = build_section_index(text)
+            for target, targets in targets_for(contract).items():
+                contract_sections, values, schema = build_reextraction(contract, sections, targets)
+                # The stub answers with the extracted values, as a correction confirming them would
+                correction = current_values(contract, targets)
+                model.responses = {contract["contract_id"]: correction}
+                model.default = correction
+                started = time.perf_counter()
+                extract_contract_fields(contract_sections, values, schema)
+                target_samples.setdefault(target, []).append({
+                    "prompt_chars": len(get_field_reextraction_prompt(contract_sections, values, schema)),
+                    "response_chars": len(json.dumps(correction)),
+                    "ms": (time.perf_counter() - started) * 1000,
+                })
+
+    full = summarize("full_extraction", args.size, full_samples)
+    for target, samples in target_samples.items():
+        summarize(target, args.size, samples, full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Usage ingestion benchmark.
+
+Generates batches of synthetic metering events as NDJSON and CSV and measures, on a single
+process, the events per second of the in-memory aggregation alone and of the full consumer
+task (aggregation, rollup insert and usage schedule refresh) against the benchmark database.
+The target is 100k events/sec.
+
+    python -m benchmarks.usage_ingestion --events 1000000 --batch-size 100000
+"""
+
+import argparse
+import json
+import random
+import uuid
+from datetime import date, timedelta
+
+from benchmarks.common import emit, timer, use_benchmark_database
+
+METRICS = ["api_calls", "storage_gb_hours", "active_users"]
+
+
+def make_batch(rng: random.Random, contract_ids, size: int, usage_format: str) -> str:
+    start = date(2025, 1, 1)
+    events = [
+        (
+            rng.choice(contract_ids),
+            rng.choice(METRICS),
+            rng.randint(1, 500),
+            f"{start + timedelta(days=rng.randrange(90))}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00Z",
+        )
+        for _ in range(size)
+    ]
+    if usage_format == "csv":
+        return "contract_id,metric,quantity,timestamp\n" + "\n".join(",".join(map(str, event)) for event in events)
+    return "\n".join(
+        json.dumps({"contract_id": contract_id, "metric": metric, "quantity": quantity, "timestamp": timestamp})
+        for contract_id, metric, quantity, timestamp in events
+    )
+
+
+def seed_contracts(count: int) -> list:
+    """Create metered contracts for the events to land on, once"""
+    from sqlmodel import select
+    from app.db import get_session
+    from app.models import Contract
+
+    with next(get_session()) as session:
+        existing = session.exec(select(Contract.external_id).where(Contract.external_id.startswith("USAGE-"))).all()
+        if len(existing) >= count:
+            return sorted(existing)[:count]
+
+        variable_considerations = [
+            {"name": f"{metric} overage", "metric": metric, "unit_price": 0.01, "included_quantity": 1000}
+            for metric in METRICS
+        ]
+        for index in range(len(existing), count):
+            session.add(Contract(
+                external_id=f"USAGE-{index:05d}",
+                customer_name=f"Customer {index}",
+                currency="USD",
+                status="processed",
+                extracted_json={"contract_id": f"USAGE-{index:05d}", "variable_considerations": variable_considerations},
+            ))
+        session.commit()
+    return [f"USAGE-{index:05d}" for index in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=100000)
+    parser.add_argument("--contracts", type=int, default=1000)
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv"])
+    parser.add_argument("--seed", type=int, default=606)
+    args = parser.parse_args()
+
+    use_benchmark_database()
+    from app.jobs import ingest_usage_events
+    from app.usage import aggregate_usage_events
+
+    contract_ids = seed_contracts(args.contracts)
+    rng = random.Random(args.seed)
+
+    for usage_format in args.formats:
+        batches = [
+            make_batch(rng, contract_ids, min(args.batch_size, args.events - offset), usage_format)
+            for offset in range(0, args.events, args.batch_size)
+        ]
+
+        with timer() as elapsed:
+            for batch in batches:
+                aggregate_usage_events(batch, usage_format)
+        emit(
+            f"usage_ingestion.aggregate.{usage_format}",
+            events=args.events,
+            seconds=round(elapsed["seconds"], 3),
+            events_per_second=round(args.events / elapsed["seconds"]),
+        )
+
+        with timer() as elapsed:
+            for batch in batches:
+                ingest_usage_events.run(str(uuid.uuid4()), batch, usage_format)
+        emit(
+            f"usage_ingestion.consumer.{usage_format}",
+            events=args.events,
+            batches=len(batches),
+            seconds=round(elapsed["seconds"], 3),
+            events_per_second=round(args.events / elapsed["seconds"]),
+        )
+
+
+if __name__ == "__main__":
+    main()